@@ -0,0 +1,142 @@
+from __future__ import annotations
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Callable, IO, Iterable, Iterator
+import json
+import threading
+import time
+
+from langchain_core.messages import HumanMessage
+
+from .graph import build_graph
+from .metrics import carry_span, span
+from .records import SprintRecord
+from .refresh import read_sprint_details
+from .tools import ToolResult
+
+
+@dataclass(frozen=True)
+class BatchPrompt:
+    id: str
+    prompt: str
+
+
+def read_prompts(lines: Iterable[str]) -> list[BatchPrompt]:
+    """Prompts from JSONL: each line is a JSON string or an object with "prompt" (and optionally "id").
+
+    Blank lines and lines starting with "#" are skipped; ids default to the 1-based line number.
+    """
+    prompts = []
+    for n, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        item = json.loads(line)
+        if isinstance(item, str):
+            item = {"prompt": item}
+        if not isinstance(item, dict) or not str(item.get("prompt") or "").strip():
+            raise ValueError(f"line {n}: expected a JSON string or an object with a \"prompt\"")
+        prompts.append(BatchPrompt(id=str(item.get("id", n)), prompt=str(item["prompt"])))
+    return prompts
+
+
+class SharedFetches:
+    """read_sprint_details that runs once per distinct board set for the life of a batch.
+
+    The first prompt to ask for a set fetches it; prompts asking for the same
+    set (in any order) while it runs wait for it, later ones reuse the result.
+    """
+
+    def __init__(self, read: Callable[..., ToolResult] = read_sprint_details):
+        self._read = read
+        self._lock = threading.Lock()
+        self._results: dict[frozenset[int], Future] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def __call__(
+        self, scripts_dir: Path, board_ids: list[int], on_record: Callable[[SprintRecord], None] | None = None
+    ) -> ToolResult:
+        key = frozenset(board_ids)
+        with self._lock:
+            result = self._results.get(key)
+            leader = result is None
+            if leader:
+                result = self._results[key] = Future()
+                self.executed += 1
+            else:
+                self.shared += 1
+        if leader:
+            try:
+                result.set_result(self._read(scripts_dir, list(board_ids)))
+            except BaseException as e:
+                result.set_exception(e)
+        r = result.result()
+        by_board = {rec.board_id: rec for rec in r.records}
+        records = [by_board[b] for b in board_ids if b in by_board]
+        for rec in records if on_record is not None else ():
+            on_record(rec)
+        return replace(r, records=records)
+
+
+def run_prompt(graph, item: BatchPrompt) -> dict:
+    """One prompt through the graph; never raises, errors go into the result."""
+    started = time.perf_counter()
+    with span("batch.prompt") as root:
+        try:
+            state = graph.invoke({"messages": [HumanMessage(content=item.prompt)]})
+            error = (state.get("fetch_stderr") or state.get("push_stderr") or "").strip()
+            reply = state["messages"][-1].content
+        except Exception as e:
+            state, reply, error = {}, "", f"{type(e).__name__}: {e}"
+    timings: dict[str, float] = {}
+    for child in root.children:
+        timings[child.name] = round(timings.get(child.name, 0.0) + child.duration, 4)
+    return {
+        "id": item.id,
+        "prompt": item.prompt,
+        "intent": state.get("intent"),
+        "board_ids": state.get("board_ids", []),
+        "ok": not error,
+        "reply": reply,
+        "error": error,
+        "seconds": round(time.perf_counter() - started, 4),
+        "timings": timings,
+    }
+
+
+def run_batch(
+    prompts: list[BatchPrompt],
+    *,
+    scripts_dir: Path,
+    board_ids_file: Path,
+    default_miro_board_id: str | None,
+    workers: int = 4,
+) -> tuple[Iterator[dict], SharedFetches]:
+    """Run `prompts` concurrently through one compiled graph whose fetches are shared.
+
+    Results are yielded in input order as soon as each one (and those before it) is done.
+    """
+    fetches = SharedFetches()
+    graph = build_graph(
+        scripts_dir=scripts_dir,
+        board_ids_file=board_ids_file,
+        default_miro_board_id=default_miro_board_id,
+        read_details=fetches,
+    )
+
+    def results() -> Iterator[dict]:
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="batch") as pool:
+            yield from pool.map(carry_span(lambda item: run_prompt(graph, item)), prompts)
+
+    return results(), fetches
+
+
+def write_jsonl(results: Iterable[dict], f: IO[str]) -> int:
+    n = 0
+    for result in results:
+        f.write(json.dumps(result, ensure_ascii=False) + "\n")
+        f.flush()
+        n += 1
+    return n
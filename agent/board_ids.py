@@ -1,20 +1,27 @@
 from __future__ import annotations
+from bisect import bisect_left
 from dataclasses import dataclass
 from pathlib import Path
+import difflib
 import re
+import threading
 
 @dataclass(frozen=True)
 class TeamBoard:
     team: str
     board_id: int
 
+    @property
+    def short_name(self) -> str:
+        """Team name without a trailing "Team": "Amber Team" -> "Amber"."""
+        return re.sub(r"\s+team$", "", self.team.strip(), flags=re.IGNORECASE).strip() or self.team.strip()
+
 def parse_board_ids(path: Path) -> list[TeamBoard]:
-    """Parse board_ids.txt:
+    """Parse board_ids.txt in either format (they can be mixed):
 
     # Team Name
     350
-    # Another Team
-    492
+    Another Team:492
     """
     teams: list[TeamBoard] = []
     current_team: str | None = None
@@ -26,6 +33,12 @@ def parse_board_ids(path: Path) -> list[TeamBoard]:
         if line.startswith("#"):
             current_team = line.lstrip("#").strip()
             continue
+        if ":" in line:
+            name, _, board_id = line.partition(":")
+            if board_id.strip().isdigit() and name.strip():
+                teams.append(TeamBoard(team=name.strip(), board_id=int(board_id)))
+            current_team = None
+            continue
         if re.fullmatch(r"\d+", line):
             if current_team is None:
                 current_team = f"Board {line}"
@@ -34,17 +47,89 @@ def parse_board_ids(path: Path) -> list[TeamBoard]:
 
     return teams
 
-def resolve_board_ids(path: Path, team_query: str | None = None) -> list[int]:
-    boards = parse_board_ids(path)
-    if not team_query:
-        return [b.board_id for b in boards]
+class BoardRegistry:
+    """Indexed view of board_ids.txt for resolving team queries to board ids.
+
+    A query resolves to the first non-empty match of: exact team name (with
+    or without "Team"), name prefix, substring, a literal board id, and
+    finally the closest fuzzy name. Matches keep file order; results are
+    memoized per query.
+    """
+
+    def __init__(self, teams: list[TeamBoard]):
+        self.teams = teams
+        self._exact: dict[str, list[int]] = {}
+        for t in teams:
+            for key in {t.team.lower(), t.short_name.lower()}:
+                self._exact.setdefault(key, []).append(t.board_id)
+        self._keys = sorted(self._exact)
+        self._names = [(t.team.lower(), t.board_id) for t in teams]
+        self._resolved: dict[str, list[int]] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, team_query: str | None = None) -> list[int]:
+        if not team_query or not team_query.strip():
+            return [t.board_id for t in self.teams]
+        query = " ".join(team_query.lower().split())
+        with self._lock:
+            cached = self._resolved.get(query)
+        if cached is None:
+            cached = self._match(query)
+            with self._lock:
+                if len(self._resolved) >= 4096:
+                    self._resolved.clear()
+                self._resolved[query] = cached
+        return list(cached)
 
-    tq = team_query.strip().lower()
-    matched = [b.board_id for b in boards if tq in b.team.lower()]
-    if matched:
-        return matched
+    def _match(self, query: str) -> list[int]:
+        if query in self._exact:
+            return _unique(self._exact[query])
+        prefixed = []
+        i = bisect_left(self._keys, query)
+        while i < len(self._keys) and self._keys[i].startswith(query):
+            prefixed.append(self._keys[i])
+            i += 1
+        if prefixed:
+            return self._in_file_order({b for k in prefixed for b in self._exact[k]})
+        contained = [b for name, b in self._names if query in name]
+        if contained:
+            return _unique(contained)
+        if query.isdigit():
+            return [int(query)]
+        close = difflib.get_close_matches(query, self._keys, n=1, cutoff=0.75)
+        return _unique(self._exact[close[0]]) if close else []
 
-    if re.fullmatch(r"\d+", tq):
-        return [int(tq)]
+    def _in_file_order(self, ids: set[int]) -> list[int]:
+        return _unique([t.board_id for t in self.teams if t.board_id in ids])
 
-    return []
+    def by_short_name(self) -> dict[str, int]:
+        """Short team name -> board id, e.g. for a team picker."""
+        return {t.short_name: t.board_id for t in self.teams}
+
+def _unique(ids: list[int]) -> list[int]:
+    return list(dict.fromkeys(ids))
+
+_registries: dict[Path, tuple[tuple[int, int], BoardRegistry]] = {}
+_registries_lock = threading.Lock()
+
+def board_registry(path: Path) -> BoardRegistry:
+    """Process-wide registry for `path`, re-parsed only when the file's mtime or size changes.
+
+    A missing file gives an empty registry.
+    """
+    try:
+        st = path.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        return BoardRegistry([])
+    with _registries_lock:
+        cached = _registries.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+    registry = BoardRegistry(parse_board_ids(path))
+    with _registries_lock:
+        _registries[path] = (stamp, registry)
+    return registry
+
+def resolve_board_ids(path: Path, team_query: str | None = None) -> list[int]:
+    return board_registry(path).resolve(team_query)
@@ -0,0 +1,181 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+
+# Seconds a cached Jira response is served without asking Jira again.
+# Board names and epic outcomes rarely change; sprint membership moves more.
+DEFAULT_TTLS: dict[str, float] = {
+    "board": 24 * 3600,
+    "sprints": 5 * 60,
+    "sprint_issues": 5 * 60,
+    "search": 60 * 60,
+    "issue": 60 * 60,
+}
+
+_RESOURCE_PATTERNS = [
+    ("sprints", re.compile(r"/rest/agile/1\.0/board/\d+/sprint$")),
+    ("board", re.compile(r"/rest/agile/1\.0/board/\d+$")),
+    ("sprint_issues", re.compile(r"/rest/agile/1\.0/sprint/\d+/issue$")),
+    ("search", re.compile(r"/rest/api/3/search(/jql)?$")),
+    ("issue", re.compile(r"/rest/api/3/issue/[^/]+$")),
+]
+
+
+def resource_kind(path: str) -> str:
+    for kind, pattern in _RESOURCE_PATTERNS:
+        if pattern.search(path):
+            return kind
+    return "other"
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    body: bytes
+    etag: str
+    last_modified: str
+    stored_at: float
+
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+
+class ResponseCache:
+    """SQLite-backed HTTP response cache with per-resource TTLs and LRU eviction.
+
+    Safe to share between threads; WAL mode lets the CLI and the Streamlit
+    apps use the same file concurrently.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 64 * 1024 * 1024, ttls: dict[str, float] | None = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, body BLOB NOT NULL, etag TEXT, last_modified TEXT,"
+            " stored_at REAL NOT NULL, accessed_at REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses(accessed_at)")
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+    def ttl(self, kind: str) -> float:
+        return self.ttls.get(kind, 0.0)
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return CacheEntry(body=row[0], etag=row[1] or "", last_modified=row[2] or "", stored_at=row[3])
+
+    def put(self, key: str, body: bytes, etag: str = "", last_modified: str = "") -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, body, etag, last_modified, now, now, len(body)),
+            )
+            self._evict()
+
+    def revalidated(self, key: str) -> None:
+        """Mark an entry fresh again after a 304 Not Modified."""
+        now = time.time()
+        with self._lock:
+            self._db.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+
+    def _evict(self) -> None:
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used entries until 90% of the cap is free again.
+        target = total - int(self.max_bytes * 0.9)
+        freed = 0
+        victims = []
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            victims.append((key,))
+            freed += size
+            if freed >= target:
+                break
+        self._db.executemany("DELETE FROM responses WHERE key = ?", victims)
+
+
+@dataclass(frozen=True)
+class EpicOutcome:
+    updated: str
+    outcome: str
+    checked_at: float
+
+
+class EpicOutcomeCache:
+    """Customer Outcome text per epic, shared by every sprint and board linking it.
+
+    Entries are keyed by Jira site, outcome field and epic key, and stay valid
+    while the epic's `updated` timestamp is unchanged. `checked_at` records
+    when that was last confirmed against Jira.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS epic_outcomes ("
+            " site TEXT NOT NULL, field TEXT NOT NULL, epic_key TEXT NOT NULL, updated TEXT NOT NULL,"
+            " outcome TEXT NOT NULL, checked_at REAL NOT NULL, PRIMARY KEY (site, field, epic_key))"
+        )
+
+    def get_many(self, site: str, field: str, keys: list[str]) -> dict[str, EpicOutcome]:
+        found: dict[str, EpicOutcome] = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = self._db.execute(
+                    "SELECT epic_key, updated, outcome, checked_at FROM epic_outcomes"
+                    f" WHERE site = ? AND field = ? AND epic_key IN ({','.join('?' * len(chunk))})",
+                    (site, field, *chunk),
+                )
+                found.update((key, EpicOutcome(updated, outcome, checked_at)) for key, updated, outcome, checked_at in rows)
+        return found
+
+    def put_many(self, site: str, field: str, entries: dict[str, tuple[str, str]]) -> None:
+        """Store `epic key -> (updated, outcome text)` as just checked."""
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO epic_outcomes VALUES (?, ?, ?, ?, ?, ?)",
+                [(site, field, key, updated, outcome, now) for key, (updated, outcome) in entries.items()],
+            )
+
+    def touch(self, site: str, field: str, keys: list[str]) -> None:
+        """Mark entries as confirmed unchanged just now."""
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "UPDATE epic_outcomes SET checked_at = ? WHERE site = ? AND field = ? AND epic_key = ?",
+                [(now, site, field, key) for key in keys],
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM epic_outcomes")
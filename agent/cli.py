@@ -1,63 +1,290 @@
 from __future__ import annotations
+from contextlib import ExitStack
 from pathlib import Path
 import typer
 from dotenv import load_dotenv
-from langchain_core.messages import HumanMessage
 
 from .config import Settings
-from .graph import build_graph
-from .board_ids import parse_board_ids, resolve_board_ids
-from .tools import fetch_sprint_details, push_goals_to_miro
+from .metrics import METRICS, render_tree, span
+from .board_ids import board_registry, resolve_board_ids
+
+# Commands import what they use when they run: the deterministic ones never
+# load LangChain/LangGraph (only `chat` does), and `list-teams` not even
+# requests. `python -m bench.startup` guards this.
 
 app = typer.Typer(help="Sprint Goals AI Agent (Jira -> optional Miro publish)")
 
 def repo_root() -> Path:
     return Path(__file__).resolve().parents[1]
 
+@app.callback()
+def main(
+    ctx: typer.Context,
+    profile: bool = typer.Option(False, "--profile", help="Print a timing tree of graph nodes, HTTP calls and subprocesses"),
+    metrics_out: Path = typer.Option(None, "--metrics-out", help="Write metrics on exit: Prometheus text, or JSON for *.json"),
+):
+    if profile:
+        stack = ExitStack()
+        root = stack.enter_context(span(f"cli.{ctx.invoked_subcommand}"))
+
+        def report() -> None:
+            stack.close()
+            typer.echo(render_tree(root), err=True)
+
+        ctx.call_on_close(report)
+    if metrics_out is not None:
+        ctx.call_on_close(lambda: metrics_out.write_text(
+            METRICS.to_json() if metrics_out.suffix == ".json" else METRICS.to_prometheus()
+        ))
+
 @app.command()
-def chat(prompt: str = typer.Argument(..., help="Natural language request")):
-    
-    from pathlib import Path
-    load_dotenv(dotenv_path=Path(repo_root()) / ".env", override=True)
-    settings = Settings.load(repo_root())
-    graph = build_graph(
+def chat(
+    prompt: str = typer.Argument(None, help="Natural language request"),
+    batch: Path = typer.Option(None, "--batch", help="JSONL file of prompts (strings or {\"id\", \"prompt\"} objects)"),
+    workers: int = typer.Option(4, help="With --batch: prompts run concurrently"),
+    output: Path = typer.Option(None, help="With --batch: JSONL results file (default: stdout)"),
+):
+    if batch is not None:
+        return _chat_batch(batch, workers, output)
+    if not prompt:
+        typer.echo("Give a prompt or --batch FILE.jsonl")
+        raise typer.Exit(code=2)
+    from langchain_core.messages import HumanMessage
+
+    from .graph import stream_reply
+    from .resources import get_resources
+    graph = get_resources(repo_root()).graph
+    state = {"messages": [HumanMessage(content=prompt)]}
+    # Print each board as soon as it is fetched instead of waiting for all of them
+    for piece in stream_reply(graph, state):
+        typer.echo(piece, nl=False)
+    typer.echo()
+
+def _chat_batch(batch: Path, workers: int, output: Path | None) -> None:
+    """Run every prompt of `batch` through one graph; prompts resolving to the same boards share one fetch."""
+    import sys
+    import time
+
+    from .batch import read_prompts, run_batch, write_jsonl
+    from .resources import get_resources
+    settings = get_resources(repo_root()).settings
+    try:
+        prompts = read_prompts(batch.read_text(encoding="utf-8").splitlines())
+    except (OSError, ValueError) as e:
+        typer.echo(f"Cannot read {batch}: {e}", err=True)
+        raise typer.Exit(code=2)
+    started = time.perf_counter()
+    results, fetches = run_batch(
+        prompts,
         scripts_dir=settings.scripts_dir,
         board_ids_file=settings.board_ids_file,
         default_miro_board_id=settings.default_miro_board_id,
+        workers=workers,
     )
-    state = {"messages": [HumanMessage(content=prompt)]}
-    result = graph.invoke(state)
-    typer.echo(result["messages"][-1].content)
+    failed = 0
+
+    def counted():
+        nonlocal failed
+        for result in results:
+            failed += not result["ok"]
+            yield result
+
+    if output is None:
+        write_jsonl(counted(), sys.stdout)
+    else:
+        with open(output, "w", encoding="utf-8") as f:
+            write_jsonl(counted(), f)
+    typer.echo(
+        f"{len(prompts)} prompt(s) in {time.perf_counter() - started:.1f}s, {failed} failed;"
+        f" {fetches.executed} fetch(es) run, {fetches.shared} shared",
+        err=True,
+    )
+    if failed:
+        raise typer.Exit(code=1)
 
 @app.command("list-teams")
 def list_teams():
     settings = Settings.load(repo_root())
-    for b in parse_board_ids(settings.board_ids_file):
+    for b in board_registry(settings.board_ids_file).teams:
         typer.echo(f"{b.team}: {b.board_id}")
 
 @app.command()
-def fetch(team: str = typer.Option("", help="Team name contains (e.g. Aqua) or board id")):
-    from pathlib import Path
+def fetch(
+    team: str = typer.Option("", help="Team name contains (e.g. Aqua) or board id"),
+    workers: int = typer.Option(0, help="Boards fetched concurrently (default: JIRA_MAX_WORKERS or 8)"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Bypass the Jira response cache"),
+    refresh: bool = typer.Option(False, "--refresh", help="Re-download everything and update the cache"),
+    incremental: bool = typer.Option(False, "--incremental", help="Only re-fetch boards whose active sprint changed"),
+    fmt: str = typer.Option("text", "--format", help="text, or stream the records as ndjson, json, csv or parquet"),
+    output: str = typer.Option("-", "--output", help="With --format: file to write ('-' = stdout)"),
+):
+    from .tools import fetch_sprint_details
     load_dotenv(dotenv_path=Path(repo_root()) / ".env", override=True)
     settings = Settings.load(repo_root())
     ids = resolve_board_ids(settings.board_ids_file, team_query=team or None)
     if not ids:
         typer.echo("No matching boards. Try: sprint-goals-agent list-teams")
         raise typer.Exit(code=2)
-    r = fetch_sprint_details(settings.scripts_dir, ids)
+    cache_mode = "off" if no_cache else "refresh" if refresh else "use"
+    if fmt == "text":
+        r = fetch_sprint_details(settings.scripts_dir, ids, workers=workers or None, cache_mode=cache_mode, incremental=incremental)
+        typer.echo(r.stdout)
+        if r.stderr:
+            typer.echo(r.stderr)
+        return
+
+    import sys
+    from .formats import record_writer
+
+    # Records are written as each board completes; the run log goes to stderr when they go to stdout.
+    to_stdout = output == "-"
+    with ExitStack() as stack:
+        f = sys.stdout.buffer if to_stdout else stack.enter_context(open(output, "wb"))
+        try:
+            writer = stack.enter_context(record_writer(fmt, f))
+        except (ValueError, RuntimeError) as e:
+            typer.echo(str(e), err=True)
+            raise typer.Exit(code=2)
+        r = fetch_sprint_details(
+            settings.scripts_dir, ids, workers=workers or None, cache_mode=cache_mode,
+            incremental=incremental, on_record=writer.write,
+        )
+    typer.echo(r.stdout, err=to_stdout)
+    if r.stderr:
+        typer.echo(r.stderr, err=True)
+    if not r.ok:
+        raise typer.Exit(code=r.returncode or 1)
+
+@app.command()
+def progress(
+    team: str = typer.Option("", help="Team name contains (e.g. Aqua) or board id"),
+    workers: int = typer.Option(0, help="Boards fetched concurrently (default: JIRA_MAX_WORKERS or 8)"),
+    refresh: bool = typer.Option(False, "--refresh", help="Re-download everything and update the cache"),
+):
+    """Issue status and story-point completion of each board's active sprints."""
+    from .tools import fetch_sprint_progress
+    load_dotenv(dotenv_path=Path(repo_root()) / ".env", override=True)
+    settings = Settings.load(repo_root())
+    ids = resolve_board_ids(settings.board_ids_file, team_query=team or None)
+    if not ids:
+        typer.echo("No matching boards. Try: sprint-goals-agent list-teams")
+        raise typer.Exit(code=2)
+    r = fetch_sprint_progress(ids, workers=workers or None, cache_mode="refresh" if refresh else "use")
     typer.echo(r.stdout)
     if r.stderr:
         typer.echo(r.stderr)
+        raise typer.Exit(code=r.returncode)
 
 @app.command()
-def push(miro_board_id: str = typer.Argument(..., help="Miro board id from URL")):
-    from pathlib import Path
+def history(
+    team: str = typer.Option("", help="Team name contains (e.g. Aqua) or board id"),
+    last: int = typer.Option(6, help="Closed sprints per board to show (0 = all stored)"),
+    backfill: bool = typer.Option(False, "--backfill", help="First store sprints closed since the last backfill (calls Jira)"),
+    workers: int = typer.Option(0, help="Boards backfilled concurrently (default: JIRA_MAX_WORKERS or 8)"),
+    output: Path = typer.Option(None, help="Write the history as CSV here instead of printing it"),
+):
+    """Goals and outcomes of each board's recent closed sprints, served from the report store."""
+    from .records import write_csv
+    from .summary import format_summary
+    from .tools import backfill_sprint_history, read_sprint_history
     load_dotenv(dotenv_path=Path(repo_root()) / ".env", override=True)
     settings = Settings.load(repo_root())
-    r = push_goals_to_miro(settings.scripts_dir, miro_board_id)
+    ids = resolve_board_ids(settings.board_ids_file, team_query=team or None)
+    if not ids:
+        typer.echo("No matching boards. Try: sprint-goals-agent list-teams")
+        raise typer.Exit(code=2)
+    if backfill:
+        b = backfill_sprint_history(settings.scripts_dir, ids, workers=workers or None)
+        typer.echo(b.stdout or b.stderr, err=True)
+        if not b.ok:
+            raise typer.Exit(code=b.returncode)
+    r = read_sprint_history(settings.scripts_dir, ids, last=last or None)
+    if not r.ok:
+        typer.echo(r.stderr)
+        raise typer.Exit(code=2)
+    if output is not None:
+        typer.echo(str(write_csv(r.records, settings.reports_dir, output)))
+        return
+    typer.echo(format_summary(r.records))
+
+@app.command()
+def push(
+    miro_board_id: str = typer.Argument(..., help="Miro board id from URL"),
+    sync: bool = typer.Option(None, "--sync/--no-sync", help="Update cards from earlier pushes instead of adding new ones (default: MIRO_SYNC)"),
+    delete_stale: bool = typer.Option(False, "--delete-stale", help="With --sync, delete cards of earlier sprints"),
+):
+    from .tools import push_goals_to_miro
+    load_dotenv(dotenv_path=Path(repo_root()) / ".env", override=True)
+    settings = Settings.load(repo_root())
+    r = push_goals_to_miro(settings.scripts_dir, miro_board_id, sync=sync, delete_stale=delete_stale)
     typer.echo(r.stdout)
     if r.stderr:
         typer.echo(r.stderr)
 
+@app.command("serve-refresh")
+def serve_refresh(
+    interval: float = typer.Option(None, help="Seconds between sweeps of all boards (default: REFRESH_INTERVAL or 900)"),
+    jitter: float = typer.Option(0.1, help="Random +/- share of the interval between sweeps"),
+    batch: int = typer.Option(8, help="Boards refreshed per Jira round"),
+    once: bool = typer.Option(False, "--once", help="Run a single sweep and exit"),
+):
+    """Keep the stored sprint snapshot warm so the apps and chat can serve it instantly (see SNAPSHOT_MAX_AGE)."""
+    from .refresh import RefreshScheduler, refresh_interval
+    load_dotenv(dotenv_path=Path(repo_root()) / ".env", override=True)
+    settings = Settings.load(repo_root())
+    scheduler = RefreshScheduler(
+        settings.scripts_dir,
+        settings.board_ids_file,
+        interval=interval if interval is not None else refresh_interval(),
+        jitter=jitter,
+        batch=batch,
+        log=typer.echo,
+    )
+    try:
+        scheduler.run(sweeps=1 if once else None)
+    except KeyboardInterrupt:
+        pass
+
+@app.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", help="Interface to listen on"),
+    port: int = typer.Option(8787, help="TCP port"),
+    freshness: float = typer.Option(None, help="Seconds a finished fetch answers identical requests (default: SERVICE_FRESHNESS or 30)"),
+    workers: int = typer.Option(16, help="Threads for Jira/Miro calls and chat"),
+):
+    """HTTP API for the apps: concurrent identical fetches share one Jira round trip (set AGENT_SERVICE_URL in the apps)."""
+    import asyncio
+
+    from .service import AgentService, service_freshness
+    service = AgentService(repo_root(), freshness=service_freshness() if freshness is None else freshness, workers=workers)
+    try:
+        asyncio.run(service.serve(host, port, ready=lambda p: typer.echo(f"Serving on http://{host}:{p}")))
+    except KeyboardInterrupt:
+        pass
+
+@app.command()
+def export(
+    team: str = typer.Option("", help="Team name contains (e.g. Aqua) or board id"),
+    output: Path = typer.Option(None, help="CSV file to write (default: reports/Sprint_Goals_<timestamp>.csv)"),
+):
+    """Export the latest stored sprint snapshot as CSV (e.g. for Excel)."""
+    from .records import write_csv
+    from .store import report_store
+    settings = Settings.load(repo_root())
+    ids = resolve_board_ids(settings.board_ids_file, team_query=team) if team else None
+    records = [s.record for s in report_store(settings.reports_dir).latest_snapshot(ids)]
+    if not records:
+        typer.echo("No stored sprint data. Run: sprint-goals-agent fetch")
+        raise typer.Exit(code=2)
+    typer.echo(str(write_csv(records, settings.reports_dir, output)))
+
+@app.command()
+def compact(retention_days: float = typer.Option(None, help="Keep runs newer than this (default: REPORT_RETENTION_DAYS or 90)")):
+    """Drop stored fetch runs outside the retention window (the latest record per board is always kept)."""
+    from .store import report_store
+    settings = Settings.load(repo_root())
+    removed = report_store(settings.reports_dir).compact(retention_days)
+    typer.echo(f"Removed {removed} record(s)")
+
 if __name__ == "__main__":
     app()
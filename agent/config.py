@@ -8,6 +8,7 @@ class Settings:
     repo_root: Path
     scripts_dir: Path
     board_ids_file: Path
+    reports_dir: Path
     default_miro_board_id: str | None
 
     @staticmethod
@@ -16,5 +17,6 @@ class Settings:
             repo_root=repo_root,
             scripts_dir=repo_root / "scripts",
             board_ids_file=repo_root / "board_ids.txt",
+            reports_dir=repo_root / "reports",
             default_miro_board_id=os.getenv("MIRO_BOARD_ID") or None,
         )
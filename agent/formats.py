@@ -0,0 +1,168 @@
+from __future__ import annotations
+from datetime import date
+from typing import IO, Any
+import csv
+import io
+import json
+
+from .records import CSV_HEADER, SprintRecord
+
+FORMATS = ("ndjson", "json", "csv", "parquet")
+# Records per Parquet row group: a long fetch reaches the file in chunks, not all at the end.
+PARQUET_ROW_GROUP = 256
+
+
+def record_fields(rec: SprintRecord) -> dict[str, Any]:
+    """Typed columns of a record: sprint ids as ints, dates as dates, outcomes as a list (None for unset values)."""
+    return {
+        "board_id": rec.board_id,
+        "board_name": rec.board_name,
+        "sprint_id": int(rec.sprint_id) if rec.sprint_id.isdigit() else None,
+        "sprint_name": rec.sprint_name or None,
+        "sprint_state": rec.sprint_state or None,
+        "start": _date(rec.start),
+        "end": _date(rec.end),
+        "goal": rec.goal,
+        "outcomes": list(rec.outcomes),
+    }
+
+
+def _date(value: str) -> date | None:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _json(rec: SprintRecord) -> str:
+    return json.dumps(record_fields(rec), ensure_ascii=False, default=date.isoformat)
+
+
+class RecordWriter:
+    """Writes records to a binary stream one at a time, flushing each so readers see boards as they complete.
+
+    Use as a context manager (or call close()) to finish the output; the
+    underlying stream is flushed but left open.
+    """
+
+    def __init__(self, f: IO[bytes]):
+        self.f = f
+        self.count = 0
+
+    def write(self, rec: SprintRecord) -> None:
+        self._write(rec)
+        self.count += 1
+        self.f.flush()
+
+    def _write(self, rec: SprintRecord) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        self.f.flush()
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class _TextWriter(RecordWriter):
+    def __init__(self, f: IO[bytes]):
+        super().__init__(f)
+        self.text = io.TextIOWrapper(f, encoding="utf-8", newline="", write_through=True)
+
+    def close(self) -> None:
+        self.text.flush()
+        self.text.detach()  # hand the stream back instead of closing it
+        super().close()
+
+
+class NdjsonWriter(_TextWriter):
+    """One JSON object per line."""
+
+    def _write(self, rec: SprintRecord) -> None:
+        self.text.write(_json(rec) + "\n")
+
+
+class JsonWriter(_TextWriter):
+    """A JSON array, written element by element; valid once closed."""
+
+    def __init__(self, f: IO[bytes]):
+        super().__init__(f)
+        self.text.write("[")
+
+    def _write(self, rec: SprintRecord) -> None:
+        self.text.write(("," if self.count else "") + "\n  " + _json(rec))
+
+    def close(self) -> None:
+        self.text.write("\n]\n" if self.count else "]\n")
+        super().close()
+
+
+class CsvWriter(_TextWriter):
+    """The Sprint_Goals CSV schema (CSV_HEADER), so existing readers keep working; outcomes stay " ; "-joined."""
+
+    def __init__(self, f: IO[bytes]):
+        super().__init__(f)
+        self.csv = csv.writer(self.text)
+        self.csv.writerow(CSV_HEADER)
+
+    def _write(self, rec: SprintRecord) -> None:
+        self.csv.writerow(rec.to_row())
+
+
+class ParquetWriter(RecordWriter):
+    """Parquet with record_fields() columns (date32 dates, list<string> outcomes); needs pyarrow.
+
+    Records are written in row groups of `row_group` as they arrive; the file
+    is only readable once closed, because Parquet keeps its index at the end.
+    """
+
+    def __init__(self, f: IO[bytes], row_group: int = PARQUET_ROW_GROUP):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Parquet output needs pyarrow: pip install pyarrow") from e
+        super().__init__(f)
+        self.pa = pa
+        self.schema = pa.schema([
+            ("board_id", pa.int64()),
+            ("board_name", pa.string()),
+            ("sprint_id", pa.int64()),
+            ("sprint_name", pa.string()),
+            ("sprint_state", pa.string()),
+            ("start", pa.date32()),
+            ("end", pa.date32()),
+            ("goal", pa.string()),
+            ("outcomes", pa.list_(pa.string())),
+        ])
+        self.parquet = pq.ParquetWriter(f, self.schema)
+        self.row_group = max(1, row_group)
+        self.rows: list[dict[str, Any]] = []
+
+    def write(self, rec: SprintRecord) -> None:
+        self.rows.append(record_fields(rec))
+        self.count += 1
+        if len(self.rows) >= self.row_group:
+            self._flush_rows()
+
+    def _flush_rows(self) -> None:
+        if self.rows:
+            self.parquet.write_table(self.pa.Table.from_pylist(self.rows, schema=self.schema))
+            self.rows = []
+            self.f.flush()
+
+    def close(self) -> None:
+        self._flush_rows()
+        self.parquet.close()
+        super().close()
+
+
+def record_writer(fmt: str, f: IO[bytes]) -> RecordWriter:
+    """Writer for one of FORMATS. Raises ValueError for unknown formats, RuntimeError when parquet lacks pyarrow."""
+    writers = {"ndjson": NdjsonWriter, "json": JsonWriter, "csv": CsvWriter, "parquet": ParquetWriter}
+    if fmt not in writers:
+        raise ValueError(f"Unknown format {fmt!r} (choose from {', '.join(FORMATS)})")
+    return writers[fmt](f)
@@ -1,224 +1,152 @@
 from __future__ import annotations
 
-from typing import TypedDict, Literal, Optional, List, Any
+from typing import TypedDict, Literal, Optional, List, Any, Callable, Iterator
+from collections import OrderedDict
+from dataclasses import asdict
 from pathlib import Path
 import json
+import os
 import re
+import threading
+import time
 
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph, END
 from langchain_core.messages import HumanMessage, AIMessage
 
-from .board_ids import resolve_board_ids, parse_board_ids
-from .tools import fetch_sprint_details, push_goals_to_miro, fetch_customer_outcomes
-from .llm import get_llm
+from .board_ids import board_registry, resolve_board_ids
+from .records import SprintRecord
+from .refresh import read_sprint_details
+from .progress import format_progress
+from .summary import BLOCK_SEPARATOR, format_block, format_summary, strip_ansi
+from .tools import ToolResult, push_goals_to_miro, fetch_sprint_progress, read_sprint_history
+from .llm import get_llm, llm_identifier
+from .intent import cached_intent, classify, intent_cache_key, record, store_intent
+from .metrics import span, traced
 
 
-ANSI_RE = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
-
-
-def strip_ansi(s: str) -> str:
-    return ANSI_RE.sub("", s or "")
-
-
-def extract_preview_rows(stdout: str) -> list[str]:
-    """
-    Extract CSV-like rows from the script output.
-    We find the header 'Board ID,Board Name,...' and then reconstruct rows.
-    """
-    text = strip_ansi(stdout)
-    # Support both old (8 col) and new (9 col with Customer Outcome) headers
-    header_new = "Board ID,Board Name,Sprint ID,Sprint Name,Sprint State,Start Date,End Date,Sprint Goal,Customer Outcome"
-    header_old = "Board ID,Board Name,Sprint ID,Sprint Name,Sprint State,Start Date,End Date,Sprint Goal"
-    
-    header = header_new if header_new in text else header_old
-    idx = text.find(header)
-    if idx == -1:
-        return []
-
-    preview = text[idx:]
-    # Ensure header starts on its own line
-    preview = preview.replace(header, header + "\n", 1)
-
-    # Rows often appear on one line separated by spaces; insert newline before each "<digits>,"
-    # Example: "...Sprint Goal 350,ILX..." => "\n350,ILX..."
-    preview = re.sub(r"\s(\d+),", r"\n\1,", preview)
+class AgentState(TypedDict, total=False):
+    messages: List[Any]
 
-    # Split into lines and keep only data rows (start with digits)
-    lines = [ln.strip() for ln in preview.splitlines() if ln.strip()]
-    rows = [ln for ln in lines if re.match(r"^\d+,", ln)]
-    return rows
+    intent: Literal["fetch", "history", "progress", "push", "list", "help"]
+    team_query: Optional[str]
+    miro_board_id: Optional[str]
+    display_filter: Optional[Literal["all", "goals_only", "outcomes_only"]]
+    sprints: Optional[int]
 
+    # Conversation memory (kept across turns by a checkpointer): the last fetch's records
+    last_records: List[dict]
+    last_board_ids: List[int]
+    last_fetched_at: float
 
-def parse_row(line: str) -> dict:
-    """
-    Split into 9 fields (including Customer Outcome), allowing commas inside fields by using CSV parsing.
-    """
-    import csv
-    from io import StringIO
-    
-    # Use CSV reader to properly handle quoted fields with commas
-    try:
-        reader = csv.reader(StringIO(line))
-        parts = next(reader)
-    except Exception:
-        parts = line.split(",", 8)
-    
-    # Pad to 9 fields if necessary
-    while len(parts) < 9:
-        parts.append("")
-    
-    return {
-        "board_id": parts[0].strip(),
-        "board_name": parts[1].strip(),
-        "sprint_id": parts[2].strip(),
-        "sprint_name": parts[3].strip(),
-        "sprint_state": parts[4].strip(),
-        "start": parts[5].strip(),
-        "end": parts[6].strip(),
-        "goal": parts[7].strip(),
-        "customer_outcome": parts[8].strip() if len(parts) > 8 else "",
-    }
+    board_ids: List[int]
+    fetch_stdout: str
+    fetch_stderr: str
+    push_stdout: str
+    push_stderr: str
 
 
-def goal_to_bullets(goal: str, max_items: int = 8) -> list[str]:
-    """
-    Heuristic bulleting: split on periods, semicolons, and ' - '.
-    """
-    g = (goal or "").strip()
-    if not g:
-        return []
+def memory_max_age() -> float:
+    """CHAT_MEMORY_MAX_AGE: seconds a conversation's last fetch is reused by follow-up turns (default 600)."""
+    return float(os.getenv("CHAT_MEMORY_MAX_AGE", "600"))
 
-    # Normalize separators
-    g = g.replace("\n", " ").replace("  ", " ")
-    chunks = re.split(r";\s*|\.\s+|\s-\s+", g)
-    chunks = [c.strip(" -•\t") for c in chunks if c.strip(" -•\t")]
 
-    # De-duplicate while preserving order
-    seen = set()
-    deduped = []
-    for c in chunks:
-        k = c.lower()
-        if k in seen:
-            continue
-        seen.add(k)
-        deduped.append(c)
+def _remembered(state: AgentState, ids: list[int]) -> list[SprintRecord] | None:
+    """This conversation's records for `ids`, if its last fetch covered them and is fresh enough."""
+    by_board = {r["board_id"]: r for r in state.get("last_records") or []}
+    if not ids or any(b not in by_board for b in ids):
+        return None
+    if time.time() - state.get("last_fetched_at", 0.0) > memory_max_age():
+        return None
+    return [SprintRecord.from_dict(by_board[b]) for b in ids]
 
-    return deduped[:max_items]
 
+class ConversationMemory(InMemorySaver):
+    """In-memory checkpointer bounded for long-lived processes (the apps, `serve`).
 
-def _fetch_outcomes_safe(scripts_dir: Path, sprint_id: str) -> list[str]:
-    """
-    fetch_customer_outcomes() signature can vary depending on local tools.py.
-    This wrapper supports both:
-      - fetch_customer_outcomes(scripts_dir, sprint_id)
-      - fetch_customer_outcomes(sprint_id)
+    Keeps only the latest checkpoint of each conversation, and forgets
+    conversations idle for `idle` seconds or beyond the `max_threads` most
+    recently used.
     """
-    try:
-        return fetch_customer_outcomes(scripts_dir, sprint_id)  # type: ignore[arg-type]
-    except TypeError:
-        try:
-            return fetch_customer_outcomes(sprint_id)  # type: ignore[call-arg]
-        except Exception:
-            return []
-    except Exception:
-        return []
-
-
-def format_summary(stdout: str, scripts_dir: Path | None = None, display_filter: str = "all") -> str:
-    rows = extract_preview_rows(stdout)
-    if not rows:
-        return strip_ansi(stdout).strip() or "No output."
-
-    items = [parse_row(r) for r in rows]
-
-    blocks: list[str] = []
-    for it in items:
-        title = f"**{it['board_name']} — {it['sprint_name']}**"
-        dates = f"📅 {it['start']} → {it['end']}"
 
-        # Sprint Goal
-        bullets = goal_to_bullets(it["goal"])
-        if bullets:
-            goal_body = "\n".join([f"  • {b}" for b in bullets])
-        else:
-            goal_body = "  • (No sprint goal found)"
-
-        # Customer Outcomes - use from CSV first, fallback to fetching
-        outcomes_body = ""
-        csv_outcome = it.get("customer_outcome", "").strip()
-        
-        if csv_outcome:
-            # Parse outcomes separated by " ; "
-            outcomes = [o.strip() for o in csv_outcome.split(" ; ") if o.strip()]
-            if outcomes:
-                outcomes_body = "\n".join([f"  • {o}" for o in outcomes[:8]])
-        elif scripts_dir is not None and it.get("sprint_id"):
-            # Fallback: fetch outcomes if not in CSV
-            outcomes = _fetch_outcomes_safe(scripts_dir, it["sprint_id"])
-            if outcomes:
-                outcomes_body = "\n".join([f"  • {o}" for o in outcomes[:8]])
-            else:
-                outcomes_body = "  • Not set on epics for this sprint"
-
-        # Build block based on display_filter
-        if display_filter == "goals_only":
-            block = f"""{title}
-{dates}
-
-📌 **Sprint Goal**
-{goal_body}
-"""
-        elif display_filter == "outcomes_only":
-            block = f"""{title}
-{dates}
-
-🎯 **Customer Outcome**
-{outcomes_body if outcomes_body else "  • Not specified"}
-"""
-        else:  # "all"
-            block = f"""{title}
-{dates}
-
-🎯 **Customer Outcome**
-{outcomes_body if outcomes_body else "  • Not specified"}
-
-📌 **Sprint Goal**
-{goal_body}
-"""
-        blocks.append(block)
-
-    return "\n---\n\n".join(blocks).strip()
-
-
-class AgentState(TypedDict, total=False):
-    messages: List[Any]
-
-    intent: Literal["fetch", "push", "list", "help"]
-    team_query: Optional[str]
-    miro_board_id: Optional[str]
-    display_filter: Optional[Literal["all", "goals_only", "outcomes_only"]]
+    def __init__(self, max_threads: int = 1000, idle: float = 3600):
+        super().__init__()
+        self.max_threads = max_threads
+        self.idle = idle
+        self._used: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.RLock()
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        with self._lock:
+            saved = super().put(config, checkpoint, metadata, new_versions)
+            thread_id = config["configurable"]["thread_id"]
+            self._keep_latest(thread_id, config["configurable"]["checkpoint_ns"], checkpoint)
+            self._used[thread_id] = time.monotonic()
+            self._used.move_to_end(thread_id)
+            self._evict()
+            return saved
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            super().delete_thread(thread_id)
+            self._used.pop(thread_id, None)
+
+    def _keep_latest(self, thread_id: str, ns: str, checkpoint) -> None:
+        checkpoints = self.storage[thread_id][ns]
+        for old in [c for c in checkpoints if c != checkpoint["id"]]:
+            del checkpoints[old]
+            self.writes.pop((thread_id, ns, old), None)
+        versions = checkpoint["channel_versions"]
+        stale = [k for k in self.blobs if k[0] == thread_id and k[1] == ns and versions.get(k[2]) != k[3]]
+        for k in stale:
+            del self.blobs[k]
+
+    def _evict(self) -> None:
+        cutoff = time.monotonic() - self.idle
+        while self._used:
+            thread_id, used = next(iter(self._used.items()))
+            if used >= cutoff and len(self._used) <= self.max_threads:
+                break
+            self.delete_thread(thread_id)
+
+
+def node_parse_intent(state: AgentState, board_ids_file: Path | None = None):
+    user = state["messages"][-1].content
 
-    board_ids: List[int]
-    fetch_stdout: str
-    fetch_stderr: str
-    push_stdout: str
-    push_stderr: str
+    # Deterministic fast path: skip the LLM round trip when the rules are confident.
+    teams = board_registry(board_ids_file).teams if board_ids_file else []
+    fast = classify(user, teams, follow_up=bool(state.get("last_board_ids")))
+    if fast is not None:
+        record("rules")
+        return fast
 
+    cache_key = intent_cache_key(user, llm_identifier(), board_ids_file)
+    cached = cached_intent(cache_key)
+    if cached is not None:
+        record("cache")
+        return cached
 
-def node_parse_intent(state: AgentState):
+    record("llm")
     llm = get_llm()
-    user = state["messages"][-1].content
 
     instruction = (
-        "Return ONLY JSON. Keys: intent (fetch|push|list|help), team_query (string|null), miro_board_id (string|null), display_filter (all|goals_only|outcomes_only). "
+        "Return ONLY JSON. Keys: intent (fetch|history|progress|push|list|help), team_query (string|null), miro_board_id (string|null), display_filter (all|goals_only|outcomes_only), sprints (integer|null). "
         "Rules: if user asks to push/post/update to miro -> push. "
         "If user asks to fetch/show/report sprint goals/details/outcomes -> fetch. "
+        "If user asks about past/closed sprints or how goals changed over time -> history, with sprints = how many sprints back (null if not said). "
+        "If user asks about sprint progress/completion/story points/issue status -> progress. "
         "If user asks to list teams/boards -> list. Otherwise help. "
         "For display_filter: if user asks for 'only goals' or 'just goals' or 'sprint goals only' -> goals_only. "
         "If user asks for 'only outcomes' or 'just outcomes' or 'customer outcomes only' -> outcomes_only. "
         "Otherwise -> all."
     )
-    resp = llm.invoke([HumanMessage(content=f"{instruction}\nUser: {user}")])
+    with span("llm.invoke", model=llm_identifier()):
+        resp = llm.invoke([HumanMessage(content=f"{instruction}\nUser: {user}")])
     text = resp.content.strip()
 
     m = re.search(r"\{[\s\S]*\}", text)
@@ -231,24 +159,31 @@ def node_parse_intent(state: AgentState):
         return {"intent": "help", "team_query": None, "miro_board_id": None, "display_filter": "all"}
 
     intent = data.get("intent")
-    if intent not in {"fetch", "push", "list", "help"}:
+    if intent not in {"fetch", "history", "progress", "push", "list", "help"}:
         intent = "help"
     
     display_filter = data.get("display_filter", "all")
     if display_filter not in {"all", "goals_only", "outcomes_only"}:
         display_filter = "all"
     
-    return {
+    parsed = {
         "intent": intent,
         "team_query": data.get("team_query"),
         "miro_board_id": data.get("miro_board_id"),
         "display_filter": display_filter,
+        "sprints": data.get("sprints") if isinstance(data.get("sprints"), int) and data["sprints"] > 0 else None,
     }
+    store_intent(cache_key, parsed)
+    return parsed
 
 
 def node_resolve_boards(state: AgentState, board_ids_file: Path):
     team_query = state.get("team_query")
 
+    # A follow-up without a team ("now only outcomes") stays on the last fetch's boards
+    if not team_query and state.get("last_board_ids"):
+        return {"board_ids": list(state["last_board_ids"])}
+
     # Normalize "all teams" requests
     if team_query:
         tq = team_query.strip().lower()
@@ -259,21 +194,63 @@ def node_resolve_boards(state: AgentState, board_ids_file: Path):
     return {"board_ids": ids}
 
 
-def node_fetch(state: AgentState, scripts_dir: Path):
+def node_fetch(state: AgentState, scripts_dir: Path, read_details: Callable[..., ToolResult] = read_sprint_details):
     ids = state.get("board_ids", [])
     if not ids:
         return {"fetch_stdout": "", "fetch_stderr": "No matching boards found. Try 'list teams'."}
 
-    r = fetch_sprint_details(scripts_dir, ids)
-
-    # PM-friendly output with optional filtering
+    # PM-friendly output with optional filtering; each board's block is
+    # streamed (stream_mode="custom") as soon as that board is fetched.
     display_filter = state.get("display_filter", "all")
-    pretty = format_summary(r.stdout, scripts_dir=scripts_dir, display_filter=display_filter)
+    writer = get_stream_writer()
+    blocks: dict[int, str] = {}
+
+    def on_record(rec: SprintRecord) -> None:
+        # Both fetch backends resolve Customer Outcomes, so no per-sprint lookup (scripts_dir=None):
+        # an empty list means there are none, and memory turns stay off the network.
+        blocks[rec.board_id] = format_block(rec, display_filter=display_filter)
+        writer({"board_id": rec.board_id, "board_block": blocks[rec.board_id]})
+
+    # Follow-up turns re-render this conversation's last fetch without any network calls
+    remembered = _remembered(state, ids)
+    if remembered is not None:
+        for rec in remembered:
+            on_record(rec)
+        return {"fetch_stdout": BLOCK_SEPARATOR.join(blocks[rec.board_id] for rec in remembered).strip(), "fetch_stderr": ""}
+
+    # Served from the warm snapshot when a refresher keeps it fresh
+    r = read_details(scripts_dir, ids, on_record=on_record)
+
+    if not r.records:
+        return {"fetch_stdout": strip_ansi(r.stdout).strip() or "No output.", "fetch_stderr": strip_ansi(r.stderr)}
+    return {
+        "fetch_stdout": BLOCK_SEPARATOR.join(blocks[rec.board_id] for rec in r.records).strip(),
+        "fetch_stderr": strip_ansi(r.stderr),
+        "last_records": [asdict(rec) for rec in r.records],
+        "last_board_ids": [rec.board_id for rec in r.records],
+        "last_fetched_at": time.time(),
+    }
+
+
+def node_history(state: AgentState, scripts_dir: Path):
+    ids = state.get("board_ids", [])
+    if not ids:
+        return {"fetch_stdout": "", "fetch_stderr": "No matching boards found. Try 'list teams'."}
+    # Local store only: closed sprints do not change, `history --backfill` keeps them current
+    r = read_sprint_history(scripts_dir, ids, last=state.get("sprints") or 6)
+    pretty = format_summary(r.records, display_filter=state.get("display_filter") or "all") if r.records else ""
+    return {"fetch_stdout": pretty, "fetch_stderr": r.stderr}
+
 
-    return {"fetch_stdout": pretty, "fetch_stderr": strip_ansi(r.stderr)}
+def node_progress(state: AgentState):
+    ids = state.get("board_ids", [])
+    if not ids:
+        return {"fetch_stdout": "", "fetch_stderr": "No matching boards found. Try 'list teams'."}
+    r = fetch_sprint_progress(ids)
+    return {"fetch_stdout": format_progress(r.progress) if r.progress else "", "fetch_stderr": strip_ansi(r.stderr)}
 
 
-def node_push(state: AgentState, scripts_dir: Path, default_miro_board_id: str | None):
+def node_push(state: AgentState, scripts_dir: Path, board_ids_file: Path, default_miro_board_id: str | None):
     miro_board_id = state.get("miro_board_id") or default_miro_board_id
     if not miro_board_id:
         return {"push_stdout": "", "push_stderr": "Missing Miro board id. Provide it or set MIRO_BOARD_ID."}
@@ -285,20 +262,26 @@ def node_push(state: AgentState, scripts_dir: Path, default_miro_board_id: str |
         team_filter = ""
     else:
         team_filter = team_query.strip()
-    
-    r = push_goals_to_miro(scripts_dir, miro_board_id, team_filter)
+
+    # "Push that to Miro": push what this conversation fetched, if it is fresh enough
+    ids = resolve_board_ids(board_ids_file, team_filter) if team_filter else state.get("last_board_ids") or []
+    remembered = _remembered(state, ids)
+    if remembered is not None:
+        r = push_goals_to_miro(scripts_dir, miro_board_id, records=remembered)
+    else:
+        r = push_goals_to_miro(scripts_dir, miro_board_id, team_filter)
     return {"push_stdout": r.stdout, "push_stderr": r.stderr}
 
 
 def node_list(state: AgentState, board_ids_file: Path):
-    boards = parse_board_ids(board_ids_file)
+    boards = board_registry(board_ids_file).teams
     lines = ["Teams/Boards:"] + [f"- {b.team}: {b.board_id}" for b in boards]
     return {"fetch_stdout": "\n".join(lines), "fetch_stderr": ""}
 
 
 def node_render(state: AgentState):
     intent = state.get("intent", "help")
-    if intent in {"fetch", "list"}:
+    if intent in {"fetch", "history", "progress", "list"}:
         msg = (state.get("fetch_stdout", "") + "\n" + state.get("fetch_stderr", "")).strip()
         return {"messages": state["messages"] + [AIMessage(content=msg or "No output.")]}
 
@@ -310,6 +293,8 @@ def node_render(state: AgentState):
         "Try:\n"
         "• Fetch sprint goals for all teams\n"
         "• Fetch sprint goals for Aqua\n"
+        "• Show sprint progress for Aqua\n"
+        "• How have Aqua's goals evolved over the last 6 sprints?\n"
         "• Push sprint goals to Miro board uXj...\n"
         "• List teams\n\n"
         "Required env vars: JIRA_USERNAME, JIRA_API_TOKEN, MIRO_TOKEN.\n"
@@ -318,14 +303,54 @@ def node_render(state: AgentState):
     return {"messages": state["messages"] + [AIMessage(content=help_text)]}
 
 
-def build_graph(*, scripts_dir: Path, board_ids_file: Path, default_miro_board_id: str | None):
+def stream_reply(graph, state: AgentState, thread_id: str | None = None) -> Iterator[str]:
+    """Run the graph and yield the reply in pieces that concatenate to the full text.
+
+    Fetches yield each board's block as soon as it is ready (completion order),
+    then any errors; other intents yield the final message in one piece.
+    With a checkpointer, `thread_id` names the conversation whose memory the
+    turn reads and updates; without one the turn is stateless and saves nothing.
+    """
+    config = None
+    if getattr(graph, "checkpointer", None) is not None:
+        if thread_id is None:
+            graph = graph.copy(update={"checkpointer": None})
+        else:
+            config = {"configurable": {"thread_id": thread_id}}
+    streamed = False
+    final: dict = {}
+    for mode, chunk in graph.stream(state, config, stream_mode=["custom", "values"]):
+        if mode == "custom" and "board_block" in chunk:
+            yield (BLOCK_SEPARATOR if streamed else "") + chunk["board_block"]
+            streamed = True
+        elif mode == "values":
+            final = chunk
+    if not streamed:
+        yield final["messages"][-1].content
+    elif final.get("fetch_stderr", "").strip():
+        yield "\n" + final["fetch_stderr"].strip()
+
+
+def build_graph(
+    *,
+    scripts_dir: Path,
+    board_ids_file: Path,
+    default_miro_board_id: str | None,
+    read_details: Callable[..., ToolResult] = read_sprint_details,
+    checkpointer: Any = None,
+):
+    """Compile the agent graph. `read_details` replaces read_sprint_details in the fetch node
+    (same signature), e.g. to share fetches between the prompts of a batch. A LangGraph
+    `checkpointer` keeps each conversation's state (and last fetch) between turns."""
     g = StateGraph(AgentState)
-    g.add_node("parse_intent", node_parse_intent)
-    g.add_node("resolve_boards", lambda s: node_resolve_boards(s, board_ids_file))
-    g.add_node("fetch", lambda s: node_fetch(s, scripts_dir))
-    g.add_node("push", lambda s: node_push(s, scripts_dir, default_miro_board_id))
-    g.add_node("list", lambda s: node_list(s, board_ids_file))
-    g.add_node("render", node_render)
+    g.add_node("parse_intent", traced("node.parse_intent")(lambda s: node_parse_intent(s, board_ids_file)))
+    g.add_node("resolve_boards", traced("node.resolve_boards")(lambda s: node_resolve_boards(s, board_ids_file)))
+    g.add_node("fetch", traced("node.fetch")(lambda s: node_fetch(s, scripts_dir, read_details)))
+    g.add_node("history", traced("node.history")(lambda s: node_history(s, scripts_dir)))
+    g.add_node("progress", traced("node.progress")(node_progress))
+    g.add_node("push", traced("node.push")(lambda s: node_push(s, scripts_dir, board_ids_file, default_miro_board_id)))
+    g.add_node("list", traced("node.list")(lambda s: node_list(s, board_ids_file)))
+    g.add_node("render", traced("node.render")(node_render))
 
     g.set_entry_point("parse_intent")
 
@@ -337,16 +362,20 @@ def build_graph(*, scripts_dir: Path, board_ids_file: Path, default_miro_board_i
         route,
         {
             "fetch": "resolve_boards",
+            "history": "resolve_boards",
+            "progress": "resolve_boards",
             "push": "push",
             "list": "list",
             "help": "render",
         },
     )
 
-    g.add_edge("resolve_boards", "fetch")
+    g.add_conditional_edges("resolve_boards", route, {"fetch": "fetch", "history": "history", "progress": "progress"})
     g.add_edge("fetch", "render")
+    g.add_edge("history", "render")
+    g.add_edge("progress", "render")
     g.add_edge("push", "render")
     g.add_edge("list", "render")
     g.add_edge("render", END)
 
-    return g.compile()
\ No newline at end of file
+    return g.compile(checkpointer=checkpointer)
\ No newline at end of file
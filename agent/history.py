@@ -0,0 +1,56 @@
+from __future__ import annotations
+from dataclasses import dataclass
+
+from .http import map_ordered
+from .jira import JiraClient, JiraError, attach_outcomes, sprint_record
+from .store import ReportStore
+
+
+@dataclass(frozen=True, slots=True)
+class Backfill:
+    """What one board's backfill added."""
+
+    board_id: int
+    board_name: str
+    added: int
+    total: int
+
+
+def backfill_board(client: JiraClient, store: ReportStore, board_id: int, start: int, workers: int = 1) -> Backfill:
+    """Fetch the board's closed sprints from offset `start` on and store them page by page.
+
+    Jira lists closed sprints oldest first, so the stored offset is where
+    sprints closed since the last backfill begin. Each page is saved with its
+    Customer Outcomes (looked up `workers` sprints at a time) before the next
+    is requested.
+    """
+    try:
+        board_name = client.board(board_id).get("name") or "Unknown"
+    except JiraError:
+        board_name = "Unknown"
+    position = start
+    try:
+        for sprints, next_start in client.iter_sprints(board_id, "closed", start_at=start):
+            records = [sprint_record(board_id, board_name, s) for s in sprints]
+            store.save_history(board_id, attach_outcomes(client, records, workers), position, next_start)
+            position = next_start
+    except JiraError:
+        pass  # keep what was saved; the next backfill resumes there
+    return Backfill(board_id=board_id, board_name=board_name, added=position - start, total=position)
+
+
+def backfill_history(
+    client: JiraClient, store: ReportStore, board_ids: list[int], workers: int | None = None
+) -> list[Backfill]:
+    """Backfill closed sprints of `board_ids` concurrently, each board resuming where it last stopped."""
+    workers = workers or client.config.max_workers
+    # Few boards: spend the spare workers on each board's outcome lookups instead.
+    per_board = max(1, workers // max(1, len(board_ids)))
+    cursors = store.history_cursors(board_ids)
+    return map_ordered(lambda b: backfill_board(client, store, b, cursors[b], per_board), board_ids, workers)
+
+
+def backfill_table(results: list[Backfill]) -> str:
+    lines = [f"{'Board':<28} {'New':>5} {'Stored':>7}"]
+    lines += [f"{r.board_name[:28]:<28} {r.added:>5} {r.total:>7}" for r in results]
+    return "\n".join(lines)
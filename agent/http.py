@@ -0,0 +1,81 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .metrics import carry_span
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def make_session(pool_size: int = 10) -> requests.Session:
+    """requests.Session with a keep-alive pool sized for `pool_size` concurrent calls."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def map_ordered(fn: Callable[[T], R], items: list[T], workers: int, name: str = "http") -> list[R]:
+    """Order-preserving map over a bounded thread pool; spans started in `fn` nest under the caller's."""
+    workers = min(workers, len(items))
+    if workers <= 1:
+        return [fn(i) for i in items]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name) as pool:
+        return list(pool.map(carry_span(fn), items))
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every worker talking to one API.
+
+    `pause()` empties the bucket until a deadline, so a single 429 with
+    Retry-After holds back all workers, not just the one that got it.
+    """
+
+    def __init__(self, rate: float, burst: int | None = None):
+        self.rate = rate
+        self.capacity = float(burst if burst is not None else max(1, int(rate)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self.rate <= 0:
+                    return
+                else:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            until = time.monotonic() + seconds
+            if until > self._paused_until:
+                self._paused_until = until
+                self._tokens = 0.0
+                self._updated = until
+
+
+def retry_after_seconds(response: requests.Response, attempt: int) -> float:
+    """Seconds to wait before retrying: Retry-After if the server sent one, else exponential backoff."""
+    value = response.headers.get("Retry-After", "")
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return min(30.0, 0.5 * (2 ** attempt))
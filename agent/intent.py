@@ -0,0 +1,196 @@
+from __future__ import annotations
+from functools import lru_cache
+from pathlib import Path
+import hashlib
+import json
+import os
+import re
+
+from .board_ids import TeamBoard
+from .cache import ResponseCache
+from .metrics import METRICS
+
+MIRO_BOARD_ID_RE = re.compile(r"(?<![\w=-])([A-Za-z0-9_-]{9,}=)")
+
+PUSH_VERBS = {"push", "post", "publish", "send", "sync", "upload"}
+FETCH_VERBS = {"fetch", "get", "show", "report", "pull", "give", "display", "see"}
+LIST_VERBS = {"list", "which"}
+FETCH_NOUNS = {"goal", "goals", "outcome", "outcomes", "detail", "details", "sprint", "sprints"}
+ALL_WORDS = {"all", "every", "everyone", "everybody"}
+# Words that carry no intent of their own; anything outside the known
+# vocabulary makes the prompt ambiguous and sends it to the LLM.
+FILLER = {
+    "a", "an", "the", "for", "of", "to", "on", "in", "into", "from", "with", "me", "us", "my", "our",
+    "please", "can", "could", "you", "i", "we", "want", "need", "would", "like", "what", "are", "is",
+    "current", "currently", "active", "latest", "now", "today", "this", "board", "boards", "team",
+    "teams", "miro", "customer", "only", "just", "and", "by", "id", "names", "available", "there",
+    "how", "much", "many", "have", "has", "been", "'s", "s",
+    "that", "it", "them", "those", "these", "again", "same", "but", "then", "instead", "too", "also",
+}
+
+GOALS_ONLY_RE = re.compile(r"\b(only|just)\s+(the\s+)?(sprint\s+)?goals?\b|\b(sprint\s+)?goals?\s+only\b")
+OUTCOMES_ONLY_RE = re.compile(r"\b(only|just)\s+(the\s+)?(customer\s+)?outcomes?\b|\b(customer\s+)?outcomes?\s+only\b")
+# History needs an explicit count ("over the last 6 sprints", "4 closed sprints") or a
+# clear word; "last sprint" or "what changed" alone are left to the LLM.
+SPRINT_COUNT_RE = re.compile(
+    r"\b(?:over\s+)?(?:the\s+)?(?:(?:last|past|previous)\s+)?(\d{1,3})\s+(?:closed\s+|past\s+|previous\s+)?sprints\b"
+)
+HISTORY_RE = re.compile(
+    r"\b(?:history|historical|trends?|evolved|evolve|evolution|over\s+time|(?:previous|past|closed)\s+sprints)\b"
+)
+# Progress only on progress-specific phrases; "done", "status" or "complete" alone are left to the LLM.
+PROGRESS_RE = re.compile(r"\b(?:progress|burndown|how\s+far\s+along|story\s+points|completion)\b")
+# Nouns that ask for the goals/outcomes themselves, which progress does not show.
+CONTENT_NOUNS = FETCH_NOUNS - {"sprint", "sprints"}
+
+
+def record(source: str) -> None:
+    """Count one parsed prompt as answered by "rules", the "cache" or the "llm".
+
+    Exported as the `intent_parses{source=...}` counter (--metrics-out, GET /metrics).
+    """
+    METRICS.inc("intent_parses", source=source if source in {"rules", "cache"} else "llm")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lower-case and collapse whitespace/trailing punctuation; Miro board ids keep their case."""
+    parts = MIRO_BOARD_ID_RE.split((prompt or "").strip())
+    # re.split with one group alternates text, id, text, ...
+    text = "".join(p if i % 2 else p.lower() for i, p in enumerate(parts))
+    return " ".join(text.split()).rstrip(" .!?")
+
+
+@lru_cache(maxsize=1)
+def intent_cache() -> ResponseCache | None:
+    """Process-wide LLM intent cache (.cache/intent_cache.sqlite), or None if INTENT_CACHE=off."""
+    if os.getenv("INTENT_CACHE", "on").lower() in {"off", "0", "false"}:
+        return None
+    default = Path(__file__).resolve().parents[1] / ".cache" / "intent_cache.sqlite"
+    return ResponseCache(Path(os.getenv("INTENT_CACHE_PATH", str(default))), max_bytes=1024 * 1024)
+
+
+def intent_cache_key(prompt: str, model_id: str, board_ids_file: Path | None) -> str:
+    """Keyed on the board file contents too, so editing board_ids.txt invalidates every entry."""
+    board_hash = ""
+    if board_ids_file is not None and board_ids_file.exists():
+        board_hash = hashlib.sha256(board_ids_file.read_bytes()).hexdigest()
+    return ResponseCache.make_key("intent", normalize_prompt(prompt), model_id, board_hash)
+
+
+def cached_intent(key: str) -> dict | None:
+    cache = intent_cache()
+    entry = cache.get(key) if cache is not None else None
+    return json.loads(entry.body) if entry is not None else None
+
+
+def store_intent(key: str, intent: dict) -> None:
+    cache = intent_cache()
+    if cache is not None:
+        cache.put(key, json.dumps(intent).encode())
+
+
+def _team_aliases(teams: list[TeamBoard]) -> dict[str, str]:
+    """Lower-cased name (with and without a trailing "Team") -> the name passed on as team_query."""
+    aliases: dict[str, str] = {}
+    for t in teams:
+        for alias in {t.team.strip().lower(), t.short_name.lower()}:
+            if alias:
+                aliases.setdefault(alias, t.short_name)
+    return aliases
+
+
+def classify(prompt: str, teams: list[TeamBoard], follow_up: bool = False) -> dict | None:
+    """Rule-based intent for unambiguous prompts; None means "ask the LLM".
+
+    Returns the same dict shape as the LLM path in graph.node_parse_intent;
+    "sprints" is the number of closed sprints a history question asks for.
+    A fetch, history or progress prompt without a team ("show it again") is only
+    classified as a `follow_up` to an earlier turn, whose boards it reuses.
+    """
+    text = (prompt or "").strip()
+    miro_ids = MIRO_BOARD_ID_RE.findall(text)
+    if len(miro_ids) > 1:
+        return None
+    lowered = MIRO_BOARD_ID_RE.sub(" ", text).lower()
+
+    sprints: int | None = None
+    count = SPRINT_COUNT_RE.search(lowered)
+    if count:
+        sprints = int(count[1])
+        lowered = lowered[:count.start()] + " " + lowered[count.end():]
+    history = bool(count) or bool(HISTORY_RE.search(lowered))
+    lowered = HISTORY_RE.sub(" ", lowered)
+
+    progress = bool(PROGRESS_RE.search(lowered))
+    lowered = PROGRESS_RE.sub(" ", lowered)
+
+    display_filter = "all"
+    goals_only = bool(GOALS_ONLY_RE.search(lowered))
+    outcomes_only = bool(OUTCOMES_ONLY_RE.search(lowered))
+    if goals_only and outcomes_only:
+        return None
+    if goals_only:
+        display_filter = "goals_only"
+    elif outcomes_only:
+        display_filter = "outcomes_only"
+
+    # Whole-word team matches, longest alias first so "Aqua Team" wins over "Aqua".
+    team_query: str | None = None
+    aliases = _team_aliases(teams)
+    for alias in sorted(aliases, key=len, reverse=True):
+        pattern = rf"(?<!\w){re.escape(alias)}(?!\w)"
+        if re.search(pattern, lowered):
+            if team_query is not None and team_query != aliases[alias]:
+                return None
+            team_query = aliases[alias]
+            lowered = re.sub(pattern, " ", lowered)
+
+    words = re.findall(r"[a-z0-9']+", lowered)
+    board_numbers = [w for w in words if w.isdigit()]
+    if len(board_numbers) > 1 or (board_numbers and team_query):
+        return None
+    if board_numbers:
+        team_query = board_numbers[0]
+
+    vocab = PUSH_VERBS | FETCH_VERBS | LIST_VERBS | FETCH_NOUNS | ALL_WORDS | FILLER | {"help"}
+    if any(w not in vocab and not w.isdigit() for w in words):
+        return None
+
+    ws = set(words)
+    wants_push = bool(ws & PUSH_VERBS) or (bool(miro_ids) and not ws & FETCH_VERBS)
+    wants_list = bool(ws & LIST_VERBS) or (
+        bool(ws & {"teams", "boards"}) and not ws & FETCH_NOUNS and not (history or progress) and not wants_push and team_query is None
+    )
+    wants_fetch = bool(ws & FETCH_VERBS) or bool(ws & FETCH_NOUNS) or team_query is not None
+
+    if wants_push and "miro" in ws | ({"miro"} if miro_ids else set()):
+        intent = "push"
+    elif wants_push:
+        return None
+    elif wants_list and not ws & FETCH_NOUNS and not (history or progress):
+        intent = "list"
+    elif history:
+        intent = "history"
+    elif progress and ws & CONTENT_NOUNS:
+        return None  # "progress of the goals" could be either
+    elif progress:
+        intent = "progress"
+    elif wants_fetch:
+        intent = "fetch"
+    elif ws <= {"help"} and ws:
+        intent = "help"
+    else:
+        return None
+
+    if intent in {"fetch", "history", "progress", "push"} and team_query is None and ws & ALL_WORDS:
+        team_query = "all teams"
+    if intent in {"fetch", "history", "progress"} and team_query is None and not follow_up:
+        return None
+
+    return {
+        "intent": intent,
+        "team_query": team_query if intent in {"fetch", "history", "progress", "push"} else None,
+        "miro_board_id": miro_ids[0] if miro_ids else None,
+        "display_filter": display_filter,
+        "sprints": sprints if intent == "history" else None,
+    }
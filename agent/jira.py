@@ -0,0 +1,537 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterator, Literal
+import copy
+import json
+import os
+import re
+import threading
+import time
+
+import requests
+
+from .cache import EpicOutcomeCache, ResponseCache, resource_kind
+from .http import TokenBucket, make_session, map_ordered, retry_after_seconds
+from .metrics import METRICS, Span, carry_span, current_span, span
+from .records import SprintRecord
+
+# Epic keys per JQL search; keeps the `key in (...)` URL well under server limits.
+SEARCH_BATCH = 100
+
+CacheMode = Literal["use", "revalidate", "refresh", "off"]
+
+
+class JiraError(RuntimeError):
+    def __init__(self, status: int, url: str):
+        super().__init__(f"Jira returned HTTP {status} for {url}")
+        self.status = status
+        self.url = url
+
+
+@dataclass(frozen=True)
+class JiraConfig:
+    url: str
+    username: str
+    api_token: str
+    outcome_field: str = ""
+    epic_link_field: str = ""
+    max_workers: int = 8
+    rate_limit: float = 10.0
+    max_retries: int = 5
+    cache_path: str = ""
+    cache_max_mb: int = 64
+    story_points_field: str = "customfield_10016"
+
+    @staticmethod
+    def from_env() -> "JiraConfig | None":
+        """Same variables as scripts/fetch_sprint_details.sh; None if credentials are missing.
+
+        JIRA_MAX_WORKERS caps concurrent board fetches and JIRA_RATE_LIMIT is the
+        shared request budget per second (0 disables the limiter). Responses are
+        cached in JIRA_CACHE_PATH (default .cache/jira_cache.sqlite) unless
+        JIRA_CACHE=off. STORY_POINTS_FIELD is the estimate field summed by
+        `progress` (default customfield_10016, "Story point estimate").
+        """
+        url = os.getenv("JIRA_URL", "").rstrip("/")
+        username = os.getenv("JIRA_USERNAME", "")
+        token = os.getenv("JIRA_API_TOKEN", "")
+        if not (url and username and token):
+            return None
+        return JiraConfig(
+            url=url,
+            username=username,
+            api_token=token,
+            outcome_field=os.getenv("CUSTOM_OUTCOME_FIELD", ""),
+            epic_link_field=os.getenv("EPIC_LINK_FIELD", ""),
+            max_workers=max(1, int(os.getenv("JIRA_MAX_WORKERS", "8"))),
+            rate_limit=float(os.getenv("JIRA_RATE_LIMIT", "10")),
+            cache_path="" if os.getenv("JIRA_CACHE", "on").lower() in {"off", "0", "false"} else os.getenv(
+                "JIRA_CACHE_PATH", str(Path(__file__).resolve().parents[1] / ".cache" / "jira_cache.sqlite")
+            ),
+            cache_max_mb=int(os.getenv("JIRA_CACHE_MAX_MB", "64")),
+            story_points_field=os.getenv("STORY_POINTS_FIELD", "customfield_10016"),
+        )
+
+    @property
+    def outcomes_enabled(self) -> bool:
+        return bool(self.outcome_field and self.epic_link_field)
+
+
+class JiraClient:
+    """Thin Jira Cloud client over one pooled, keep-alive HTTP session."""
+
+    def __init__(self, config: JiraConfig, session: requests.Session | None = None, timeout: float = 30):
+        self.config = config
+        self.timeout = timeout
+        self.session = session or make_session(pool_size=max(10, config.max_workers))
+        self.session.auth = (config.username, config.api_token)
+        self.session.headers.update({"Accept": "application/json"})
+        self.limiter = TokenBucket(config.rate_limit)
+        self.cache = (
+            ResponseCache(Path(config.cache_path), max_bytes=config.cache_max_mb * 1024 * 1024)
+            if config.cache_path
+            else None
+        )
+        # Customer Outcomes per epic, validated against the epic's `updated` field
+        self.epics = EpicOutcomeCache(Path(config.cache_path).with_name("epic_outcomes.sqlite")) if config.cache_path else None
+        self.cache_mode: CacheMode = "use"
+
+    def using(self, cache_mode: CacheMode) -> "JiraClient":
+        """A view of this client (same session, limiter and cache) with a different cache mode.
+
+        "use" serves fresh entries and revalidates stale ones, "revalidate" asks
+        Jira about every entry (a 304 costs no body), "refresh" always
+        re-downloads (and stores the result), "off" bypasses the cache.
+        """
+        view = copy.copy(self)
+        view.cache_mode = cache_mode
+        return view
+
+    def get_json(self, path: str, params: dict[str, Any] | None = None) -> dict:
+        with span(f"jira.{resource_kind(path)}") as s:
+            return self._get_json(path, params, s)
+
+    def _get_json(self, path: str, params: dict[str, Any] | None, s: Span) -> dict:
+        cache = self.cache if self.cache_mode != "off" else None
+        if cache is None:
+            s.attrs["cache"] = "off"
+            return _as_dict(self._get(path, params).json())
+
+        key = cache.make_key(self.config.url, self.config.username, path, json.dumps(params or {}, sort_keys=True))
+        entry = cache.get(key) if self.cache_mode in ("use", "revalidate") else None
+        headers = {}
+        if entry is not None:
+            if self.cache_mode == "use" and entry.age() < cache.ttl(resource_kind(path)):
+                s.attrs["cache"] = "hit"
+                return _as_dict(json.loads(entry.body))
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        r = self._get(path, params, headers)
+        if r.status_code == 304 and entry is not None:
+            s.attrs["cache"] = "revalidated"
+            cache.revalidated(key)
+            return _as_dict(json.loads(entry.body))
+        s.attrs["cache"] = "miss"
+        cache.put(key, r.content, r.headers.get("ETag", ""), r.headers.get("Last-Modified", ""))
+        return _as_dict(r.json())
+
+    def _get(self, path: str, params: dict[str, Any] | None, headers: dict[str, str] | None = None):
+        url = f"{self.config.url}{path}"
+        for attempt in range(self.config.max_retries + 1):
+            self.limiter.acquire()
+            r = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            METRICS.inc("http_requests", api="jira", status=r.status_code)
+            if (s := current_span()) is not None:
+                s.attrs.update(status=r.status_code, attempts=attempt + 1)
+            if r.status_code not in (429, 503) or attempt == self.config.max_retries:
+                break
+            self.limiter.pause(retry_after_seconds(r, attempt))
+        if r.status_code >= 400:
+            raise JiraError(r.status_code, url)
+        return r
+
+    def board(self, board_id: int) -> dict:
+        return self.get_json(f"/rest/agile/1.0/board/{board_id}")
+
+    def active_sprints(self, board_id: int) -> list[dict]:
+        data = self.get_json(f"/rest/agile/1.0/board/{board_id}/sprint", {"state": "active"})
+        return data.get("values") or []
+
+    def iter_sprints(
+        self, board_id: int, state: str = "closed", start_at: int = 0, page_size: int = 50
+    ) -> Iterator[tuple[list[dict], int]]:
+        """A board's sprints in `state`, oldest first, one page at a time from offset `start_at`.
+
+        Yields each page with the offset of the next one, so callers can
+        persist how far they got and resume there.
+        """
+        start = start_at
+        while True:
+            data = self.get_json(
+                f"/rest/agile/1.0/board/{board_id}/sprint",
+                {"state": state, "startAt": start, "maxResults": page_size},
+            )
+            values = data.get("values") or []
+            start += len(values)
+            if values:
+                yield values, start
+            if not values or data.get("isLast", True):
+                return
+
+    def sprint_issues(self, sprint_id: str, fields: list[str], page_size: int = 100) -> list[dict]:
+        return [issue for page in self.iter_sprint_issues(sprint_id, fields, page_size) for issue in page]
+
+    def iter_sprint_issues(self, sprint_id: str, fields: list[str], page_size: int = 100) -> Iterator[list[dict]]:
+        """Every issue of a sprint, one page at a time, following startAt until Jira reports the end.
+
+        Jira may return fewer than `page_size` issues per page (agile endpoints
+        often cap at 50), so the next page starts after what was actually returned.
+        """
+        start = 0
+        while True:
+            data = self.get_json(
+                f"/rest/agile/1.0/sprint/{sprint_id}/issue",
+                {"startAt": start, "maxResults": page_size, "fields": ",".join(fields)},
+            )
+            issues = data.get("issues") or []
+            if issues:
+                yield issues
+            start += len(issues)
+            total = data.get("total")
+            if not issues or data.get("isLast") is True or (isinstance(total, int) and start >= total):
+                return
+
+    def search(self, jql: str, fields: list[str], max_results: int = 100) -> list[dict]:
+        """All issues matching `jql`, following nextPageToken pagination."""
+        issues: list[dict] = []
+        params: dict[str, Any] = {"jql": jql, "fields": ",".join(fields), "maxResults": max_results}
+        while True:
+            data = self.get_json("/rest/api/3/search/jql", params)
+            issues += data.get("issues") or []
+            token = data.get("nextPageToken")
+            if data.get("isLast", True) or not token:
+                return issues
+            params["nextPageToken"] = token
+
+    def issue(self, key: str, fields: list[str]) -> dict:
+        return self.get_json(f"/rest/api/3/issue/{key}", {"fields": ",".join(fields)})
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def _as_dict(data: Any) -> dict:
+    return data if isinstance(data, dict) else {}
+
+
+@lru_cache(maxsize=4)
+def shared_client(config: JiraConfig) -> JiraClient:
+    """One client per config for the life of the process, so connections stay warm across calls."""
+    return JiraClient(config)
+
+
+def adf_to_text(node: Any) -> str:
+    """Flatten an Atlassian Document Format node to plain text."""
+    if node is None:
+        return ""
+    if isinstance(node, str):
+        return node
+    if isinstance(node, list):
+        return "\n".join([adf_to_text(x) for x in node if x]).strip()
+    if isinstance(node, dict):
+        t = node.get("type")
+        if t == "text":
+            return node.get("text", "")
+        parts = [adf_to_text(c) for c in (node.get("content") or [])]
+        parts = [p for p in parts if p]
+        if t in ("paragraph", "heading"):
+            return "\n".join(parts).strip()
+        return "".join(parts).strip()
+    return ""
+
+
+def field_text(raw: Any) -> str:
+    if isinstance(raw, dict) and raw.get("type") == "doc":
+        return adf_to_text(raw).strip()
+    return str(raw or "").strip()
+
+
+def epic_keys(issues: list[dict], epic_link_field: str) -> list[str]:
+    keys: set[str] = set()
+    for it in issues:
+        f = it.get("fields") or {}
+        parent = f.get("parent") or {}
+        if parent.get("key"):
+            keys.add(parent["key"])
+        el = f.get(epic_link_field)
+        if isinstance(el, str) and el.strip():
+            keys.add(el.strip())
+        epic_obj = it.get("epic") or {}
+        if isinstance(epic_obj, dict) and epic_obj.get("key"):
+            keys.add(epic_obj["key"])
+    return sorted(keys)
+
+
+def sprint_epic_keys(client: JiraClient, sprint_id: str) -> list[str]:
+    try:
+        issues = client.sprint_issues(sprint_id, ["parent", client.config.epic_link_field])
+    except JiraError:
+        return []
+    return epic_keys(issues, client.config.epic_link_field)
+
+
+def epic_outcomes(client: JiraClient, keys: list[str], workers: int | None = None) -> dict[str, str]:
+    """Customer Outcome text per epic key, whitespace-collapsed; epics without one are omitted.
+
+    Resolved with one `key in (...)` JQL search per SEARCH_BATCH keys that
+    asks only for the outcome field, instead of one GET per epic. With the
+    epic cache (JIRA_CACHE on), epics already known are first checked in bulk
+    against their `updated` field, at most once per "search" TTL, and only
+    new or changed epics are downloaded and converted again.
+    """
+    field = client.config.outcome_field
+    keys = list(dict.fromkeys(keys))
+    workers = workers or client.config.max_workers
+    epics = client.epics if client.cache_mode != "off" else None
+    if epics is None:
+        return {k: text for k, (_, text) in _search_outcomes(client, keys, workers).items() if text}
+
+    # The epic cache decides what is fresh, so its Jira calls skip the response cache.
+    live = client.using("off")
+    site = client.config.url
+    known = epics.get_many(site, field, keys) if client.cache_mode == "use" else {}
+    recheck_after = client.cache.ttl("search") if client.cache is not None else 0.0
+    due = [k for k, e in known.items() if time.time() - e.checked_at >= recheck_after]
+    changed: set[str] = set()
+    if due:
+        current = {
+            it.get("key", ""): str((it.get("fields") or {}).get("updated") or "")
+            for it in _search(live, due, ["updated"], workers)
+        }
+        changed = {k for k in due if current.get(k) != known[k].updated}
+        epics.touch(site, field, [k for k in due if k not in changed])
+
+    stale = [k for k in keys if k not in known or k in changed]
+    downloaded = _search_outcomes(live, stale, workers) if stale else {}
+    epics.put_many(site, field, downloaded)
+    METRICS.inc("epic_outcomes", len(keys) - len(stale), result="cached")
+    METRICS.inc("epic_outcomes", len(stale), result="downloaded")
+
+    out = {k: e.outcome for k, e in known.items() if k not in changed and e.outcome}
+    out.update((k, text) for k, (_, text) in downloaded.items() if text)
+    return out
+
+
+def _search_outcomes(client: JiraClient, keys: list[str], workers: int) -> dict[str, tuple[str, str]]:
+    """epic key -> (updated, outcome text) for the epics Jira returns."""
+    field = client.config.outcome_field
+    out: dict[str, tuple[str, str]] = {}
+    for it in _search(client, keys, [field, "updated"], workers):
+        fields = it.get("fields") or {}
+        out[it.get("key", "")] = (str(fields.get("updated") or ""), " ".join(field_text(fields.get(field)).split()))
+    return out
+
+
+def _search(client: JiraClient, keys: list[str], fields: list[str], workers: int) -> list[dict]:
+    """Issues for `keys` via batched `key in (...)` searches, asking only for `fields`."""
+    chunks = [keys[i:i + SEARCH_BATCH] for i in range(0, len(keys), SEARCH_BATCH)]
+
+    def resolve(chunk: list[str]) -> list[dict]:
+        jql = "key in ({})".format(",".join(f'"{k}"' for k in chunk))
+        try:
+            return client.search(jql, fields, max_results=len(chunk))
+        except JiraError:
+            # A key the user cannot see fails the whole JQL; fall back to per-epic reads.
+            found = []
+            for k in chunk:
+                try:
+                    found.append(client.issue(k, fields))
+                except JiraError:
+                    continue
+            return found
+
+    return [it for issues in map_ordered(resolve, chunks, workers) for it in issues]
+
+
+def _join_outcomes(keys: list[str], by_epic: dict[str, str]) -> list[str]:
+    outcomes: list[str] = []
+    for k in keys:
+        text = by_epic.get(k)
+        if text and text not in outcomes:
+            outcomes.append(text)
+    return outcomes
+
+
+def sprint_outcomes(client: JiraClient, sprint_id: str) -> list[str]:
+    """Customer Outcomes of the epics linked to a sprint, whitespace-collapsed and de-duplicated."""
+    if not client.config.outcomes_enabled:
+        return []
+    keys = sprint_epic_keys(client, sprint_id)
+    return _join_outcomes(keys, epic_outcomes(client, keys))
+
+
+def attach_outcomes(
+    client: JiraClient, records: list[SprintRecord], workers: int | None = None
+) -> list[SprintRecord]:
+    """Records with the Customer Outcomes of every active sprint filled in.
+
+    Epic keys are collected across all sprints first, so an epic shared by
+    several boards is looked up once.
+    """
+    if not client.config.outcomes_enabled:
+        return records
+    workers = workers or client.config.max_workers
+    sprinted = [i for i, rec in enumerate(records) if rec.has_sprint]
+    keys_per_record = map_ordered(lambda i: sprint_epic_keys(client, records[i].sprint_id), sprinted, workers)
+    by_epic = epic_outcomes(client, [k for keys in keys_per_record for k in keys], workers)
+    out = list(records)
+    for i, keys in zip(sprinted, keys_per_record):
+        out[i] = replace(records[i], outcomes=tuple(_join_outcomes(keys, by_epic)))
+    return out
+
+
+def _normalize_goal(text: str) -> str:
+    # Replace newlines with " | " for Excel compatibility
+    return re.sub(r"\s*\n+\s*", " | ", (text or "").strip())
+
+
+def _date_part(value: str | None) -> str:
+    return (value or "").split("T")[0]
+
+
+def _active_sprints_or_empty(client: JiraClient, board_id: int) -> list[dict]:
+    try:
+        return client.active_sprints(board_id)
+    except JiraError:
+        return []
+
+
+def _sprint_record(board_id: int, board_name: str, sprints: list[dict]) -> SprintRecord:
+    if not sprints:
+        return SprintRecord.no_active_sprint(board_id, board_name)
+    return sprint_record(board_id, board_name, sprints[0])
+
+
+def sprint_record(board_id: int, board_name: str, s: dict) -> SprintRecord:
+    """Record of one sprint as returned by the agile sprint endpoints; outcomes are left empty."""
+    return SprintRecord(
+        board_id=board_id,
+        board_name=board_name,
+        sprint_id=str(s.get("id") or ""),
+        sprint_name=s.get("name") or "",
+        sprint_state=s.get("state") or "",
+        start=_date_part(s.get("startDate")),
+        end=_date_part(s.get("endDate")),
+        goal=_normalize_goal(s.get("goal") or ""),
+    )
+
+
+def board_record(client: JiraClient, board_id: int, sprints: list[dict] | None = None) -> SprintRecord:
+    """A board's first active sprint, or a "No Active Sprint" placeholder.
+
+    Pass `sprints` when the board's active sprints were already fetched.
+    Outcomes are left empty; see attach_outcomes().
+    """
+    try:
+        board_name = client.board(board_id).get("name") or "Unknown"
+    except JiraError:
+        board_name = "Unknown"
+    if sprints is None:
+        sprints = _active_sprints_or_empty(client, board_id)
+    return _sprint_record(board_id, board_name, sprints)
+
+
+def fetch_records(client: JiraClient, board_ids: list[int], workers: int | None = None) -> list[SprintRecord]:
+    """Records for `board_ids`, fetched concurrently but returned in the given order."""
+    workers = workers or client.config.max_workers
+    records = map_ordered(lambda b: board_record(client, b), board_ids, workers)
+    return attach_outcomes(client, records, workers)
+
+
+def iter_records(client: JiraClient, board_ids: list[int], workers: int | None = None) -> Iterator[SprintRecord]:
+    """Each board's record, Customer Outcomes included, as soon as that board is done.
+
+    Records arrive in completion order, so the first one costs a single
+    board's latency rather than the whole fetch. Epics shared between boards
+    are still looked up once per call.
+    """
+    workers = max(1, min(workers or client.config.max_workers, len(board_ids)))
+    by_epic: dict[str, str] = {}
+    # One lookup per epic: the first board to need it resolves it, the others wait for it.
+    lookups: dict[str, threading.Event] = {}
+    lock = threading.Lock()
+
+    def fetch(board_id: int) -> SprintRecord:
+        rec = board_record(client, board_id)
+        if not (client.config.outcomes_enabled and rec.has_sprint):
+            return rec
+        keys = sprint_epic_keys(client, rec.sprint_id)
+        with lock:
+            mine = [k for k in dict.fromkeys(keys) if k not in lookups]
+            done = threading.Event()
+            lookups.update((k, done) for k in mine)
+            theirs = {lookups[k] for k in keys} - {done}
+        try:
+            found = epic_outcomes(client, mine, 1) if mine else {}
+            with lock:
+                by_epic.update(found)
+        finally:
+            done.set()
+        for event in theirs:
+            event.wait()
+        with lock:
+            return replace(rec, outcomes=tuple(_join_outcomes(keys, by_epic)))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jira") as pool:
+        futures = [pool.submit(carry_span(fetch), b) for b in board_ids]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def fetch_records_incremental(
+    client: JiraClient,
+    board_ids: list[int],
+    previous: dict[int, SprintRecord],
+    workers: int | None = None,
+) -> tuple[list[SprintRecord], list[int]]:
+    """Like fetch_records, but boards whose active sprint is unchanged since `previous` are carried forward.
+
+    Only the active-sprint list is requested for every board; the sprint id,
+    name, state, dates and goal act as its update marker. Board metadata and
+    Customer Outcomes are re-fetched only for boards that changed. Returns the
+    records and the ids of the boards that were skipped.
+    """
+    workers = workers or client.config.max_workers
+    # The probe must see changes made within the sprint TTL, so it always asks Jira (conditionally)
+    probe = client.using("revalidate") if client.cache_mode == "use" else client
+    probes = map_ordered(lambda b: _active_sprints_or_empty(probe, b), board_ids, workers)
+
+    records: list[SprintRecord | None] = []
+    changed: list[int] = []
+    skipped: list[int] = []
+    for i, (board_id, sprints) in enumerate(zip(board_ids, probes)):
+        prev = previous.get(board_id)
+        if prev is not None and prev.board_name != "Unknown":
+            current = _sprint_record(board_id, prev.board_name, sprints)
+            if replace(current, outcomes=prev.outcomes) == prev:
+                records.append(prev)
+                skipped.append(board_id)
+                continue
+        records.append(None)
+        changed.append(i)
+
+    fresh = map_ordered(lambda i: board_record(client, board_ids[i], probes[i]), changed, workers)
+    fresh = attach_outcomes(client, fresh, workers)
+    for i, rec in zip(changed, fresh):
+        records[i] = rec
+    return [r for r in records if r is not None], skipped
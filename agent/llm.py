@@ -1,7 +1,36 @@
 from __future__ import annotations
 import os
+import threading
+
+_clients: dict[tuple, object] = {}
+_clients_lock = threading.Lock()
+
+def llm_identifier() -> str:
+    """"provider:model" of the chat model get_llm() would build, without building it."""
+    if os.getenv("GITHUB_TOKEN") and not os.getenv("OPENAI_API_KEY"):
+        return f"github:{os.getenv('GITHUB_MODEL', 'gpt-4o-mini')}"
+    if os.getenv("OPENAI_API_KEY"):
+        return f"openai:{os.getenv('OPENAI_MODEL', 'gpt-4.1-mini')}"
+    if os.getenv("ANTHROPIC_API_KEY"):
+        return f"anthropic:{os.getenv('ANTHROPIC_MODEL', 'claude-3-5-sonnet-latest')}"
+    return "none"
 
 def get_llm():
+    """Chat model for the current environment, built once per configuration and then reused
+    (one HTTP pool per process instead of one per call). See _build_llm for the providers.
+    """
+    key = (
+        llm_identifier(),
+        os.getenv("GITHUB_TOKEN"),
+        os.getenv("OPENAI_API_KEY"),
+        os.getenv("ANTHROPIC_API_KEY"),
+    )
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = _build_llm()
+        return _clients[key]
+
+def _build_llm():
     """Create a chat model based on environment variables.
 
     - GitHub Models: GITHUB_TOKEN (optional GITHUB_MODEL) - FREE
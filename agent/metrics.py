@@ -0,0 +1,202 @@
+from __future__ import annotations
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Callable, Iterator, TypeVar
+import json
+import threading
+import time
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass
+class Span:
+    """One timed operation; children are the spans started while it was current."""
+
+    name: str
+    attrs: dict[str, Any]
+    start: float
+    duration: float = 0.0
+    error: bool = False
+    children: list["Span"] = field(default_factory=list)
+
+
+_current: ContextVar[Span | None] = ContextVar("sprint_agent_span", default=None)
+_children_lock = threading.Lock()
+
+
+class Metrics:
+    """Process-wide span latency histograms and labelled counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: dict[str, list[int]] = defaultdict(lambda: [0] * (len(BUCKETS) + 1))
+        self._sums: dict[str, float] = defaultdict(float)
+        self._errors: dict[str, int] = defaultdict(int)
+        self._counters: dict[tuple[str, tuple[tuple[str, str], ...]], float] = defaultdict(float)
+
+    def observe(self, name: str, seconds: float, error: bool = False) -> None:
+        index = next((i for i, bound in enumerate(BUCKETS) if seconds <= bound), len(BUCKETS))
+        with self._lock:
+            self._buckets[name][index] += 1
+            self._sums[name] += seconds
+            if error:
+                self._errors[name] += 1
+
+    def inc(self, counter: str, amount: float = 1, **labels: Any) -> None:
+        key = (counter, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self._counters[key] += amount
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._sums.clear()
+            self._errors.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> dict:
+        """Plain-data view: per-span count/sum/errors/cumulative buckets, and the counters."""
+        with self._lock:
+            spans = {}
+            for name, counts in sorted(self._buckets.items()):
+                cumulative, running = {}, 0
+                for bound, n in zip([*map(str, BUCKETS), "+Inf"], counts):
+                    running += n
+                    cumulative[bound] = running
+                spans[name] = {
+                    "count": running,
+                    "sum": round(self._sums[name], 6),
+                    "errors": self._errors.get(name, 0),
+                    "buckets": cumulative,
+                }
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+        return {"spans": spans, "counters": counters}
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        snap = self.snapshot()
+        lines = [
+            "# HELP sprint_agent_span_seconds Duration of graph nodes, HTTP calls and subprocesses.",
+            "# TYPE sprint_agent_span_seconds histogram",
+        ]
+        for name, s in snap["spans"].items():
+            label = f'span="{_escape(name)}"'
+            for bound, n in s["buckets"].items():
+                lines.append(f'sprint_agent_span_seconds_bucket{{{label},le="{bound}"}} {n}')
+            lines.append(f"sprint_agent_span_seconds_sum{{{label}}} {s['sum']}")
+            lines.append(f"sprint_agent_span_seconds_count{{{label}}} {s['count']}")
+        lines += [
+            "# HELP sprint_agent_span_errors_total Spans that ended with an exception.",
+            "# TYPE sprint_agent_span_errors_total counter",
+        ]
+        for name, s in snap["spans"].items():
+            lines.append(f'sprint_agent_span_errors_total{{span="{_escape(name)}"}} {s["errors"]}')
+        typed: set[str] = set()
+        for c in snap["counters"]:
+            metric = f"sprint_agent_{c['name']}_total"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            labels = ",".join(f'{k}="{_escape(v)}"' for k, v in c["labels"].items())
+            lines.append(f"{metric}{{{labels}}} {c['value']:g}" if labels else f"{metric} {c['value']:g}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+METRICS = Metrics()
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Span]:
+    """Time the block as a span nested under the current one and record it in METRICS."""
+    parent = _current.get()
+    s = Span(name=name, attrs=attrs, start=time.perf_counter())
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException:
+        s.error = True
+        raise
+    finally:
+        s.duration = time.perf_counter() - s.start
+        _current.reset(token)
+        if parent is not None:
+            with _children_lock:
+                parent.children.append(s)
+        METRICS.observe(name, s.duration, s.error)
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorator form of span()."""
+
+    def decorate(fn: F) -> F:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def carry_span(fn: F) -> F:
+    """Bind `fn` to the caller's current span, so spans it opens on pool threads nest under it."""
+    parent = _current.get()
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _current.set(parent)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+
+    return wrapper  # type: ignore[return-value]
+
+
+def render_tree(root: Span, min_seconds: float = 0.0) -> str:
+    """Indented timing tree; sibling spans with the same name are merged into one line."""
+    lines = [f"{root.name:<48} {root.duration * 1000:>10.1f} ms"]
+
+    def walk(children: list[Span], prefix: str) -> None:
+        groups: dict[str, list[Span]] = {}
+        for child in sorted(children, key=lambda c: c.start):
+            groups.setdefault(child.name, []).append(child)
+        shown = [(n, g) for n, g in groups.items() if sum(c.duration for c in g) >= min_seconds]
+        for i, (name, group) in enumerate(shown):
+            last = i == len(shown) - 1
+            total = sum(c.duration for c in group)
+            label = f"{prefix}{'└─ ' if last else '├─ '}{name}"
+            if len(group) == 1:
+                attrs = " ".join(f"{k}={v}" for k, v in group[0].attrs.items())
+                detail = f"{total * 1000:>10.1f} ms  {attrs}".rstrip()
+            else:
+                slowest = max(c.duration for c in group)
+                detail = f"{total * 1000:>10.1f} ms  ×{len(group)}, max {slowest * 1000:.1f} ms"
+            errors = sum(c.error for c in group)
+            lines.append(f"{label:<48} {detail}{f'  ({errors} failed)' if errors else ''}")
+            walk([gc for c in group for gc in c.children], prefix + ("   " if last else "│  "))
+
+    walk(root.children, "")
+    return "\n".join(lines)
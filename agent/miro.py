@@ -0,0 +1,292 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+
+from .http import TokenBucket, make_session, map_ordered, retry_after_seconds
+from .metrics import METRICS, span
+from .records import SprintRecord
+
+MIRO_API_BASE = "https://api.miro.com/v2"
+
+# Card grid on the Miro board
+CARD_WIDTH = 500
+CARD_HEIGHT = 450
+CARD_COLUMNS = 4
+CARD_GAP = 50
+
+
+def bullets_text(text: str) -> str:
+    text = (text or "").strip()
+    if not text:
+        return "  • Not specified"
+    parts = [p.strip() for p in text.replace(" ; ", ";").split(";") if p.strip()]
+    if not parts:
+        parts = [text]
+    return "\n".join([f"  • {p}" for p in parts])
+
+
+def card_title(rec: SprintRecord) -> str:
+    """Card face text; all content goes in the title so it shows without opening the card."""
+    outcomes = "\n".join(f"  • {o}" for o in rec.outcomes) or "  • Not specified"
+    return (
+        f"<b>{rec.board_name}</b>\n"
+        f"━━━━━━━━━━━━━━━━━━━━━━\n\n"
+        f"🧩 Sprint: {rec.sprint_name}\n"
+        f"📅 State: {rec.sprint_state}\n"
+        f"📆 Dates: {rec.start} → {rec.end}\n\n"
+        f"📌 Sprint Goal\n"
+        f"{bullets_text(rec.goal)}\n\n"
+        f"🎯 Customer Outcome\n"
+        f"{outcomes}"
+    )
+
+
+def card_payloads(records: Iterable[SprintRecord], team_filter: str = "") -> Iterator[tuple[str, dict]]:
+    """(team name, POST /cards payload) per record; see card_items()."""
+    for rec, payload in card_items(records, team_filter):
+        yield rec.board_name, payload
+
+
+def card_items(records: Iterable[SprintRecord], team_filter: str = "") -> Iterator[tuple[SprintRecord, dict]]:
+    """(record, POST /cards payload) per record, laid out in a grid.
+
+    `team_filter` is a case-insensitive substring of the board name.
+    """
+    team_filter = (team_filter or "").strip().lower()
+    index = 0
+    for rec in records:
+        if not rec.board_name:
+            continue
+        if team_filter and team_filter not in rec.board_name.lower():
+            continue
+        payload = {
+            "data": {"title": card_title(rec)},
+            "position": {
+                "x": (index % CARD_COLUMNS) * (CARD_WIDTH + CARD_GAP),
+                "y": (index // CARD_COLUMNS) * (CARD_HEIGHT + CARD_GAP),
+            },
+            "geometry": {"width": CARD_WIDTH},
+        }
+        yield rec, payload
+        index += 1
+
+
+@dataclass(frozen=True)
+class MiroConfig:
+    token: str
+    api_base: str = MIRO_API_BASE
+    max_workers: int = 8
+    rate_limit: float = 10.0
+    max_retries: int = 5
+
+    @staticmethod
+    def from_env() -> "MiroConfig | None":
+        """MIRO_TOKEN (required), MIRO_API_BASE, MIRO_MAX_WORKERS, MIRO_RATE_LIMIT (req/s, 0 = unlimited)."""
+        token = os.getenv("MIRO_TOKEN", "")
+        if not token:
+            return None
+        return MiroConfig(
+            token=token,
+            api_base=os.getenv("MIRO_API_BASE", MIRO_API_BASE).rstrip("/"),
+            max_workers=max(1, int(os.getenv("MIRO_MAX_WORKERS", "8"))),
+            rate_limit=float(os.getenv("MIRO_RATE_LIMIT", "10")),
+        )
+
+
+@dataclass(frozen=True)
+class CardResult:
+    title: str
+    ok: bool
+    status: int
+    item_id: str = ""
+    error: str = ""
+    action: str = "create"  # create | update | unchanged | delete
+
+
+class MiroClient:
+    """Miro REST v2 client over one pooled, keep-alive HTTP session."""
+
+    def __init__(self, config: MiroConfig, session: requests.Session | None = None, timeout: float = 30):
+        self.config = config
+        self.timeout = timeout
+        self.session = session or make_session(pool_size=max(10, config.max_workers))
+        self.session.headers.update({"Authorization": f"Bearer {config.token}", "Accept": "application/json"})
+        self.limiter = TokenBucket(config.rate_limit)
+
+    def request(self, method: str, path: str, payload: dict | None = None) -> requests.Response:
+        """Send one request, retrying 429 and 5xx responses with Retry-After or exponential backoff."""
+        url = f"{self.config.api_base}{path}"
+        with span(f"miro.{method.lower()}") as s:
+            for attempt in range(self.config.max_retries + 1):
+                self.limiter.acquire()
+                r = self.session.request(method, url, json=payload, timeout=self.timeout)
+                METRICS.inc("http_requests", api="miro", status=r.status_code)
+                s.attrs.update(status=r.status_code, attempts=attempt + 1)
+                if (r.status_code != 429 and r.status_code < 500) or attempt == self.config.max_retries:
+                    return r
+                self.limiter.pause(retry_after_seconds(r, attempt))
+            return r
+
+    def create_card(self, board_id: str, title: str, payload: dict) -> CardResult:
+        try:
+            r = self.request("POST", f"/boards/{board_id}/cards", payload)
+        except requests.RequestException as e:
+            return CardResult(title=title, ok=False, status=0, error=str(e))
+        if r.status_code != 201:
+            return CardResult(title=title, ok=False, status=r.status_code, error=r.text[:500])
+        return CardResult(title=title, ok=True, status=r.status_code, item_id=str(_json(r).get("id", "")))
+
+    def update_card(self, board_id: str, item_id: str, title: str, payload: dict) -> CardResult:
+        """PATCH the card's content in place; position and size are left as the user arranged them."""
+        try:
+            r = self.request("PATCH", f"/boards/{board_id}/cards/{item_id}", {"data": payload["data"]})
+        except requests.RequestException as e:
+            return CardResult(title=title, ok=False, status=0, item_id=item_id, error=str(e), action="update")
+        ok = r.status_code == 200
+        return CardResult(title=title, ok=ok, status=r.status_code, item_id=item_id,
+                          error="" if ok else r.text[:500], action="update")
+
+    def delete_item(self, board_id: str, item_id: str, title: str = "") -> CardResult:
+        try:
+            r = self.request("DELETE", f"/boards/{board_id}/items/{item_id}")
+        except requests.RequestException as e:
+            return CardResult(title=title, ok=False, status=0, item_id=item_id, error=str(e), action="delete")
+        ok = r.status_code in (204, 404)
+        return CardResult(title=title, ok=ok, status=r.status_code, item_id=item_id,
+                          error="" if ok else r.text[:500], action="delete")
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def _json(r: requests.Response) -> dict[str, Any]:
+    try:
+        data = r.json()
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+@lru_cache(maxsize=4)
+def shared_client(config: MiroConfig) -> MiroClient:
+    return MiroClient(config)
+
+
+def normalize_board_id(board_id: str) -> str:
+    # Board ids copied from some URLs carry a leading "-"
+    return (board_id or "").strip().lstrip("-")
+
+
+def push_cards(
+    client: MiroClient, board_id: str, cards: Iterable[tuple[str, dict]], workers: int | None = None
+) -> list[CardResult]:
+    """Create every card concurrently (at most `workers` in flight); results keep the input order."""
+    return map_ordered(lambda c: client.create_card(board_id, *c), list(cards), workers or client.config.max_workers)
+
+
+def content_hash(payload: dict) -> str:
+    return hashlib.sha256(json.dumps(payload["data"], sort_keys=True).encode()).hexdigest()
+
+
+class CardIndex:
+    """Which Miro item holds the card for each (Miro board, Jira board, sprint), and what it last showed."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS miro_cards ("
+            " miro_board TEXT NOT NULL, board_id INTEGER NOT NULL, sprint_id TEXT NOT NULL,"
+            " item_id TEXT NOT NULL, content_hash TEXT NOT NULL, updated_at REAL NOT NULL,"
+            " PRIMARY KEY (miro_board, board_id, sprint_id))"
+        )
+
+    def cards(self, miro_board: str) -> dict[tuple[int, str], tuple[str, str]]:
+        """(board id, sprint id) -> (item id, content hash) for one Miro board."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT board_id, sprint_id, item_id, content_hash FROM miro_cards WHERE miro_board = ?",
+                (miro_board,),
+            ).fetchall()
+        return {(b, s): (item, h) for b, s, item, h in rows}
+
+    def put(self, miro_board: str, board_id: int, sprint_id: str, item_id: str, digest: str) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO miro_cards VALUES (?, ?, ?, ?, ?, ?)",
+                (miro_board, board_id, sprint_id, item_id, digest, time.time()),
+            )
+
+    def remove(self, miro_board: str, board_id: int, sprint_id: str) -> None:
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM miro_cards WHERE miro_board = ? AND board_id = ? AND sprint_id = ?",
+                (miro_board, board_id, sprint_id),
+            )
+
+
+@lru_cache(maxsize=4)
+def card_index(path: Path) -> CardIndex:
+    return CardIndex(path)
+
+
+def sync_cards(
+    client: MiroClient,
+    index: CardIndex,
+    board_id: str,
+    items: Iterable[tuple[SprintRecord, dict]],
+    delete_stale: bool = False,
+    workers: int | None = None,
+) -> list[CardResult]:
+    """Make the Miro board match `items` with as few writes as possible.
+
+    Cards whose rendered content is unchanged are skipped, changed ones are
+    PATCHed, new ones POSTed. With `delete_stale`, cards from earlier sprints
+    of the pushed Jira boards are deleted. Results keep the input order,
+    followed by deletions.
+    """
+    known = index.cards(board_id)
+    items = list(items)
+    pushed = {(rec.board_id, rec.sprint_id) for rec, _ in items}
+
+    def apply(item: tuple[SprintRecord, dict]) -> CardResult:
+        rec, payload = item
+        key = (rec.board_id, rec.sprint_id)
+        digest = content_hash(payload)
+        prev = known.get(key)
+        if prev is not None and prev[1] == digest:
+            return CardResult(title=rec.board_name, ok=True, status=0, item_id=prev[0], action="unchanged")
+        result = client.update_card(board_id, prev[0], rec.board_name, payload) if prev is not None else None
+        if result is None or result.status == 404:
+            # New card, or the old one was removed on the board
+            result = client.create_card(board_id, rec.board_name, payload)
+        if result.ok:
+            index.put(board_id, rec.board_id, rec.sprint_id, result.item_id, digest)
+        return result
+
+    def delete(key: tuple[int, str]) -> CardResult:
+        result = client.delete_item(board_id, known[key][0], title=f"Board {key[0]} sprint {key[1]}")
+        if result.ok:
+            index.remove(board_id, *key)
+        return result
+
+    stale = []
+    if delete_stale:
+        pushed_boards = {b for b, _ in pushed}
+        stale = [k for k in known if k[0] in pushed_boards and k not in pushed]
+
+    workers = workers or client.config.max_workers
+    return map_ordered(apply, items, workers) + map_ordered(delete, stale, workers)
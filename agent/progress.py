@@ -0,0 +1,162 @@
+from __future__ import annotations
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterable
+
+from .http import map_ordered
+from .jira import JiraClient, JiraError, _active_sprints_or_empty, _date_part
+
+# Jira status categories: "new" (To Do), "indeterminate" (In Progress), "done".
+CATEGORIES = ("new", "indeterminate", "done")
+
+
+@dataclass(frozen=True, slots=True)
+class SprintProgress:
+    """Status and story-point totals of one active sprint."""
+
+    board_id: int
+    board_name: str
+    sprint_id: str = ""
+    sprint_name: str = ""
+    end: str = ""
+    issues: int = 0
+    todo: int = 0
+    in_progress: int = 0
+    done: int = 0
+    points: float = 0.0
+    points_done: float = 0.0
+    unestimated: int = 0
+    statuses: tuple[tuple[str, int], ...] = ()
+    error: str = ""  # why the totals are incomplete: a page of issues could not be read
+
+    @property
+    def has_sprint(self) -> bool:
+        return bool(self.sprint_id)
+
+    @property
+    def incomplete(self) -> bool:
+        return bool(self.error)
+
+    @property
+    def completion(self) -> float:
+        """Share of story points done, or of issues done when nothing is estimated."""
+        if self.points:
+            return self.points_done / self.points
+        return self.done / self.issues if self.issues else 0.0
+
+
+class _Tally:
+    """Running totals folded page by page, so memory does not grow with the sprint."""
+
+    def __init__(self, points_field: str):
+        self.points_field = points_field
+        self.categories: Counter[str] = Counter()
+        self.statuses: Counter[str] = Counter()
+        self.points = 0.0
+        self.points_done = 0.0
+        self.unestimated = 0
+
+    def add_page(self, issues: list[dict]) -> None:
+        fields = [it.get("fields") or {} for it in issues]
+        status = [f.get("status") or {} for f in fields]
+        category = [(s.get("statusCategory") or {}).get("key", "new") for s in status]
+        estimate = [_points(f.get(self.points_field)) for f in fields]
+
+        self.categories.update(category)
+        self.statuses.update(s.get("name") or "Unknown" for s in status)
+        self.points += sum(p for p in estimate if p is not None)
+        self.points_done += sum(p for p, c in zip(estimate, category) if p is not None and c == "done")
+        self.unestimated += estimate.count(None)
+
+    def result(self, board_id: int, board_name: str, sprint: dict, error: str = "") -> SprintProgress:
+        return SprintProgress(
+            board_id=board_id,
+            board_name=board_name,
+            sprint_id=str(sprint.get("id", "")),
+            sprint_name=sprint.get("name", ""),
+            end=_date_part(sprint.get("endDate")),
+            issues=sum(self.categories.values()),
+            todo=self.categories["new"],
+            in_progress=self.categories["indeterminate"],
+            done=self.categories["done"],
+            points=self.points,
+            points_done=self.points_done,
+            unestimated=self.unestimated,
+            statuses=tuple(self.statuses.most_common()),
+            error=error,
+        )
+
+
+def _points(raw) -> float | None:
+    if isinstance(raw, (int, float)) and not isinstance(raw, bool):
+        return float(raw)
+    return None
+
+
+def sprint_progress(client: JiraClient, board_id: int, board_name: str, sprint: dict) -> SprintProgress:
+    """Aggregate every issue of `sprint`, streamed page by page.
+
+    If a page cannot be read, the totals so far come back marked incomplete (`error`).
+    """
+    tally = _Tally(client.config.story_points_field)
+    try:
+        for page in client.iter_sprint_issues(str(sprint["id"]), ["status", client.config.story_points_field]):
+            tally.add_page(page)
+    except JiraError as e:
+        return tally.result(board_id, board_name, sprint, error=str(e))
+    return tally.result(board_id, board_name, sprint)
+
+
+def board_progress(client: JiraClient, board_id: int) -> list[SprintProgress]:
+    """Progress of every active sprint of a board (not just the first), or a no-sprint placeholder."""
+    try:
+        board_name = client.board(board_id).get("name") or "Unknown"
+    except JiraError:
+        board_name = "Unknown"
+    sprints = _active_sprints_or_empty(client, board_id)
+    if not sprints:
+        return [SprintProgress(board_id=board_id, board_name=board_name)]
+    return [sprint_progress(client, board_id, board_name, s) for s in sprints]
+
+
+def fetch_progress(client: JiraClient, board_ids: list[int], workers: int | None = None) -> list[SprintProgress]:
+    """Progress rows for `board_ids`, fetched concurrently and returned in the given order."""
+    per_board = map_ordered(lambda b: board_progress(client, b), board_ids, workers or client.config.max_workers)
+    return [row for rows in per_board for row in rows]
+
+
+def progress_table(rows: Iterable[SprintProgress]) -> str:
+    """Plain-text table for the CLI."""
+    lines = [f"{'Board':<28} {'Sprint':<24} {'Issues':>6} {'To Do':>6} {'Doing':>6} {'Done':>6} {'Points':>13} {'Complete':>8}"]
+    for r in rows:
+        if not r.has_sprint:
+            lines.append(f"{r.board_name[:28]:<28} {'(no active sprint)':<24}")
+            continue
+        points = f"{r.points_done:g}/{r.points:g}"
+        lines.append(
+            f"{r.board_name[:28]:<28} {r.sprint_name[:24]:<24} {r.issues:>6} {r.todo:>6} {r.in_progress:>6}"
+            f" {r.done:>6} {points:>13} {r.completion:>8.0%}"
+            + ("  incomplete" if r.incomplete else "")
+        )
+    return "\n".join(lines)
+
+
+def format_progress(rows: Iterable[SprintProgress]) -> str:
+    """Markdown blocks for chat, one per sprint."""
+    blocks = []
+    for r in rows:
+        if not r.has_sprint:
+            blocks.append(f"**{r.board_name}**\n  • No active sprint\n")
+            continue
+        bar = "█" * round(r.completion * 10) + "░" * (10 - round(r.completion * 10))
+        points = f"{r.points_done:g} of {r.points:g} points" if r.points else "no estimates"
+        statuses = ", ".join(f"{name} {n}" for name, n in r.statuses[:6])
+        blocks.append(
+            f"**{r.board_name} — {r.sprint_name}**\n"
+            f"📈 {bar} {r.completion:.0%} ({points}; ends {r.end or 'n/a'})\n\n"
+            f"  • {r.done} done, {r.in_progress} in progress, {r.todo} to do ({r.issues} issues)\n"
+            f"  • {statuses or 'No issues'}\n"
+            + (f"  • {r.unestimated} issue(s) without an estimate\n" if r.points and r.unestimated else "")
+            + (f"  • ⚠ Incomplete: only {r.issues} issue(s) could be read ({r.error})\n" if r.incomplete else "")
+        )
+    return "\n---\n\n".join(blocks).strip()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Iterable, Mapping
+import csv
+
+CSV_HEADER = [
+    "Board ID",
+    "Board Name",
+    "Sprint ID",
+    "Sprint Name",
+    "Sprint State",
+    "Start Date",
+    "End Date",
+    "Sprint Goal",
+    "Customer Outcome",
+]
+
+NO_ACTIVE_SPRINT = "No Active Sprint"
+OUTCOME_SEPARATOR = " ; "
+
+
+@dataclass(frozen=True, slots=True)
+class SprintRecord:
+    """One board's sprint as fetched from Jira; the unit every consumer works on."""
+
+    board_id: int
+    board_name: str
+    sprint_id: str = ""
+    sprint_name: str = ""
+    sprint_state: str = ""
+    start: str = ""
+    end: str = ""
+    goal: str = ""
+    outcomes: tuple[str, ...] = ()
+
+    @property
+    def has_sprint(self) -> bool:
+        return bool(self.sprint_id)
+
+    @staticmethod
+    def no_active_sprint(board_id: int, board_name: str) -> "SprintRecord":
+        return SprintRecord(board_id=board_id, board_name=board_name, goal=NO_ACTIVE_SPRINT)
+
+    @staticmethod
+    def from_dict(data: Mapping) -> "SprintRecord":
+        """Record from its dataclasses.asdict() / JSON form (outcomes may be a list)."""
+        return SprintRecord(**{**data, "outcomes": tuple(data.get("outcomes") or ())})
+
+    def to_row(self) -> list[str]:
+        """Row in the Sprint_Goals CSV schema (CSV_HEADER)."""
+        return [
+            str(self.board_id),
+            self.board_name,
+            self.sprint_id,
+            self.sprint_name,
+            self.sprint_state,
+            self.start,
+            self.end,
+            self.goal,
+            OUTCOME_SEPARATOR.join(self.outcomes),
+        ]
+
+    @staticmethod
+    def from_row(row: Mapping[str, str]) -> "SprintRecord | None":
+        """Record from a csv.DictReader row (BOM-tolerant); None for rows without a board."""
+        r = {(k or "").lstrip("\ufeff").strip(): (v or "").strip() for k, v in row.items()}
+        board_id = r.get("Board ID", "")
+        if not board_id.isdigit():
+            return None
+        outcome = r.get("Customer Outcome", "")
+        return SprintRecord(
+            board_id=int(board_id),
+            board_name=r.get("Board Name", ""),
+            sprint_id=r.get("Sprint ID", ""),
+            sprint_name=r.get("Sprint Name", ""),
+            sprint_state=r.get("Sprint State", ""),
+            start=r.get("Start Date", ""),
+            end=r.get("End Date", ""),
+            goal=r.get("Sprint Goal", ""),
+            outcomes=tuple(o.strip() for o in outcome.split(OUTCOME_SEPARATOR) if o.strip()),
+        )
+
+
+def to_csv(records: Iterable[SprintRecord], f: IO[str]) -> None:
+    w = csv.writer(f)
+    w.writerow(CSV_HEADER)
+    w.writerows(r.to_row() for r in records)
+
+
+def write_csv(records: Iterable[SprintRecord], reports_dir: Path, path: Path | None = None) -> Path:
+    """Write records as CSV to `path` (default reports/Sprint_Goals_<timestamp>.csv)."""
+    if path is None:
+        path = reports_dir / f"Sprint_Goals_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        to_csv(records, f)
+    return path
+
+
+def read_csv(path: Path) -> list[SprintRecord]:
+    with open(path, newline="", encoding="utf-8") as f:
+        return [rec for rec in map(SprintRecord.from_row, csv.DictReader(f)) if rec is not None]
+
+
+def latest_csv(reports_dir: Path) -> Path | None:
+    """Most recent Sprint_Goals_*.csv; the timestamped names sort chronologically."""
+    if not reports_dir.exists():
+        return None
+    csvs = sorted(reports_dir.glob("Sprint_Goals_*.csv"), reverse=True)
+    return csvs[0] if csvs else None
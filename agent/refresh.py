@@ -0,0 +1,197 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Callable, Iterable
+import os
+import random
+import threading
+import time
+
+from .board_ids import resolve_board_ids
+from .records import SprintRecord
+from .store import report_store
+from .tools import ToolResult, fetch_sprint_details
+
+# Seconds between sweeps of every board, and the +/- share of it added as jitter
+# so several refreshers (or restarts) do not hit Jira in lock-step.
+DEFAULT_INTERVAL = 15 * 60
+DEFAULT_JITTER = 0.1
+
+
+def refresh_interval() -> float:
+    return float(os.getenv("REFRESH_INTERVAL", str(DEFAULT_INTERVAL)))
+
+
+def snapshot_max_age() -> float:
+    """How old the stored snapshot may be and still be served (SNAPSHOT_MAX_AGE; 0 = always fetch live).
+
+    Defaults to 1.5 sweep intervals while a background refresher runs in this process.
+    """
+    value = os.getenv("SNAPSHOT_MAX_AGE")
+    if value is not None:
+        return float(value)
+    return 1.5 * refresh_interval() if running_scheduler() is not None else 0.0
+
+
+def fresh_snapshot(reports_dir: Path, board_ids: list[int], max_age: float) -> list[SprintRecord] | None:
+    """The stored records of `board_ids`, or None unless every board has one newer than `max_age` seconds."""
+    if max_age <= 0 or not board_ids:
+        return None
+    stored = report_store(reports_dir).latest_snapshot(dict.fromkeys(board_ids))
+    now = time.time()
+    if len(stored) < len(set(board_ids)) or any(now - s.fetched_at > max_age for s in stored):
+        return None
+    return [s.record for s in stored]
+
+
+class RefreshScheduler:
+    """Keeps the report store's snapshot of every board in board_ids.txt warm.
+
+    Sweeps all boards every `interval` seconds (+/- `jitter`), `batch` boards
+    at a time. Boards passed to request() are refreshed before the rest of
+    the current sweep.
+    """
+
+    def __init__(
+        self,
+        scripts_dir: Path,
+        board_ids_file: Path,
+        interval: float = DEFAULT_INTERVAL,
+        jitter: float = DEFAULT_JITTER,
+        batch: int = 8,
+        log: Callable[[str], None] | None = None,
+    ):
+        self.scripts_dir = scripts_dir
+        self.board_ids_file = board_ids_file
+        self.interval = interval
+        self.jitter = jitter
+        self.batch = max(1, batch)
+        self.log = log or (lambda _msg: None)
+        self._cond = threading.Condition()
+        self._priority: list[tuple[list[int], threading.Event]] = []
+        self._stopped = False
+        self._thread: threading.Thread | None = None
+
+    def request(self, board_ids: Iterable[int]) -> threading.Event:
+        """Queue a refresh of `board_ids` ahead of the sweep; the event is set once it is stored."""
+        done = threading.Event()
+        with self._cond:
+            self._priority.append((list(board_ids), done))
+            self._cond.notify()
+        return done
+
+    def refresh_now(self, board_ids: Iterable[int], timeout: float | None = None) -> bool:
+        return self.request(board_ids).wait(timeout)
+
+    def start(self) -> "RefreshScheduler":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="sprint-refresh", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+    def run(self, sweeps: int | None = None) -> None:
+        """Refresh until stop() (or until `sweeps` sweeps have completed)."""
+        pending: list[int] = []
+        next_sweep = time.monotonic()
+        completed = 0
+        while True:
+            with self._cond:
+                while not self._stopped and not self._priority and not pending and time.monotonic() < next_sweep:
+                    self._cond.wait(next_sweep - time.monotonic())
+                if self._stopped:
+                    return
+                job = self._priority.pop(0) if self._priority else None
+
+            if job is not None:
+                ids, done = job
+                self._refresh(ids, "priority")
+                pending = [b for b in pending if b not in ids]
+                done.set()
+            else:
+                if not pending:
+                    pending = resolve_board_ids(self.board_ids_file) if self.board_ids_file.exists() else []
+                    delay = self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+                    next_sweep = time.monotonic() + delay
+                    self.log(f"Sweep of {len(pending)} board(s); next in {delay:.0f}s")
+                chunk, pending = pending[: self.batch], pending[self.batch:]
+                self._refresh(chunk, "sweep")
+                if not pending:
+                    completed += 1
+                    if sweeps is not None and completed >= sweeps:
+                        return
+
+    def _refresh(self, board_ids: list[int], reason: str) -> None:
+        if not board_ids:
+            return
+        started = time.perf_counter()
+        try:
+            r = fetch_sprint_details(self.scripts_dir, board_ids, cache_mode="refresh")
+        except Exception as e:  # keep the refresher alive; the next sweep retries
+            self.log(f"{reason}: boards {board_ids} failed: {e}")
+            return
+        status = "ok" if r.ok else f"failed: {(r.stderr or '').strip()[:200]}"
+        self.log(f"{reason}: boards {board_ids} {status} ({time.perf_counter() - started:.1f}s)")
+
+
+_running: RefreshScheduler | None = None
+_running_lock = threading.Lock()
+
+
+def start_background_refresh(scripts_dir: Path, board_ids_file: Path) -> RefreshScheduler | None:
+    """Start this process's refresher thread once, if REFRESH_BACKGROUND=on."""
+    global _running
+    if os.getenv("REFRESH_BACKGROUND", "off").lower() not in {"on", "1", "true"}:
+        return None
+    with _running_lock:
+        if _running is None:
+            _running = RefreshScheduler(
+                scripts_dir,
+                board_ids_file,
+                interval=refresh_interval(),
+                jitter=float(os.getenv("REFRESH_JITTER", str(DEFAULT_JITTER))),
+            ).start()
+        return _running
+
+
+def running_scheduler() -> RefreshScheduler | None:
+    return _running
+
+
+def read_sprint_details(
+    scripts_dir: Path,
+    board_ids: list[int],
+    on_record: Callable[[SprintRecord], None] | None = None,
+    force: bool = False,
+    timeout: float = 120,
+) -> ToolResult:
+    """Sprint records for `board_ids`, from the warm snapshot when it is fresh enough.
+
+    Otherwise (or with `force`) the boards are refreshed now: through this
+    process's refresher as a priority request when one runs, else with a
+    direct fetch. Records served from the snapshot keep `board_ids` order.
+    """
+    reports_dir = scripts_dir.parent / "reports"
+    max_age = snapshot_max_age()
+    records = None if force else fresh_snapshot(reports_dir, board_ids, max_age)
+    source = "snapshot"
+    if records is None:
+        scheduler = running_scheduler()
+        if scheduler is None or not scheduler.refresh_now(board_ids, timeout):
+            return fetch_sprint_details(scripts_dir, board_ids, on_record=on_record)
+        records = fresh_snapshot(reports_dir, board_ids, max(max_age, timeout))
+        source = "priority refresh"
+        if records is None:
+            return fetch_sprint_details(scripts_dir, board_ids, on_record=on_record)
+
+    for rec in records if on_record is not None else ():
+        on_record(rec)
+    stored = report_store(reports_dir).latest_snapshot(dict.fromkeys(board_ids))
+    age = time.time() - min(s.fetched_at for s in stored)
+    stdout = f"Served {len(records)} board(s) from the {source} (data {age:.0f}s old)\n"
+    return ToolResult(ok=True, stdout=stdout, stderr="", returncode=0, records=records)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Mapping
+import os
+import threading
+
+from dotenv import load_dotenv
+
+from .config import Settings
+
+# Environment variables that change what the graph or its clients talk to.
+_ENV_PREFIXES = ("JIRA_", "MIRO_", "OPENAI_", "ANTHROPIC_", "GITHUB_", "CUSTOM_OUTCOME_FIELD", "EPIC_LINK_FIELD")
+
+
+class Resources:
+    """Process-wide objects for one configuration; see get_resources()."""
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+
+    @cached_property
+    def graph(self) -> Any:
+        """Compiled LangGraph, built on first use so non-chat callers never import LangGraph.
+
+        Conversations are checkpointed in memory, so a follow-up turn on the same
+        thread id sees the previous turn's state (see stream_reply).
+        """
+        from .graph import ConversationMemory, build_graph
+
+        return build_graph(
+            scripts_dir=self.settings.scripts_dir,
+            board_ids_file=self.settings.board_ids_file,
+            default_miro_board_id=self.settings.default_miro_board_id,
+            checkpointer=ConversationMemory(),
+        )
+
+
+_lock = threading.Lock()
+_file_stamp: tuple | None = None
+_current: tuple[tuple, Resources] | None = None
+
+
+def _stamp(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _env_values() -> tuple:
+    return tuple(sorted((k, v) for k, v in os.environ.items() if k.startswith(_ENV_PREFIXES)))
+
+
+def get_resources(repo_root: Path, secrets: Mapping[str, Any] | None = None) -> Resources:
+    """Settings and compiled graph shared by every caller in this process.
+
+    `.env` is re-read only when it changes on disk; everything is rebuilt when
+    `.env`, `board_ids.txt` or any Jira/Miro/LLM environment variable changes.
+    `secrets` (e.g. st.secrets) fill in variables the environment does not set.
+    """
+    global _file_stamp, _current
+    with _lock:
+        files = (_stamp(repo_root / ".env"), _stamp(repo_root / "board_ids.txt"))
+        if files != _file_stamp:
+            load_dotenv(dotenv_path=repo_root / ".env", override=True)
+            if secrets is not None:
+                for key, value in secrets.items():
+                    if isinstance(value, str):
+                        os.environ.setdefault(key, value)
+            _file_stamp = files
+
+        fingerprint = (files, _env_values())
+        if _current is not None and _current[0] == fingerprint:
+            return _current[1]
+
+        resources = Resources(settings=Settings.load(repo_root))
+        _current = (fingerprint, resources)
+        return resources
@@ -0,0 +1,308 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, replace
+from functools import cached_property, partial
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable
+from urllib.parse import urlsplit
+import asyncio
+import json
+import os
+import time
+
+from .board_ids import board_registry
+from .metrics import METRICS, span
+from .records import SprintRecord
+from .refresh import read_sprint_details, start_background_refresh
+from .resources import get_resources
+from .tools import ToolResult, push_goals_to_miro
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8787
+# Seconds a finished fetch is served to later identical requests without asking Jira again.
+DEFAULT_FRESHNESS = 30.0
+
+_PATHS = {"/health", "/teams", "/metrics", "/fetch", "/push", "/chat"}
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class FetchCoalescer:
+    """Singleflight over read_sprint_details, keyed by board set.
+
+    Concurrent requests for the same boards await one in-flight fetch, and a
+    finished fetch answers identical requests for `freshness` seconds. A
+    `force` request skips the freshness window but still joins a forced fetch
+    already in flight. Runs on one event loop, so no locks are needed.
+
+    Fetches run on their own `executor` (default: a small private pool), never
+    on the loop's default executor: graph threads there block waiting on them.
+    """
+
+    def __init__(
+        self,
+        scripts_dir: Path,
+        freshness: float,
+        read: Callable[..., ToolResult] = read_sprint_details,
+        executor: ThreadPoolExecutor | None = None,
+    ):
+        self.scripts_dir = scripts_dir
+        self.freshness = freshness
+        self._read = read
+        self._executor = executor or ThreadPoolExecutor(max_workers=4, thread_name_prefix="service-fetch")
+        self._inflight: dict[tuple[frozenset[int], bool], asyncio.Future] = {}
+        self._fresh: dict[frozenset[int], tuple[float, ToolResult]] = {}
+
+    async def fetch(self, board_ids: list[int], force: bool = False) -> tuple[ToolResult, str, float]:
+        """The boards' records in `board_ids` order, how they were obtained ("fetched", "shared" or "fresh"), and their age."""
+        boards = frozenset(board_ids)
+        self._prune()
+        hit = self._fresh.get(boards)
+        if not force and hit is not None and time.monotonic() - hit[0] < self.freshness:
+            source, (finished, r) = "fresh", hit
+        else:
+            key = (boards, force)
+            task = self._inflight.get(key)
+            source = "shared"
+            if task is None:
+                source = "fetched"
+                task = self._inflight[key] = asyncio.get_running_loop().run_in_executor(
+                    self._executor, partial(self._read, self.scripts_dir, list(board_ids), force=force)
+                )
+                task.add_done_callback(lambda t: self._finished(key, t))
+            r = await asyncio.shield(task)
+            finished = self._fresh.get(boards, (time.monotonic(), r))[0]
+        METRICS.inc("service_fetches", source=source)
+        by_board = {rec.board_id: rec for rec in r.records}
+        records = [by_board[b] for b in board_ids if b in by_board]
+        return replace(r, records=records), source, time.monotonic() - finished
+
+    def _finished(self, key: tuple[frozenset[int], bool], task: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is None and task.result().ok:
+            self._prune()
+            self._fresh[key[0]] = (time.monotonic(), task.result())
+
+    def _prune(self) -> None:
+        """Forget results past the freshness window, so board sets requested once do not pile up."""
+        cutoff = time.monotonic() - self.freshness
+        for boards in [b for b, (finished, _) in self._fresh.items() if finished < cutoff]:
+            del self._fresh[boards]
+
+
+class AgentService:
+    """Minimal asyncio HTTP/1.1 JSON API over the agent.
+
+        GET  /health, /teams, /metrics
+        POST /fetch  {"team": "Aqua" | "board_ids": [...], "refresh": false}
+        POST /push   {"miro_board_id": "...", "team": "", "sync": null, "delete_stale": false, "records": null}
+        POST /chat   {"prompt": "...", "thread_id": null}  -> NDJSON stream of {"text": ...} pieces
+
+    Blocking work runs on thread pools of `workers` each: one for chats (the
+    graph), one for fetches and the loop's default one for pushes. Chat
+    threads wait on fetches, so sharing a pool with them would deadlock once
+    `workers` chats were fetching at the same time.
+    Chats sent with the same thread_id share conversation memory.
+    """
+
+    def __init__(self, repo_root: Path, freshness: float = DEFAULT_FRESHNESS, workers: int = 16):
+        self.repo_root = repo_root
+        self.settings = get_resources(repo_root).settings
+        self.workers = workers
+        self.fetches = FetchCoalescer(
+            self.settings.scripts_dir,
+            freshness,
+            executor=ThreadPoolExecutor(max_workers=workers, thread_name_prefix="service-fetch"),
+        )
+        self._chats = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="service-chat")
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self._push_locks: dict[str, asyncio.Lock] = {}
+
+    @cached_property
+    def graph(self) -> Any:
+        """Compiled once; its fetch node goes through the same coalescer as POST /fetch."""
+        from .graph import ConversationMemory, build_graph
+
+        return build_graph(
+            scripts_dir=self.settings.scripts_dir,
+            board_ids_file=self.settings.board_ids_file,
+            default_miro_board_id=self.settings.default_miro_board_id,
+            read_details=self._read_from_graph,
+            checkpointer=ConversationMemory(),
+        )
+
+    def _read_from_graph(
+        self, scripts_dir: Path, board_ids: list[int], on_record: Callable[[SprintRecord], None] | None = None
+    ) -> ToolResult:
+        # Called on a worker thread by the fetch node
+        r, _, _ = asyncio.run_coroutine_threadsafe(self.fetches.fetch(board_ids), self.loop).result()
+        for rec in r.records if on_record is not None else ():
+            on_record(rec)
+        return r
+
+    # -- endpoints -------------------------------------------------------
+
+    def _board_ids(self, body: dict) -> list[int]:
+        if body.get("board_ids"):
+            return [int(b) for b in body["board_ids"]]
+        team = body.get("team") or None
+        if team and team.strip().lower() in {"all", "all teams"}:
+            team = None
+        return board_registry(self.settings.board_ids_file).resolve(team)
+
+    async def fetch(self, body: dict) -> tuple[int, dict]:
+        ids = self._board_ids(body)
+        if not ids:
+            return 404, {"ok": False, "stderr": "No matching boards found."}
+        r, source, age = await self.fetches.fetch(ids, force=bool(body.get("refresh")))
+        return 200, {**_result_json(r), "source": source, "age": round(age, 3)}
+
+    async def push(self, body: dict) -> tuple[int, dict]:
+        miro_board_id = body.get("miro_board_id") or self.settings.default_miro_board_id
+        if not miro_board_id:
+            return 400, {"ok": False, "stderr": "Missing miro_board_id (or MIRO_BOARD_ID)."}
+        records = [SprintRecord.from_dict(r) for r in body["records"]] if body.get("records") is not None else None
+        # One push per Miro board at a time, so syncs never race on the same cards
+        async with self._push_locks.setdefault(miro_board_id, asyncio.Lock()):
+            r = await asyncio.to_thread(
+                push_goals_to_miro,
+                self.settings.scripts_dir,
+                miro_board_id,
+                body.get("team") or "",
+                records=records,
+                sync=body.get("sync"),
+                delete_stale=bool(body.get("delete_stale")),
+            )
+        return 200, _result_json(r)
+
+    async def chat(self, body: dict) -> AsyncIterator[dict]:
+        from langchain_core.messages import HumanMessage
+
+        from .graph import stream_reply
+
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        def run() -> None:
+            try:
+                state = {"messages": [HumanMessage(content=str(body.get("prompt", "")))]}
+                for piece in stream_reply(self.graph, state, thread_id=body.get("thread_id")):
+                    self.loop.call_soon_threadsafe(queue.put_nowait, {"text": piece})
+            except Exception as e:
+                self.loop.call_soon_threadsafe(queue.put_nowait, {"error": f"{type(e).__name__}: {e}"})
+            finally:
+                self.loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        self.loop.run_in_executor(self._chats, run)
+        while (item := await queue.get()) is not done:
+            yield item
+
+    # -- HTTP ------------------------------------------------------------
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    return
+                try:
+                    method, target, version = line.decode("latin-1").split()
+                except ValueError:
+                    await _send_json(writer, 400, {"ok": False, "stderr": "Malformed request line"})
+                    return
+                headers = {}
+                while (raw := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = raw.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length") or 0))
+                await self._dispatch(method, urlsplit(target).path, body, writer)
+                if version != "HTTP/1.1" or headers.get("connection", "").lower() == "close":
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, path: str, raw: bytes, writer: asyncio.StreamWriter) -> None:
+        # Unknown paths share one name/label, so clients cannot create unbounded metric series
+        known = path.strip("/") if path in _PATHS else "other"
+        with span(f"service.{known}") as s:
+            try:
+                body = json.loads(raw or b"{}")
+                if not isinstance(body, dict):
+                    raise ValueError("body must be a JSON object")
+                if method == "GET" and path == "/health":
+                    status, payload = 200, {"ok": True}
+                elif method == "GET" and path == "/teams":
+                    teams = board_registry(self.settings.board_ids_file).teams
+                    status, payload = 200, {"teams": [{"team": t.team, "board_id": t.board_id} for t in teams]}
+                elif method == "GET" and path == "/metrics":
+                    await _send(writer, 200, METRICS.to_prometheus().encode(), "text/plain; version=0.0.4")
+                    return
+                elif method == "POST" and path == "/fetch":
+                    status, payload = await self.fetch(body)
+                elif method == "POST" and path == "/push":
+                    status, payload = await self.push(body)
+                elif method == "POST" and path == "/chat":
+                    await _send_stream(writer, self.chat(body))
+                    return
+                elif path in _PATHS:
+                    status, payload = 405, {"ok": False, "stderr": f"{method} not allowed on {path}"}
+                else:
+                    status, payload = 404, {"ok": False, "stderr": f"No such endpoint: {path}"}
+            except (ValueError, TypeError, KeyError) as e:
+                status, payload = 400, {"ok": False, "stderr": f"Bad request: {e}"}
+            except Exception as e:
+                status, payload = 500, {"ok": False, "stderr": f"{type(e).__name__}: {e}"}
+            s.attrs["status"] = status
+            METRICS.inc("service_requests", path=path if path in _PATHS else "other", status=status)
+            await _send_json(writer, status, payload)
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, ready: Callable[[int], None] | None = None) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.loop.set_default_executor(ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="service"))
+        # Keeps the sprint snapshot warm in the background when REFRESH_BACKGROUND=on
+        start_background_refresh(self.settings.scripts_dir, self.settings.board_ids_file)
+        server = await asyncio.start_server(self._handle, host, port)
+        if ready is not None:
+            ready(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+
+
+def service_freshness() -> float:
+    return float(os.getenv("SERVICE_FRESHNESS", str(DEFAULT_FRESHNESS)))
+
+
+def _result_json(r: ToolResult) -> dict:
+    return {
+        "ok": r.ok,
+        "stdout": r.stdout,
+        "stderr": r.stderr,
+        "returncode": r.returncode,
+        "records": [asdict(rec) for rec in r.records],
+        "cards": [asdict(c) for c in r.cards],
+    }
+
+
+async def _send(writer: asyncio.StreamWriter, status: int, body: bytes, content_type: str) -> None:
+    head = (
+        f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+        f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+
+async def _send_json(writer: asyncio.StreamWriter, status: int, payload: dict) -> None:
+    await _send(writer, status, json.dumps(payload, ensure_ascii=False).encode(), "application/json")
+
+
+async def _send_stream(writer: asyncio.StreamWriter, items: AsyncIterator[dict]) -> None:
+    """Chunked NDJSON, one line per item, flushed as each arrives."""
+    writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nTransfer-Encoding: chunked\r\n\r\n")
+    async for item in items:
+        line = (json.dumps(item, ensure_ascii=False) + "\n").encode()
+        writer.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+        await writer.drain()
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
@@ -0,0 +1,75 @@
+from __future__ import annotations
+from dataclasses import asdict
+from typing import Iterator
+import json
+import os
+
+import requests
+
+from .http import make_session
+from .miro import CardResult
+from .records import SprintRecord
+from .tools import ToolResult
+
+
+class ServiceClient:
+    """Talks to `sprint-goals-agent serve`; returns the same ToolResults as the in-process tools."""
+
+    def __init__(self, url: str, timeout: float = 300):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.session = make_session()
+
+    def fetch(self, board_ids: list[int], force: bool = False) -> ToolResult:
+        return self._post("/fetch", {"board_ids": board_ids, "refresh": force})
+
+    def push(
+        self,
+        miro_board_id: str,
+        team_filter: str = "",
+        records: list[SprintRecord] | None = None,
+        sync: bool | None = None,
+        delete_stale: bool = False,
+    ) -> ToolResult:
+        body = {
+            "miro_board_id": miro_board_id,
+            "team": team_filter,
+            "records": None if records is None else [asdict(r) for r in records],
+            "sync": sync,
+            "delete_stale": delete_stale,
+        }
+        return self._post("/push", body)
+
+    def chat(self, prompt: str, thread_id: str | None = None) -> Iterator[str]:
+        """Reply pieces as the service streams them; concatenated they are the full reply."""
+        body = {"prompt": prompt, "thread_id": thread_id}
+        try:
+            with self.session.post(f"{self.url}/chat", json=body, stream=True, timeout=self.timeout) as r:
+                r.raise_for_status()
+                for line in r.iter_lines():
+                    if line:
+                        item = json.loads(line)
+                        yield item.get("text") or f"\n❌ {item.get('error', '')}"
+        except requests.RequestException as e:
+            yield f"❌ Agent service unavailable at {self.url}: {e}"
+
+    def _post(self, path: str, body: dict) -> ToolResult:
+        try:
+            r = self.session.post(f"{self.url}{path}", json=body, timeout=self.timeout)
+            data = r.json()
+        except (requests.RequestException, ValueError) as e:
+            return ToolResult(ok=False, stdout="", stderr=f"❌ Agent service unavailable at {self.url}: {e}", returncode=1)
+        return ToolResult(
+            ok=bool(data.get("ok")),
+            stdout=data.get("stdout", ""),
+            stderr=data.get("stderr", ""),
+            returncode=data.get("returncode", 0 if data.get("ok") else 1),
+            records=[SprintRecord.from_dict(d) for d in data.get("records", [])],
+            cards=[CardResult(**c) for c in data.get("cards", [])],
+        )
+
+
+def service_client() -> ServiceClient | None:
+    """Client for AGENT_SERVICE_URL, or None to run everything in-process."""
+    url = os.getenv("AGENT_SERVICE_URL", "").strip()
+    return ServiceClient(url) if url else None
@@ -0,0 +1,257 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .records import SprintRecord
+
+# Compaction runs automatically every this many saved runs.
+COMPACT_EVERY = 50
+
+
+@dataclass(frozen=True)
+class StoredRecord:
+    run_id: int
+    fetched_at: float
+    record: SprintRecord
+
+
+class ReportStore:
+    """SQLite store of fetched sprint records, keyed by (run, board).
+
+    `latest` keeps a pointer to each board's newest record, so the current
+    snapshot is a single indexed join no matter how many runs are stored.
+    Closed sprints backfilled by history mode live in `sprint_history`, one
+    row per (board, sprint), with each board's resume offset in
+    `history_cursor`; compaction never touches them.
+    """
+
+    def __init__(self, path: Path, retention_days: float = 90):
+        self.path = path
+        self.retention_days = retention_days
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                fetched_at REAL NOT NULL,
+                source TEXT NOT NULL,
+                seconds REAL,
+                boards INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS records (
+                run_id INTEGER NOT NULL,
+                board_id INTEGER NOT NULL,
+                sprint_id TEXT NOT NULL,
+                board_name TEXT NOT NULL,
+                sprint_name TEXT NOT NULL,
+                sprint_state TEXT NOT NULL,
+                start_date TEXT NOT NULL,
+                end_date TEXT NOT NULL,
+                goal TEXT NOT NULL,
+                outcomes TEXT NOT NULL,
+                PRIMARY KEY (run_id, board_id)
+            );
+            CREATE INDEX IF NOT EXISTS records_board ON records(board_id, run_id DESC);
+            CREATE TABLE IF NOT EXISTS latest (
+                board_id INTEGER PRIMARY KEY,
+                run_id INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS sprint_history (
+                board_id INTEGER NOT NULL,
+                sprint_id TEXT NOT NULL,
+                board_name TEXT NOT NULL,
+                sprint_name TEXT NOT NULL,
+                sprint_state TEXT NOT NULL,
+                start_date TEXT NOT NULL,
+                end_date TEXT NOT NULL,
+                goal TEXT NOT NULL,
+                outcomes TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                PRIMARY KEY (board_id, sprint_id)
+            );
+            CREATE INDEX IF NOT EXISTS sprint_history_order ON sprint_history(board_id, position DESC);
+            CREATE TABLE IF NOT EXISTS history_cursor (
+                board_id INTEGER PRIMARY KEY,
+                next_start INTEGER NOT NULL,
+                synced_at REAL NOT NULL
+            );
+            """
+        )
+
+    def save_run(self, records: Iterable[SprintRecord], source: str = "fetch", seconds: float | None = None) -> int:
+        """Store one fetch run (and how long it took) and make its records the latest for their boards."""
+        rows = [
+            (
+                r.board_id, r.sprint_id, r.board_name, r.sprint_name, r.sprint_state,
+                r.start, r.end, r.goal, json.dumps(list(r.outcomes)),
+            )
+            for r in records
+        ]
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                run_id = self._db.execute(
+                    "INSERT INTO runs (fetched_at, source, seconds, boards) VALUES (?, ?, ?, ?)",
+                    (time.time(), source, seconds, len(rows)),
+                ).lastrowid
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(run_id, *row) for row in rows],
+                )
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO latest VALUES (?, ?)", [(row[0], run_id) for row in rows]
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            if run_id % COMPACT_EVERY == 0:
+                self._compact(self.retention_days)
+        return run_id
+
+    def latest_snapshot(self, board_ids: Iterable[int] | None = None) -> list[StoredRecord]:
+        """Newest record of each board (all boards, or `board_ids` in that order)."""
+        sql = (
+            "SELECT r.*, runs.fetched_at FROM latest l"
+            " JOIN records r ON r.run_id = l.run_id AND r.board_id = l.board_id"
+            " JOIN runs ON runs.run_id = l.run_id"
+        )
+        with self._lock:
+            if board_ids is None:
+                rows = self._db.execute(sql + " ORDER BY l.board_id").fetchall()
+                return [_stored(row) for row in rows]
+            wanted = list(board_ids)
+            found = {
+                row[1]: _stored(row)
+                for row in self._db.execute(
+                    sql + f" WHERE l.board_id IN ({','.join('?' * len(wanted))})", wanted
+                )
+            }
+        return [found[b] for b in wanted if b in found]
+
+    def seconds_per_board(self) -> float | None:
+        """Average full-fetch cost per board, from the most recent timed full fetch."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT seconds, boards FROM runs WHERE source = 'fetch' AND seconds IS NOT NULL AND boards > 0"
+                " ORDER BY run_id DESC LIMIT 1"
+            ).fetchone()
+        return row[0] / row[1] if row else None
+
+    def latest_run(self, board_ids: Iterable[int] = ()) -> list[StoredRecord]:
+        """Records of the most recent run, boards in `board_ids` order first, then the rest in fetch order."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT r.*, runs.fetched_at FROM records r JOIN runs ON runs.run_id = r.run_id"
+                " WHERE r.run_id = (SELECT MAX(run_id) FROM runs) ORDER BY r.rowid"
+            ).fetchall()
+        position = {b: i for i, b in enumerate(dict.fromkeys(board_ids))}
+        rows.sort(key=lambda row: position.get(row[1], len(position)))
+        return [_stored(row) for row in rows]
+
+    def history_cursors(self, board_ids: Iterable[int]) -> dict[int, int]:
+        """Offset of the first closed sprint not yet backfilled, per board (0 = never backfilled)."""
+        wanted = list(board_ids)
+        with self._lock:
+            found = dict(self._db.execute(
+                f"SELECT board_id, next_start FROM history_cursor WHERE board_id IN ({','.join('?' * len(wanted))})",
+                wanted,
+            ).fetchall())
+        return {b: found.get(b, 0) for b in wanted}
+
+    def save_history(self, board_id: int, records: list[SprintRecord], start: int, next_start: int) -> None:
+        """Store closed sprints found at offsets `start`.. and move the board's cursor to `next_start`.
+
+        Both happen in one transaction, so an interrupted backfill resumes
+        exactly after the last page it saved.
+        """
+        rows = [
+            (
+                r.board_id, r.sprint_id, r.board_name, r.sprint_name, r.sprint_state,
+                r.start, r.end, r.goal, json.dumps(list(r.outcomes)), start + i,
+            )
+            for i, r in enumerate(records)
+        ]
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO sprint_history VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+                )
+                self._db.execute(
+                    "INSERT OR REPLACE INTO history_cursor VALUES (?, ?, ?)", (board_id, next_start, time.time())
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def sprint_history(self, board_ids: Iterable[int], last: int | None = None) -> list[SprintRecord]:
+        """The `last` most recent closed sprints of each board (all if None), oldest first, boards in the given order."""
+        out: list[SprintRecord] = []
+        with self._lock:
+            for board_id in board_ids:
+                rows = self._db.execute(
+                    "SELECT board_id, sprint_id, board_name, sprint_name, sprint_state, start_date, end_date, goal,"
+                    " outcomes FROM sprint_history WHERE board_id = ? ORDER BY position DESC LIMIT ?",
+                    (board_id, -1 if last is None else last),
+                ).fetchall()
+                out += [_record(row) for row in reversed(rows)]
+        return out
+
+    def compact(self, retention_days: float | None = None) -> int:
+        """Drop runs older than the retention window; records still marked latest are kept."""
+        with self._lock:
+            return self._compact(self.retention_days if retention_days is None else retention_days)
+
+    def _compact(self, retention_days: float) -> int:
+        cutoff = time.time() - retention_days * 86400
+        deleted = self._db.execute(
+            "DELETE FROM records WHERE run_id IN (SELECT run_id FROM runs WHERE fetched_at < ?)"
+            " AND (run_id, board_id) NOT IN (SELECT run_id, board_id FROM latest)",
+            (cutoff,),
+        ).rowcount
+        self._db.execute(
+            "DELETE FROM runs WHERE fetched_at < ? AND run_id NOT IN (SELECT DISTINCT run_id FROM records)",
+            (cutoff,),
+        )
+        return deleted
+
+
+def _stored(row: tuple) -> StoredRecord:
+    run_id, *record, fetched_at = row
+    return StoredRecord(run_id=run_id, fetched_at=fetched_at, record=_record(tuple(record)))
+
+
+def _record(row: tuple) -> SprintRecord:
+    board_id, sprint_id, board_name, sprint_name, state, start, end, goal, outcomes = row
+    return SprintRecord(
+        board_id=board_id,
+        board_name=board_name,
+        sprint_id=sprint_id,
+        sprint_name=sprint_name,
+        sprint_state=state,
+        start=start,
+        end=end,
+        goal=goal,
+        outcomes=tuple(json.loads(outcomes)),
+    )
+
+
+@lru_cache(maxsize=4)
+def report_store(reports_dir: Path) -> ReportStore:
+    """Process-wide store at reports/sprint_reports.sqlite (retention: REPORT_RETENTION_DAYS, default 90)."""
+    return ReportStore(
+        reports_dir / "sprint_reports.sqlite",
+        retention_days=float(os.getenv("REPORT_RETENTION_DAYS", "90")),
+    )
@@ -0,0 +1,118 @@
+from __future__ import annotations
+from pathlib import Path
+import re
+
+from .metrics import span
+from .records import SprintRecord
+from .tools import fetch_customer_outcomes
+
+
+ANSI_RE = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
+
+
+def strip_ansi(s: str) -> str:
+    return ANSI_RE.sub("", s or "")
+
+
+def goal_to_bullets(goal: str, max_items: int = 8) -> list[str]:
+    """
+    Heuristic bulleting: split on periods, semicolons, and ' - '.
+    """
+    g = (goal or "").strip()
+    if not g:
+        return []
+
+    # Normalize separators
+    g = g.replace("\n", " ").replace("  ", " ")
+    chunks = re.split(r";\s*|\.\s+|\s-\s+", g)
+    chunks = [c.strip(" -•\t") for c in chunks if c.strip(" -•\t")]
+
+    # De-duplicate while preserving order
+    seen = set()
+    deduped = []
+    for c in chunks:
+        k = c.lower()
+        if k in seen:
+            continue
+        seen.add(k)
+        deduped.append(c)
+
+    return deduped[:max_items]
+
+
+def _fetch_outcomes_safe(scripts_dir: Path, sprint_id: str) -> list[str]:
+    """
+    fetch_customer_outcomes() signature can vary depending on local tools.py.
+    This wrapper supports both:
+      - fetch_customer_outcomes(scripts_dir, sprint_id)
+      - fetch_customer_outcomes(sprint_id)
+    """
+    with span("outcomes.fallback", sprint=sprint_id):
+        try:
+            return fetch_customer_outcomes(scripts_dir, sprint_id)  # type: ignore[arg-type]
+        except TypeError:
+            try:
+                return fetch_customer_outcomes(sprint_id)  # type: ignore[call-arg]
+            except Exception:
+                return []
+        except Exception:
+            return []
+
+
+BLOCK_SEPARATOR = "\n---\n\n"
+
+
+def format_summary(records: list[SprintRecord], scripts_dir: Path | None = None, display_filter: str = "all") -> str:
+    return BLOCK_SEPARATOR.join(format_block(rec, scripts_dir, display_filter) for rec in records).strip()
+
+
+def format_block(rec: SprintRecord, scripts_dir: Path | None = None, display_filter: str = "all") -> str:
+    """One board's markdown block of the summary."""
+    title = f"**{rec.board_name} — {rec.sprint_name}**"
+    dates = f"📅 {rec.start} → {rec.end}"
+
+    # Sprint Goal
+    bullets = goal_to_bullets(rec.goal)
+    if bullets:
+        goal_body = "\n".join([f"  • {b}" for b in bullets])
+    else:
+        goal_body = "  • (No sprint goal found)"
+
+    # Customer Outcomes - use the fetched ones first, fallback to fetching
+    outcomes_body = ""
+    if rec.outcomes:
+        outcomes_body = "\n".join([f"  • {o}" for o in rec.outcomes[:8]])
+    elif scripts_dir is not None and rec.sprint_id:
+        # Fallback: fetch outcomes if the fetch did not include them
+        outcomes = _fetch_outcomes_safe(scripts_dir, rec.sprint_id)
+        if outcomes:
+            outcomes_body = "\n".join([f"  • {o}" for o in outcomes[:8]])
+        else:
+            outcomes_body = "  • Not set on epics for this sprint"
+
+    # Build block based on display_filter
+    if display_filter == "goals_only":
+        block = f"""{title}
+{dates}
+
+📌 **Sprint Goal**
+{goal_body}
+"""
+    elif display_filter == "outcomes_only":
+        block = f"""{title}
+{dates}
+
+🎯 **Customer Outcome**
+{outcomes_body if outcomes_body else "  • Not specified"}
+"""
+    else:  # "all"
+        block = f"""{title}
+{dates}
+
+🎯 **Customer Outcome**
+{outcomes_body if outcomes_body else "  • Not specified"}
+
+📌 **Sprint Goal**
+{goal_body}
+"""
+    return block
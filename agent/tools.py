@@ -1,12 +1,32 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 import subprocess
 import os
+import io
+import csv
 import json
+import re
 import subprocess
+import tempfile
+import time
 from pathlib import Path
-from typing import List
+from typing import Callable, List
+
+import requests
+
+from .board_ids import resolve_board_ids
+from .jira import CacheMode, JiraConfig, fetch_records, fetch_records_incremental, iter_records, shared_client, sprint_outcomes
+from .miro import CardResult, MiroConfig, card_index, card_items, card_payloads, normalize_board_id, push_cards, sync_cards
+from .miro import shared_client as shared_miro_client
+from .history import backfill_history, backfill_table
+from .metrics import span
+from .progress import SprintProgress, fetch_progress, progress_table
+from .records import CSV_HEADER, SprintRecord, latest_csv, read_csv
+from .store import report_store
+
+# The script prints the CSV path on a line of its own; match the whole line, spaces included.
+REPORT_PATH_RE = re.compile(r"^(.*Sprint_Goals_\d{8}_\d{6}\.csv)[ \t\r]*$", re.MULTILINE)
 
 @dataclass(frozen=True)
 class ToolResult:
@@ -14,33 +34,227 @@ class ToolResult:
     stdout: str
     stderr: str
     returncode: int
+    records: list[SprintRecord] = field(default_factory=list)
+    cards: list[CardResult] = field(default_factory=list)
+    progress: list[SprintProgress] = field(default_factory=list)
 
-def _run(cmd: list[str], cwd: Path) -> ToolResult:
-    p = subprocess.run(
-        cmd,
-        cwd=str(cwd),
-        text=True,
-        capture_output=True,
-        env=os.environ.copy(),
-    )
+def _run(cmd: list[str], cwd: Path, extra_env: dict[str, str] | None = None) -> ToolResult:
+    with span("subprocess", script=Path(cmd[1]).name if len(cmd) > 1 else cmd[0]) as s:
+        p = subprocess.run(
+            cmd,
+            cwd=str(cwd),
+            text=True,
+            capture_output=True,
+            env={**os.environ, **(extra_env or {})},
+        )
+        s.attrs["returncode"] = p.returncode
     return ToolResult(ok=p.returncode == 0, stdout=p.stdout, stderr=p.stderr, returncode=p.returncode)
 
-def fetch_sprint_details(scripts_dir: Path, board_ids: list[int]) -> ToolResult:
-    script = scripts_dir / "fetch_sprint_details.sh"
-    cmd = ["bash", str(script)] + [str(b) for b in board_ids]
-    return _run(cmd, cwd=scripts_dir)
+def fetch_sprint_details(
+    scripts_dir: Path,
+    board_ids: list[int],
+    workers: int | None = None,
+    cache_mode: CacheMode = "use",
+    incremental: bool = False,
+    on_record: Callable[[SprintRecord], None] | None = None,
+) -> ToolResult:
+    """Fetch the active sprint of each board and save it as a run in the report store.
 
-def push_goals_to_miro(scripts_dir: Path, miro_board_id: str, team_filter: str = "") -> ToolResult:
-    script = scripts_dir / "push_to_miro_cards.sh"
-    cmd = ["bash", str(script), miro_board_id, team_filter]
-    return _run(cmd, cwd=scripts_dir)
+    Uses the in-process Jira client with up to `workers` boards in flight
+    (default JIRA_MAX_WORKERS) and the on-disk response cache per `cache_mode`;
+    set JIRA_FETCH_BACKEND=script (or leave the Jira credentials unset) to run
+    scripts/fetch_sprint_details.sh instead. With `incremental`, boards whose
+    active sprint has not changed since the stored snapshot are carried forward.
+
+    `on_record` is called with each board's record as soon as it is ready
+    (completion order); ToolResult.records keeps the order of `board_ids`.
+    The script and incremental paths report all records once they are done.
+    """
+    config = JiraConfig.from_env()
+    if config is None or os.getenv("JIRA_FETCH_BACKEND", "native").lower() == "script":
+        script = scripts_dir / "fetch_sprint_details.sh"
+        cmd = ["bash", str(script)] + [str(b) for b in board_ids]
+        r = _run(cmd, cwd=scripts_dir)
+        # Read every row back from the CSV the script wrote, not its 5-line preview.
+        m = REPORT_PATH_RE.search(r.stdout)
+        if not r.ok or not m or not Path(m.group(1)).exists():
+            return r
+        records = read_csv(Path(m.group(1)))
+        report_store(scripts_dir.parent / "reports").save_run(records, source="script")
+        for rec in records if on_record is not None else ():
+            on_record(rec)
+        return ToolResult(r.ok, r.stdout, r.stderr, r.returncode, records=records)
+
+    client = shared_client(config).using(cache_mode)
+    store = report_store(scripts_dir.parent / "reports")
+    lines = ["🚀 JIRA Sprint Goals Fetcher", "================================",
+             f"Found {len(board_ids)} boards to process", ""]
+    skipped: list[int] = []
+    started = time.perf_counter()
+    try:
+        if incremental:
+            previous = {s.record.board_id: s.record for s in store.latest_snapshot(board_ids)}
+            records, skipped = fetch_records_incremental(client, board_ids, previous, workers=workers)
+            for rec in records if on_record is not None else ():
+                on_record(rec)
+        elif on_record is not None:
+            by_board: dict[int, SprintRecord] = {}
+            for rec in iter_records(client, board_ids, workers=workers):
+                by_board[rec.board_id] = rec
+                on_record(rec)
+            records = [by_board[b] for b in board_ids]
+        else:
+            records = fetch_records(client, board_ids, workers=workers)
+    except requests.RequestException as e:
+        return ToolResult(ok=False, stdout="\n".join(lines), stderr=f"❌ Jira request failed: {e}", returncode=1)
+    elapsed = time.perf_counter() - started
+    for rec in records:
+        lines.append(f"Processing Board {rec.board_id}...")
+        if rec.board_id in skipped:
+            lines.append(f"  = Unchanged: {rec.sprint_name or 'no active sprint'}")
+        else:
+            lines.append(f"  ✓ Found: {rec.sprint_name}" if rec.has_sprint else "  ⚠ No active sprint found")
+
+    if incremental:
+        per_board = store.seconds_per_board()
+        saved = f", ~{per_board * len(skipped):.1f}s saved" if per_board is not None else ""
+        lines += ["", f"↻ Incremental: {len(skipped)} of {len(board_ids)} boards unchanged and skipped{saved}"]
+    run_id = store.save_run(records, source="incremental" if incremental else "fetch", seconds=elapsed)
+    preview = io.StringIO()
+    csv.writer(preview, lineterminator="\n").writerows([CSV_HEADER] + [r.to_row() for r in records])
+    lines += ["", "================================", f"✅ Done! Saved as run {run_id} in:", str(store.path),
+              "(CSV: sprint-goals-agent export)", "", "Preview:", preview.getvalue().rstrip("\n")]
+    return ToolResult(ok=True, stdout="\n".join(lines) + "\n", stderr="", returncode=0, records=records)
+
+def push_goals_to_miro(
+    scripts_dir: Path,
+    miro_board_id: str,
+    team_filter: str = "",
+    records: list[SprintRecord] | None = None,
+    sync: bool | None = None,
+    delete_stale: bool = False,
+) -> ToolResult:
+    """Create one Miro card per record (default: the most recent run in the report store, in board_ids.txt order).
+
+    Cards are created concurrently by the in-process Miro client; per-card
+    outcomes are returned on ToolResult.cards. With `sync` (default: MIRO_SYNC=on)
+    cards pushed before are updated in place and unchanged ones are skipped;
+    `delete_stale` also removes cards of earlier sprints. With
+    MIRO_PUSH_BACKEND=script (or no MIRO_TOKEN) the payloads are handed to
+    push_to_miro_cards.sh through MIRO_CARDS_FILE instead.
+    """
+    reports_dir = scripts_dir.parent / "reports"
+    if sync is None:
+        sync = os.getenv("MIRO_SYNC", "off").lower() in {"on", "1", "true"}
+    if records is None:
+        order = resolve_board_ids(scripts_dir.parent / "board_ids.txt")
+        records = [s.record for s in report_store(reports_dir).latest_run(order)]
+        if not records:
+            # Reports written before the store existed
+            report = latest_csv(reports_dir)
+            if report is None:
+                return ToolResult(ok=False, stdout="", stderr=f"❌ No sprint data found in: {reports_dir}. Run fetch first.", returncode=1)
+            records = read_csv(report)
+
+    config = MiroConfig.from_env()
+    if config is not None and os.getenv("MIRO_PUSH_BACKEND", "native").lower() != "script":
+        board_id = normalize_board_id(miro_board_id)
+        client = shared_miro_client(config)
+        items = list(card_items(records, team_filter))
+        if sync:
+            index = card_index(reports_dir / "miro_sync.sqlite")
+            results = sync_cards(client, index, board_id, items, delete_stale=delete_stale)
+        else:
+            results = push_cards(client, board_id, [(rec.board_name, payload) for rec, payload in items])
+        return _push_result(board_id, len(items), results)
+
+    with tempfile.NamedTemporaryFile("w", suffix=".jsonl", encoding="utf-8", delete=False) as f:
+        for title, payload in card_payloads(records, team_filter):
+            f.write(json.dumps({"title": title, "payload": payload}) + "\n")
+        cards_file = f.name
+    try:
+        script = scripts_dir / "push_to_miro_cards.sh"
+        cmd = ["bash", str(script), miro_board_id, team_filter]
+        return _run(cmd, cwd=scripts_dir, extra_env={"MIRO_CARDS_FILE": cards_file})
+    finally:
+        os.unlink(cards_file)
+
+def fetch_sprint_progress(board_ids: list[int], workers: int | None = None, cache_mode: CacheMode = "use") -> ToolResult:
+    """Issue status and story-point completion of every active sprint of each board.
+
+    Streams all issues of each sprint page by page; there is no script
+    fallback, so Jira credentials must be set.
+    """
+    config = JiraConfig.from_env()
+    if config is None:
+        return ToolResult(ok=False, stdout="", stderr="❌ Missing JIRA_URL, JIRA_USERNAME or JIRA_API_TOKEN.", returncode=1)
+    try:
+        rows = fetch_progress(shared_client(config).using(cache_mode), board_ids, workers=workers)
+    except requests.RequestException as e:
+        return ToolResult(ok=False, stdout="", stderr=f"❌ Jira request failed: {e}", returncode=1)
+    # Partial totals are reported, but never as a success
+    errors = [f"⚠ Incomplete totals for {r.board_name} / {r.sprint_name}: {r.error}" for r in rows if r.incomplete]
+    return ToolResult(
+        ok=not errors, stdout=progress_table(rows) + "\n", stderr="\n".join(errors), returncode=1 if errors else 0, progress=rows
+    )
+
+def backfill_sprint_history(scripts_dir: Path, board_ids: list[int], workers: int | None = None) -> ToolResult:
+    """Store each board's closed sprints (goals and Customer Outcomes) for history queries.
+
+    The first run pages through every closed sprint; later runs only request
+    sprints closed since the previous one. Needs Jira credentials.
+    """
+    config = JiraConfig.from_env()
+    if config is None:
+        return ToolResult(ok=False, stdout="", stderr="❌ Missing JIRA_URL, JIRA_USERNAME or JIRA_API_TOKEN.", returncode=1)
+    store = report_store(scripts_dir.parent / "reports")
+    try:
+        results = backfill_history(shared_client(config), store, board_ids, workers=workers)
+    except requests.RequestException as e:
+        return ToolResult(ok=False, stdout="", stderr=f"❌ Jira request failed: {e}", returncode=1)
+    added = sum(r.added for r in results)
+    summary = f"\n\n✅ {added} closed sprint(s) added to {store.path}"
+    return ToolResult(ok=True, stdout=backfill_table(results) + summary + "\n", stderr="", returncode=0)
+
+def read_sprint_history(scripts_dir: Path, board_ids: list[int], last: int | None = None) -> ToolResult:
+    """The `last` closed sprints of each board from the report store, oldest first; never calls Jira."""
+    records = report_store(scripts_dir.parent / "reports").sprint_history(board_ids, last=last)
+    if not records:
+        return ToolResult(ok=False, stdout="", stderr="No sprint history stored for these boards. Run: sprint-goals-agent history --backfill", returncode=1)
+    return ToolResult(ok=True, stdout="", stderr="", returncode=0, records=records)
+
+_ACTION_TEXT = {"create": "Created", "update": "Updated", "unchanged": "Unchanged", "delete": "Deleted"}
+
+def _push_result(board_id: str, team_count: int, results: list[CardResult]) -> ToolResult:
+    lines = ["🚀 Pushing Sprint Goals to Miro (Cards)", "================================",
+             f"Miro Board ID: {board_id}", "", f"Found {team_count} team(s) to push", ""]
+    for c in results:
+        lines.append(f"{'Deleting stale card' if c.action == 'delete' else 'Card'}: {c.title}")
+        lines.append(f"  {_ACTION_TEXT[c.action]}" if c.ok else f"  Failed (HTTP {c.status})\n{c.error}")
+    counts = {a: sum(1 for c in results if c.ok and c.action == a) for a in _ACTION_TEXT}
+    failed = sum(1 for c in results if not c.ok)
+    summary = ", ".join(f"{_ACTION_TEXT[a].lower()} {n}" for a, n in counts.items() if n) or "nothing to do"
+    lines += ["", "================================", f"Done! Cards: {summary}; {failed} failed",
+              f"Open: https://miro.com/app/board/{board_id}/"]
+    return ToolResult(ok=failed == 0, stdout="\n".join(lines) + "\n", stderr="",
+                      returncode=0 if failed == 0 else 1, cards=results)
 
 def fetch_customer_outcomes(sprint_id: str) -> List[str]:
     """
     Returns a de-duplicated list of Customer Outcomes (plain text) for the given sprint_id.
-    Uses scripts/fetch_customer_outcomes.sh which outputs JSON lines:
+    Resolves the sprint's epics with batched JQL searches in-process; without Jira
+    credentials in the environment it falls back to scripts/fetch_customer_outcomes.sh,
+    which outputs JSON lines:
       {"epic":"ILX-58923","outcome":"..."}
     """
+    config = JiraConfig.from_env()
+    if config is not None and config.outcomes_enabled:
+        try:
+            outcomes = sprint_outcomes(shared_client(config), str(sprint_id))
+        except requests.RequestException:
+            return []
+        return _dedupe_casefold(outcomes)
+
     repo_root = Path(__file__).resolve().parents[1]
     script = repo_root / "scripts" / "fetch_customer_outcomes.sh"
 
@@ -71,6 +285,9 @@ def fetch_customer_outcomes(sprint_id: str) -> List[str]:
             # ignore any non-json lines
             continue
 
+    return _dedupe_casefold(outcomes)
+
+def _dedupe_casefold(outcomes: List[str]) -> List[str]:
     # de-dupe (case-insensitive) while preserving order
     seen = set()
     uniq: List[str] = []
@@ -0,0 +1 @@
+"""Benchmark harness; see `python -m bench --help`."""
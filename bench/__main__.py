@@ -0,0 +1,155 @@
+"""Benchmark fetch, push and chat against local fake Jira and Miro servers.
+
+    python -m bench                                   # 1, 10, 100, 1000 boards
+    python -m bench --boards 10,100 --latency 0.05 --rate-429 0.02 --repeat 5
+    python -m bench --scenarios fetch --json > fetch.json
+
+Reports p50/p95 end-to-end latency, HTTP requests and process spawns per run.
+Chat uses an ambiguous prompt so node_parse_intent goes through the stub LLM.
+"""
+from __future__ import annotations
+from pathlib import Path
+import argparse
+import json
+import os
+import subprocess
+import tempfile
+import time
+
+from .fake_servers import FakeServer, Faults
+from .stub_llm import StubLLM
+
+SCENARIOS = ("fetch", "push", "chat", "progress", "history")
+CHAT_PROMPT = "how are the squads doing on their sprint outcomes?"
+MIRO_BOARD = "uXjBenchmark="
+
+_spawns = 0
+
+
+class _CountingPopen(subprocess.Popen):
+    def __init__(self, *args, **kwargs):
+        global _spawns
+        _spawns += 1
+        super().__init__(*args, **kwargs)
+
+
+def _percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q * len(ordered) + 0.5) - 1))]
+
+
+def run_scenarios(boards: int, args: argparse.Namespace) -> list[dict]:
+    from agent.tools import backfill_sprint_history, fetch_sprint_details, fetch_sprint_progress, push_goals_to_miro
+
+    faults = Faults(latency=args.latency, error_rate=args.error_rate, rate_429=args.rate_429)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp, FakeServer(
+        boards, epics=args.epics, issues=args.issues, closed=args.closed, faults=faults
+    ) as server:
+        root = Path(tmp)
+        scripts_dir = root / "scripts"
+        scripts_dir.mkdir()
+        board_file = root / "board_ids.txt"
+        board_file.write_text("".join(f"# Team {b}\n{b}\n" for b in range(1, boards + 1)))
+        board_ids = list(range(1, boards + 1))
+        os.environ.update(server.environment(args.rate_limit, args.workers))
+
+        records = fetch_sprint_details(scripts_dir, board_ids).records  # warm-up; also the data to push
+        graph = None
+        if "chat" in args.scenarios:
+            import agent.graph as graph_module
+
+            stub = StubLLM(latency=args.llm_latency)
+            graph_module.get_llm = lambda: stub
+            graph_module.llm_identifier = lambda: "stub"
+            graph = graph_module.build_graph(
+                scripts_dir=scripts_dir, board_ids_file=board_file, default_miro_board_id=MIRO_BOARD
+            )
+
+        def fetch() -> bool:
+            return fetch_sprint_details(scripts_dir, board_ids).ok
+
+        def push() -> bool:
+            return push_goals_to_miro(scripts_dir, MIRO_BOARD, records=records, sync=False).ok
+
+        def progress() -> bool:
+            return fetch_sprint_progress(board_ids).ok
+
+        def history() -> bool:
+            # The first run backfills every closed sprint; later ones find nothing new.
+            return backfill_sprint_history(scripts_dir, board_ids).ok
+
+        def chat() -> bool:
+            from langchain_core.messages import HumanMessage
+
+            result = graph.invoke({"messages": [HumanMessage(content=CHAT_PROMPT)]})
+            return bool(result["messages"][-1].content) and not result.get("fetch_stderr")
+
+        for name in args.scenarios:
+            step = {"fetch": fetch, "push": push, "chat": chat, "progress": progress, "history": history}[name]
+            timings, ok = [], 0
+            before, spawns_before = server.snapshot(), _spawns
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                ok += bool(step())
+                timings.append(time.perf_counter() - started)
+            requests = server.snapshot() - before
+            results.append({
+                "scenario": name,
+                "boards": boards,
+                "runs": args.repeat,
+                "ok": ok,
+                "p50_s": round(_percentile(timings, 0.50), 4),
+                "p95_s": round(_percentile(timings, 0.95), 4),
+                "jira_requests": requests["jira"] / args.repeat,
+                "miro_requests": requests["miro"] / args.repeat,
+                "spawns": (_spawns - spawns_before) / args.repeat,
+            })
+    return results
+
+
+def _table(rows: list[dict]) -> str:
+    head = f"{'scenario':<8} {'boards':>6} {'ok':>7} {'p50 s':>9} {'p95 s':>9} {'jira req':>9} {'miro req':>9} {'spawns':>7}"
+    lines = [head, "-" * len(head)]
+    for r in rows:
+        lines.append(
+            f"{r['scenario']:<8} {r['boards']:>6} {r['ok']:>3}/{r['runs']:<3} {r['p50_s']:>9.3f} {r['p95_s']:>9.3f}"
+            f" {r['jira_requests']:>9.1f} {r['miro_requests']:>9.1f} {r['spawns']:>7.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m bench", description=__doc__.splitlines()[0])
+    parser.add_argument("--boards", default="1,10,100,1000", help="Comma-separated board counts")
+    parser.add_argument("--scenarios", default="fetch,push,chat", help="Any of fetch,push,chat,progress,history")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per scenario")
+    parser.add_argument("--epics", type=int, default=3, help="Epics per sprint")
+    parser.add_argument("--issues", type=int, default=3, help="Issues per sprint (Jira pages of at most 50)")
+    parser.add_argument("--closed", type=int, default=20, help="Closed sprints per board for history (max 99)")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds added to every fake response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of responses failed with HTTP 500")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Share of responses throttled with 429")
+    parser.add_argument("--rate-limit", type=float, default=0, help="Client-side req/s budget (0 = unlimited)")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent requests per API")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Seconds the stub LLM takes per call")
+    parser.add_argument("--json", action="store_true", help="Print JSON rows instead of a table")
+    args = parser.parse_args(argv)
+    args.scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    subprocess.Popen = _CountingPopen  # count every process the agent spawns
+    rows = []
+    for boards in (int(b) for b in args.boards.split(",")):
+        rows += run_scenarios(boards, args)
+        if not args.json:
+            print(_table([r for r in rows if r["boards"] == boards]), end="\n\n", flush=True)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
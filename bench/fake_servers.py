@@ -0,0 +1,244 @@
+"""Local stand-ins for the Jira and Miro REST endpoints the agent and scripts use.
+
+Boards 1..N each have one active sprint (every 10th board has none) with
+`issues` issues (served at most 50 per page, like Jira) linking `epics`
+epics (none with `epics=0`, so sprints have no Customer Outcomes); epics
+are shared between neighbouring boards so outcome de-duplication has
+something to do. Each board also has `closed` closed
+sprints (paged like Jira, oldest first) for history backfills; raise
+`closed` between runs to simulate sprints closing. Every response can be delayed,
+failed with HTTP 500 or throttled with 429 + Retry-After.
+"""
+from __future__ import annotations
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import itertools
+import json
+import random
+import re
+import socket
+import threading
+import time
+
+OUTCOME_FIELD = "customfield_10100"
+EPIC_LINK_FIELD = "customfield_10014"
+STORY_POINTS_FIELD = "customfield_10016"
+PAGE_CAP = 50
+STATUSES = (("To Do", "new"), ("In Progress", "indeterminate"), ("In Review", "indeterminate"), ("Done", "done"))
+
+
+@dataclass
+class Faults:
+    latency: float = 0.0  # seconds added to every response
+    error_rate: float = 0.0  # share of requests answered with HTTP 500
+    rate_429: float = 0.0  # share of requests answered with 429 + Retry-After
+    retry_after: float = 0.05
+
+
+class FakeServer:
+    """One HTTP server answering both the Jira (/rest/...) and Miro (/v2/...) endpoints."""
+
+    def __init__(
+        self, boards: int, epics: int = 3, issues: int = 3, closed: int = 0, faults: Faults | None = None, seed: int = 0
+    ):
+        self.boards = boards
+        self.epics = epics
+        self.issues = max(issues, epics)
+        self.closed = min(closed, 99)
+        self.edits: Counter[str] = Counter()  # bump an epic key to change its outcome and `updated`
+        self.goals: dict[int, str] = {}  # set a board id to change its active sprint's goal
+        self.broken_pages: set[int] = set()  # startAt offsets of sprint-issue pages answered with HTTP 500
+        self.faults = faults or Faults()
+        self.counts: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._ids = itertools.count(3458764500000000000)
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(self))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def environment(self, rate_limit: float = 0, workers: int = 4) -> dict[str, str]:
+        """Environment that points the agent's Jira and Miro clients at this server."""
+        return {
+            "JIRA_URL": self.url,
+            "JIRA_USERNAME": "bench@example.com",
+            "JIRA_API_TOKEN": "bench",
+            "CUSTOM_OUTCOME_FIELD": OUTCOME_FIELD,
+            "EPIC_LINK_FIELD": EPIC_LINK_FIELD,
+            "STORY_POINTS_FIELD": STORY_POINTS_FIELD,
+            "JIRA_CACHE": "off",
+            "JIRA_RATE_LIMIT": str(rate_limit),
+            "JIRA_MAX_WORKERS": str(workers),
+            "MIRO_TOKEN": "bench",
+            "MIRO_API_BASE": f"{self.url}/v2",
+            "MIRO_RATE_LIMIT": str(rate_limit),
+            "MIRO_MAX_WORKERS": str(workers),
+            "MIRO_SYNC": "off",
+            "INTENT_CACHE": "off",
+            "SNAPSHOT_MAX_AGE": "0",
+        }
+
+    def __enter__(self) -> "FakeServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def snapshot(self) -> Counter[str]:
+        with self._lock:
+            return Counter(self.counts)
+
+    # -- fault injection -------------------------------------------------
+
+    def fault(self) -> tuple[int, dict[str, str]] | None:
+        f = self.faults
+        if f.latency:
+            time.sleep(f.latency)
+        with self._lock:
+            roll = self._random.random()
+        if roll < f.rate_429:
+            return 429, {"Retry-After": str(f.retry_after)}
+        if roll < f.rate_429 + f.error_rate:
+            return 500, {}
+        return None
+
+    def count(self, api: str, method: str) -> None:
+        with self._lock:
+            self.counts[f"{api}:{method}"] += 1
+            self.counts[api] += 1
+
+    # -- Jira ------------------------------------------------------------
+
+    def epic_keys(self, board_id: int) -> list[str]:
+        # Neighbouring boards share half of their epics.
+        return [f"EP-{(board_id // 2) * self.epics + i}" for i in range(self.epics)]
+
+    def jira(self, path: str, query: dict[str, list[str]]) -> tuple[int, dict]:
+        if m := re.fullmatch(r"/rest/agile/1\.0/board/(\d+)", path):
+            board_id = int(m[1])
+            if board_id > self.boards:
+                return 404, {"errorMessages": ["Board does not exist"]}
+            return 200, {"id": board_id, "name": f"Team {board_id}", "type": "scrum"}
+        if m := re.fullmatch(r"/rest/agile/1\.0/board/(\d+)/sprint", path):
+            board_id = int(m[1])
+            if query.get("state", ["active"])[0] == "closed":
+                start = int(query.get("startAt", ["0"])[0])
+                end = min(start + min(PAGE_CAP, int(query.get("maxResults", [str(PAGE_CAP)])[0])), self.closed)
+                values = [self.closed_sprint(board_id, n) for n in range(start, end)]
+                return 200, {"startAt": start, "maxResults": PAGE_CAP, "isLast": end >= self.closed, "values": values}
+            if board_id % 10 == 0:
+                return 200, {"isLast": True, "values": []}
+            return 200, {"isLast": True, "values": [{
+                "id": board_id * 100, "name": f"Team {board_id} Sprint 42", "state": "active",
+                "startDate": "2026-10-05T08:00:00.000Z", "endDate": "2026-10-19T17:00:00.000Z",
+                "goal": self.goals.get(board_id, f"Ship feature {board_id}\nHarden the release pipeline"),
+            }]}
+        if m := re.fullmatch(r"/rest/agile/1\.0/sprint/(\d+)/issue", path):
+            board_id = int(m[1]) // 100
+            start = int(query.get("startAt", ["0"])[0])
+            if start in self.broken_pages:
+                return 500, {"errorMessages": ["Internal server error"]}
+            size = min(PAGE_CAP, int(query.get("maxResults", [str(PAGE_CAP)])[0]))
+            issues = [self.issue(board_id, i) for i in range(start, min(start + size, self.issues))]
+            return 200, {"startAt": start, "maxResults": size, "total": self.issues, "issues": issues}
+        if path == "/rest/api/3/search/jql":
+            keys = re.findall(r'"([A-Z]+-\d+)"', query.get("jql", [""])[0])
+            return 200, {"issues": [self.epic(k) for k in keys], "isLast": True}
+        if m := re.fullmatch(r"/rest/api/3/issue/([A-Z]+-\d+)", path):
+            return 200, self.epic(m[1])
+        return 404, {"errorMessages": [f"No fake for {path}"]}
+
+    def closed_sprint(self, board_id: int, n: int) -> dict:
+        # Sprint ids stay board_id * 100 + k so the issue endpoint can map them back.
+        return {
+            "id": board_id * 100 + n + 1, "name": f"Team {board_id} Sprint {n + 1}", "state": "closed",
+            "startDate": "2025-01-01T08:00:00.000Z", "endDate": "2025-01-15T17:00:00.000Z",
+            "completeDate": "2025-01-15T17:00:00.000Z", "goal": f"Goal {n + 1} of team {board_id}",
+        }
+
+    def issue(self, board_id: int, i: int) -> dict:
+        epics = self.epic_keys(board_id)
+        status, category = STATUSES[(board_id + i) % len(STATUSES)]
+        return {"key": f"T{board_id}-{i}", "fields": {
+            "parent": {"key": epics[i % len(epics)]} if epics else None,
+            EPIC_LINK_FIELD: None,
+            "status": {"name": status, "statusCategory": {"key": category}},
+            STORY_POINTS_FIELD: [1, 2, 3, 5, 8, None][i % 6],
+        }}
+
+    def epic(self, key: str) -> dict:
+        edits = self.edits[key]
+        text = f"Customers can {key.lower()} faster" + (f" (rev {edits})" if edits else "")
+        adf = {"type": "doc", "version": 1, "content": [{"type": "paragraph", "content": [{"type": "text", "text": text}]}]}
+        return {"key": key, "fields": {OUTCOME_FIELD: adf, "updated": f"2026-10-01T09:{edits % 60:02d}:00.000+0000"}}
+
+    # -- Miro ------------------------------------------------------------
+
+    def miro(self, method: str, path: str, body: dict) -> tuple[int, dict | None]:
+        if method == "POST" and re.fullmatch(r"/v2/boards/[^/]+/cards", path):
+            return 201, {"id": str(next(self._ids)), "type": "card", "data": body.get("data")}
+        if method == "PATCH" and (m := re.fullmatch(r"/v2/boards/[^/]+/cards/(\d+)", path)):
+            return 200, {"id": m[1], "type": "card", "data": body.get("data")}
+        if method == "DELETE" and re.fullmatch(r"/v2/boards/[^/]+/items/\d+", path):
+            return 204, None
+        return 404, {"status": 404, "message": f"No fake for {method} {path}"}
+
+
+def _handler(server: FakeServer) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self) -> None:
+            super().setup()
+            # Headers and body go out in separate writes; without this, Nagle plus
+            # delayed ACK adds ~40ms to every keep-alive response.
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def log_message(self, *args) -> None:
+            pass
+
+        def _reply(self, status: int, body: dict | None, headers: dict[str, str] | None = None) -> None:
+            data = json.dumps(body).encode() if body is not None else b""
+            self.send_response(status)
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _handle(self, method: str) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+            url = urlparse(self.path)
+            api = "miro" if url.path.startswith("/v2/") else "jira"
+            server.count(api, method)
+            fault = server.fault()
+            if fault is not None:
+                self._reply(fault[0], {"message": "injected fault"}, fault[1])
+            elif api == "jira":
+                self._reply(*server.jira(url.path, parse_qs(url.query)))
+            else:
+                self._reply(*server.miro(method, url.path, body))
+
+        def do_GET(self) -> None:
+            self._handle("GET")
+
+        def do_POST(self) -> None:
+            self._handle("POST")
+
+        def do_PATCH(self) -> None:
+            self._handle("PATCH")
+
+        def do_DELETE(self) -> None:
+            self._handle("DELETE")
+
+    return Handler
@@ -0,0 +1,203 @@
+"""Startup latency of each CLI subcommand, and a guard that only `chat` loads the LLM stack.
+
+    python -m bench.startup                       # every subcommand, 5 runs each
+    python -m bench.startup --budget 0.4          # also fail when a p50 exceeds 0.4 s
+    python -m bench.startup --commands fetch,push --json
+
+Each subcommand runs as `python -m agent.cli <command> --help` (`list-teams`
+runs for real; it only reads board_ids.txt) in a fresh interpreter, so the
+wall time is imports plus CLI setup. One extra run with `-X importtime`
+lists the modules it loaded. `--help` exits before a command's body (and its
+lazy imports) runs, so the LLM guard runs each body for real instead: in a
+fresh interpreter, against the fake Jira/Miro servers and a scratch repo
+root (PROBES), then reads sys.modules. Exits 1 if a deterministic command
+imports LangChain/LangGraph or a p50 is over budget.
+"""
+from __future__ import annotations
+from pathlib import Path
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+COMMANDS = {
+    "list-teams": ["list-teams"],
+    "fetch": ["fetch", "--help"],
+    "progress": ["progress", "--help"],
+    "history": ["history", "--help"],
+    "push": ["push", "--help"],
+    "serve-refresh": ["serve-refresh", "--help"],
+    "serve": ["serve", "--help"],
+    "export": ["export", "--help"],
+    "compact": ["compact", "--help"],
+    "chat": ["chat", "--help"],
+}
+# Arguments that run each command's body; "{tmp}" is the scratch repo root.
+PROBES = {
+    "list-teams": ["list-teams"],
+    "fetch": ["fetch"],
+    "progress": ["progress"],
+    "history": ["history", "--backfill"],
+    "push": ["push", "uXjBenchmark="],
+    "serve-refresh": ["serve-refresh", "--once"],
+    "serve": ["serve", "--port", "0"],
+    "export": ["export", "--output", "{tmp}/export.csv"],
+    "compact": ["compact"],
+    "chat": ["chat", "list teams"],
+}
+PROBE_BOARDS = 3
+LLM_STACK = ("langchain", "langchain_core", "langgraph", "langchain_openai", "langchain_anthropic")
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q * len(ordered) + 0.5) - 1))]
+
+
+def _command(argv: list[str], importtime: bool = False) -> list[str]:
+    return [sys.executable, *(["-X", "importtime"] if importtime else []), "-m", "agent.cli", *argv]
+
+
+def _imports(argv: list[str]) -> tuple[float, set[str]]:
+    """Total import seconds and the top-level packages loaded, from `-X importtime`."""
+    p = subprocess.run(_command(argv, importtime=True), cwd=REPO_ROOT, capture_output=True, text=True)
+    total, packages = 0.0, set()
+    for line in p.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            total += int(cumulative) / 1e6  # microseconds; top-level entries only, so no double counting
+        packages.add(name.strip().split(".")[0])
+    return total, packages
+
+
+def _llm_modules() -> list[str]:
+    return sorted({m.split(".")[0] for m in sys.modules} & set(LLM_STACK))
+
+
+def probe(name: str) -> dict:
+    """Run one command's body in this process and report the LLM packages it imported.
+
+    Meant for a fresh interpreter (see _probe); `serve` is probed once it answers /health.
+    """
+    from .fake_servers import FakeServer
+
+    with tempfile.TemporaryDirectory() as tmp, FakeServer(PROBE_BOARDS) as server:
+        root = Path(tmp)
+        (root / "scripts").mkdir()
+        (root / "board_ids.txt").write_text("".join(f"# Team {b}\n{b}\n" for b in range(1, PROBE_BOARDS + 1)))
+        os.environ.update(server.environment())
+        os.environ["REFRESH_BACKGROUND"] = "off"
+
+        from agent import cli
+
+        cli.repo_root = lambda: root
+        argv = [a.replace("{tmp}", tmp) for a in PROBES[name]]
+        if name == "serve":
+            with socket.socket() as s:
+                s.bind(("127.0.0.1", 0))
+                port = s.getsockname()[1]
+            argv[argv.index("0")] = str(port)
+            threading.Thread(target=lambda: cli.app(argv, standalone_mode=False), daemon=True).start()
+            code = _wait_healthy(f"http://127.0.0.1:{port}/health")
+        else:
+            try:
+                code = cli.app(argv, standalone_mode=False) or 0
+            except SystemExit as e:
+                code = e.code or 0
+        return {"command": name, "exit": code, "llm_stack": _llm_modules()}
+
+
+def _wait_healthy(url: str, timeout: float = 15) -> int:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1).read()
+            return 0
+        except OSError:
+            time.sleep(0.05)
+    return 1
+
+
+def _probe(name: str) -> dict:
+    p = subprocess.run(
+        [sys.executable, "-m", "bench.startup", "--probe", name], cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    lines = [line for line in p.stdout.splitlines() if line.startswith("PROBE ")]
+    if not lines:
+        return {"command": name, "exit": p.returncode, "llm_stack": [], "error": p.stderr.strip()[-500:]}
+    return json.loads(lines[-1][len("PROBE "):])
+
+
+def measure(name: str, repeat: int) -> dict:
+    argv = COMMANDS[name]
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(_command(argv), cwd=REPO_ROOT, capture_output=True, check=False)
+        timings.append(time.perf_counter() - started)
+    import_s, packages = _imports(argv)
+    run = _probe(name)
+    return {
+        "command": name,
+        "runs": repeat,
+        "p50_s": round(_percentile(timings, 0.50), 4),
+        "p95_s": round(_percentile(timings, 0.95), 4),
+        "import_s": round(import_s, 4),
+        "modules": len(packages),
+        "llm_stack": run["llm_stack"],
+        "probe_error": run.get("error", ""),
+    }
+
+
+def _table(rows: list[dict]) -> str:
+    head = f"{'command':<14} {'p50 s':>7} {'p95 s':>7} {'import s':>9} {'packages':>8}  LLM stack"
+    lines = [head, "-" * len(head)]
+    for r in rows:
+        lines.append(
+            f"{r['command']:<14} {r['p50_s']:>7.3f} {r['p95_s']:>7.3f} {r['import_s']:>9.3f} {r['modules']:>8}"
+            f"  {', '.join(r['llm_stack']) or '-'}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m bench.startup", description=__doc__.splitlines()[0])
+    parser.add_argument("--commands", default=",".join(COMMANDS), help="Comma-separated subcommands")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per subcommand")
+    parser.add_argument("--budget", type=float, default=0, help="Fail when a p50 exceeds this many seconds (0 = off)")
+    parser.add_argument("--json", action="store_true", help="Print JSON rows instead of a table")
+    parser.add_argument("--probe", help=argparse.SUPPRESS)  # internal: run one command body, see probe()
+    args = parser.parse_args(argv)
+    if args.probe:
+        print("PROBE " + json.dumps(probe(args.probe)), flush=True)
+        os._exit(0)  # don't wait for `serve` and its thread pools
+    names = [c for c in args.commands.split(",") if c]
+    unknown = set(names) - set(COMMANDS)
+    if unknown:
+        parser.error(f"unknown command(s): {', '.join(sorted(unknown))}")
+
+    rows = [measure(name, args.repeat) for name in names]
+    print(json.dumps(rows, indent=2) if args.json else _table(rows))
+
+    # Only chat may load the LLM stack, and only once a prompt runs (`chat --help` stays light).
+    failures = [f"{r['command']} imports {', '.join(r['llm_stack'])}" for r in rows if r["llm_stack"] and r["command"] != "chat"]
+    failures += [f"{r['command']} probe failed: {r['probe_error']}" for r in rows if r["probe_error"]]
+    if args.budget:
+        failures += [f"{r['command']} p50 {r['p50_s']:.3f}s > {args.budget}s" for r in rows if r["p50_s"] > args.budget]
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
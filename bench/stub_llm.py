@@ -0,0 +1,37 @@
+"""Deterministic stand-in for the chat model behind node_parse_intent."""
+from __future__ import annotations
+import json
+import re
+import time
+
+from langchain_core.messages import AIMessage
+
+
+class StubLLM:
+    """Answers the intent prompt from keywords, optionally after a fixed delay."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def invoke(self, messages) -> AIMessage:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        user = messages[-1].content.rsplit("User:", 1)[-1].lower()
+        miro = re.search(r"([A-Za-z0-9_-]{9,}=)", messages[-1].content.rsplit("User:", 1)[-1])
+        if "miro" in user:
+            intent = "push"
+        elif re.search(r"\b(list|which)\b", user):
+            intent = "list"
+        elif re.search(r"\b(progress|completion|points)\b", user):
+            intent = "progress"
+        else:
+            intent = "fetch"
+        team = re.search(r"\bteam (\d+)\b", user)
+        return AIMessage(content=json.dumps({
+            "intent": intent,
+            "team_query": f"Team {team[1]}" if team else "all teams",
+            "miro_board_id": miro[1] if miro else None,
+            "display_filter": "goals_only" if "goal" in user and "outcome" not in user else "all",
+        }))
@@ -32,19 +32,25 @@ is_json_object() {
   [[ "$first" == "{" ]]
 }
 
-issues_url="$JIRA_URL/rest/agile/1.0/sprint/$SPRINT_ID/issue?maxResults=200&fields=parent,$EPIC_LINK_FIELD"
-issues_json="$(curl_json "$issues_url" 2>/dev/null || true)"
-
-if [[ -z "$issues_json" ]] || ! is_json_object "$issues_json"; then
-  exit 0
-fi
-
-epics="$(printf '%s' "$issues_json" | python3 -c '
+# Page through every issue of the sprint (Jira caps each page, often at 50).
+epics=""
+start_at=0
+while [[ -n "$start_at" ]]; do
+  issues_url="$JIRA_URL/rest/agile/1.0/sprint/$SPRINT_ID/issue?startAt=$start_at&maxResults=100&fields=parent,$EPIC_LINK_FIELD"
+  issues_json="$(curl_json "$issues_url" 2>/dev/null || true)"
+
+  if [[ -z "$issues_json" ]] || ! is_json_object "$issues_json"; then
+    break
+  fi
+
+  # Prints the page's epic keys, then "NEXT <startAt>" or "NEXT" after the last page.
+  page="$(printf '%s' "$issues_json" | START_AT="$start_at" python3 -c '
 import sys, json, os
 data=json.load(sys.stdin)
 epic_field=os.environ["EPIC_LINK_FIELD"]
+issues=data.get("issues", [])
 keys=set()
-for it in data.get("issues", []):
+for it in issues:
     f=it.get("fields") or {}
     parent=f.get("parent") or {}
     if parent.get("key"):
@@ -57,8 +63,18 @@ for it in data.get("issues", []):
         keys.add(epic_obj["key"])
 for k in sorted(keys):
     print(k)
+seen=int(os.environ["START_AT"]) + len(issues)
+total=data.get("total")
+last=not issues or data.get("isLast") is True or (isinstance(total, int) and seen >= total)
+print("NEXT" if last else f"NEXT {seen}")
 ')"
 
+  start_at="$(printf '%s\n' "$page" | sed -n 's/^NEXT *//p')"
+  epics="$epics"$'\n'"$(printf '%s\n' "$page" | grep -v '^NEXT' || true)"
+done
+
+epics="$(printf '%s\n' "$epics" | sed '/^$/d' | sort -u)"
+
 [[ -z "$epics" ]] && exit 0
 
 while IFS= read -r epic; do
@@ -19,17 +19,24 @@ MIRO_BOARD_ID="${MIRO_BOARD_ID#-}"
 # Optional team filter (second argument) - case insensitive partial match
 TEAM_FILTER="${2:-}"
 
+# Optional pre-built card payloads (JSON lines: {"title": ..., "payload": ...}),
+# e.g. from agent.tools.push_goals_to_miro. Skips reading the CSV report.
+MIRO_CARDS_FILE="${MIRO_CARDS_FILE:-}"
+
 REPORTS_DIR="$REPO_ROOT/reports"
-LATEST_CSV="$(ls -t "$REPORTS_DIR"/Sprint_Goals_*.csv 2>/dev/null | head -n 1 || true)"
-if [[ -z "${LATEST_CSV}" || ! -f "${LATEST_CSV}" ]]; then
-  echo "❌ No Sprint Goals CSV found in: $REPORTS_DIR"
-  exit 1
+LATEST_CSV=""
+if [[ -z "$MIRO_CARDS_FILE" ]]; then
+  LATEST_CSV="$(ls -t "$REPORTS_DIR"/Sprint_Goals_*.csv 2>/dev/null | head -n 1 || true)"
+  if [[ -z "${LATEST_CSV}" || ! -f "${LATEST_CSV}" ]]; then
+    echo "❌ No Sprint Goals CSV found in: $REPORTS_DIR"
+    exit 1
+  fi
 fi
 
 echo "🚀 Pushing Sprint Goals to Miro (Cards)"
 echo "================================"
 echo "Miro Board ID: $MIRO_BOARD_ID"
-echo "Using report : $LATEST_CSV"
+echo "Using report : ${LATEST_CSV:-$MIRO_CARDS_FILE}"
 echo
 
 MIRO_API_BASE="https://api.miro.com/v2"
@@ -38,6 +45,10 @@ MIRO_API_BASE="https://api.miro.com/v2"
 TEMP_FILE=$(mktemp)
 trap "rm -f $TEMP_FILE" EXIT
 
+if [[ -n "$MIRO_CARDS_FILE" ]]; then
+  cp "$MIRO_CARDS_FILE" "$TEMP_FILE"
+else
+
 export LATEST_CSV
 export TEAM_FILTER
 python3 -c '
@@ -115,6 +126,7 @@ with open(csv_path, newline="", encoding="utf-8") as f:
         print(json.dumps({"title": board_name, "payload": payload}))
         card_index += 1
 ' > "$TEMP_FILE"
+fi
 
 # Count how many cards to create
 CARD_COUNT=$(wc -l < "$TEMP_FILE" | tr -d ' ')
@@ -0,0 +1,25 @@
+from __future__ import annotations
+from pathlib import Path
+
+import pytest
+
+from bench.fake_servers import FakeServer
+
+BOARDS = 4
+
+
+@pytest.fixture
+def fake_server(request: pytest.FixtureRequest, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Fake Jira/Miro on localhost, the environment pointing at it, and a repo root in `tmp_path`.
+
+    The repo root holds board_ids.txt with boards 1..BOARDS named "Team <id>".
+    Parametrize indirectly with a dict of FakeServer options, e.g. {"epics": 0}.
+    """
+    (tmp_path / "scripts").mkdir()
+    (tmp_path / "board_ids.txt").write_text("".join(f"# Team {b}\n{b}\n" for b in range(1, BOARDS + 1)))
+    monkeypatch.chdir(tmp_path)
+    with FakeServer(BOARDS, **getattr(request, "param", {})) as server:
+        for key, value in server.environment().items():
+            monkeypatch.setenv(key, value)
+        monkeypatch.setenv("REFRESH_BACKGROUND", "off")
+        yield server
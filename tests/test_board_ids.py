@@ -0,0 +1,44 @@
+from __future__ import annotations
+from pathlib import Path
+
+import pytest
+
+from agent.board_ids import BoardRegistry, TeamBoard, board_registry, parse_board_ids
+
+
+@pytest.fixture
+def registry(tmp_path: Path) -> BoardRegistry:
+    path = tmp_path / "board_ids.txt"
+    path.write_text("# Aqua Team\n350\n\nApollo:492\nAquarius Team: 17\n# Orphan\n\n1001\n")
+    return board_registry(path)
+
+
+def test_both_formats_are_parsed(registry: BoardRegistry):
+    assert registry.teams == [
+        TeamBoard("Aqua Team", 350), TeamBoard("Apollo", 492), TeamBoard("Aquarius Team", 17), TeamBoard("Orphan", 1001),
+    ]
+
+
+@pytest.mark.parametrize("query, boards", [
+    (None, [350, 492, 17, 1001]),
+    ("Aqua", [350]),  # exact short name beats the "Aquarius" prefix
+    ("aqua team", [350]),
+    ("aq", [350, 17]),  # prefix, in file order
+    ("rius", [17]),  # substring
+    ("42", [42]),  # a literal board id
+    ("Apolo", [492]),  # closest fuzzy name
+    ("zebra", []),
+])
+def test_resolve(registry: BoardRegistry, query: str | None, boards: list[int]):
+    assert registry.resolve(query) == boards
+
+
+def test_registry_is_reparsed_when_the_file_changes(tmp_path: Path):
+    path = tmp_path / "board_ids.txt"
+    assert board_registry(path).teams == []
+    path.write_text("Aqua:1\n")
+    first = board_registry(path)
+    assert board_registry(path) is first
+    path.write_text("Aqua:1\nApollo:2\n")
+    assert board_registry(path).resolve("apollo") == [2]
+    assert parse_board_ids(path) == board_registry(path).teams
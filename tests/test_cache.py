@@ -0,0 +1,56 @@
+from __future__ import annotations
+from pathlib import Path
+import itertools
+
+import pytest
+
+from agent import cache
+from agent.cache import ResponseCache, resource_kind
+from agent.tools import fetch_sprint_details
+
+
+@pytest.mark.parametrize("path, kind", [
+    ("/rest/agile/1.0/board/7", "board"),
+    ("/rest/agile/1.0/board/7/sprint", "sprints"),
+    ("/rest/agile/1.0/sprint/700/issue", "sprint_issues"),
+    ("/rest/api/3/search/jql", "search"),
+    ("/rest/api/3/myself", "other"),
+])
+def test_resource_kind(path: str, kind: str):
+    assert resource_kind(path) == kind
+
+
+def test_entries_round_trip_and_revalidate(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    clock = itertools.count(1000)
+    monkeypatch.setattr(cache.time, "time", lambda: next(clock))
+    c = ResponseCache(tmp_path / "cache.sqlite")
+    key = ResponseCache.make_key("GET", "/rest/agile/1.0/board/7")
+    assert c.get(key) is None
+    c.put(key, b"{}", etag='"v1"', last_modified="Sat, 17 Oct 2026 10:00:00 GMT")
+    entry = c.get(key)
+    assert (entry.body, entry.etag, entry.last_modified) == (b"{}", '"v1"', "Sat, 17 Oct 2026 10:00:00 GMT")
+    c.revalidated(key)
+    assert c.get(key).stored_at > entry.stored_at
+    assert c.ttl("board") == 24 * 3600 and c.ttl("other") == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    clock = itertools.count(1000)
+    monkeypatch.setattr(cache.time, "time", lambda: next(clock))
+    c = ResponseCache(tmp_path / "cache.sqlite", max_bytes=300)
+    for key in "abc":
+        c.put(key, b"x" * 100)
+    c.get("a")  # now b, then c, are the least recently used
+    c.put("d", b"x" * 100)
+    # Over the cap, entries go oldest first until 10% of it is free again.
+    assert [k for k in "abcd" if c.get(k) is not None] == ["a", "d"]
+
+
+def test_cached_fetch_makes_no_jira_calls(fake_server, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("JIRA_CACHE", "on")
+    monkeypatch.setenv("JIRA_CACHE_PATH", str(tmp_path / "jira_cache.sqlite"))
+    first = fetch_sprint_details(tmp_path / "scripts", [1, 2])
+    calls = fake_server.snapshot()["jira"]
+    second = fetch_sprint_details(tmp_path / "scripts", [1, 2])
+    assert fake_server.snapshot()["jira"] == calls
+    assert second.records == first.records
@@ -0,0 +1,56 @@
+from __future__ import annotations
+from datetime import date
+from pathlib import Path
+import io
+import json
+
+import pytest
+
+from agent.formats import FORMATS, record_writer
+from agent.records import SprintRecord, read_csv
+
+RECORDS = [
+    SprintRecord(1, "Team 1", "100", "Sprint 1", "active", "2026-10-05", "2026-10-19", "Ship it", ("Faster, cheaper", "Safer")),
+    SprintRecord(2, "Team 2"),
+]
+
+
+def write(fmt: str, records: list[SprintRecord]) -> bytes:
+    buf = io.BytesIO()
+    with record_writer(fmt, buf) as w:
+        for r in records:
+            w.write(r)
+    assert w.count == len(records)
+    return buf.getvalue()
+
+
+def test_ndjson_and_json_have_typed_fields():
+    lines = [json.loads(line) for line in write("ndjson", RECORDS).decode().splitlines()]
+    assert lines == json.loads(write("json", RECORDS))
+    assert lines[0]["sprint_id"] == 100 and lines[0]["start"] == "2026-10-05"
+    assert lines[0]["outcomes"] == ["Faster, cheaper", "Safer"]
+    assert lines[1]["sprint_id"] is None and lines[1]["start"] is None
+
+
+def test_empty_json_is_a_valid_array():
+    assert json.loads(write("json", [])) == []
+
+
+def test_csv_round_trips_through_read_csv(tmp_path: Path):
+    path = tmp_path / "report.csv"
+    path.write_bytes(write("csv", RECORDS))
+    assert read_csv(path) == RECORDS
+
+
+def test_parquet_columns():
+    pq = pytest.importorskip("pyarrow.parquet")
+    table = pq.read_table(io.BytesIO(write("parquet", RECORDS)))
+    rows = table.to_pylist()
+    assert rows[0]["start"] == date(2026, 10, 5) and rows[0]["outcomes"] == ["Faster, cheaper", "Safer"]
+    assert rows[1]["sprint_id"] is None
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError, match="ndjson"):
+        record_writer("xml", io.BytesIO())
+    assert "xml" not in FORMATS
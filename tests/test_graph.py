@@ -0,0 +1,76 @@
+from __future__ import annotations
+from pathlib import Path
+import subprocess
+
+import pytest
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+import agent.summary
+from agent.graph import ConversationMemory, build_graph, stream_reply
+
+
+def _chat(graph, prompt: str, thread_id: str = "t1") -> str:
+    return "".join(stream_reply(graph, {"messages": [HumanMessage(content=prompt)]}, thread_id=thread_id))
+
+
+@pytest.mark.parametrize("fake_server", [{"epics": 0}], indirect=True)
+def test_follow_up_turns_make_no_jira_or_subprocess_calls(fake_server, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    graph = build_graph(
+        scripts_dir=tmp_path / "scripts",
+        board_ids_file=tmp_path / "board_ids.txt",
+        default_miro_board_id="uXjBenchmark=",
+        checkpointer=MemorySaver(),
+    )
+    assert "Team 1" in _chat(graph, "fetch sprint goals for Team 1")
+
+    lookups: list[str] = []
+    monkeypatch.setattr(agent.summary, "fetch_customer_outcomes", lambda *args: lookups.append(args) or [])
+
+    def no_spawn(*args, **kwargs):
+        raise AssertionError(f"subprocess spawned: {args}")
+
+    monkeypatch.setattr(subprocess, "Popen", no_spawn)
+    before = fake_server.snapshot()
+    for prompt in ("now only outcomes", "just the goals", "show it again"):
+        assert "Team 1" in _chat(graph, prompt)
+    assert fake_server.snapshot() == before
+    assert lookups == []
+
+
+def test_stateless_turns_are_not_checkpointed(fake_server, tmp_path: Path):
+    memory = ConversationMemory()
+    graph = build_graph(
+        scripts_dir=tmp_path / "scripts",
+        board_ids_file=tmp_path / "board_ids.txt",
+        default_miro_board_id=None,
+        checkpointer=memory,
+    )
+    assert "Team 1" in "".join(stream_reply(graph, {"messages": [HumanMessage(content="fetch Team 1")]}))
+    assert not memory.storage and not memory.blobs
+
+
+def test_conversation_memory_is_bounded(fake_server, tmp_path: Path):
+    memory = ConversationMemory(max_threads=2)
+    graph = build_graph(
+        scripts_dir=tmp_path / "scripts",
+        board_ids_file=tmp_path / "board_ids.txt",
+        default_miro_board_id=None,
+        checkpointer=memory,
+    )
+    for thread_id in ("a", "b", "c"):
+        _chat(graph, "fetch sprint goals for Team 1", thread_id)
+        _chat(graph, "now only outcomes", thread_id)
+    assert set(memory.storage) == {"b", "c"}
+    assert all(len(checkpoints) == 1 for ns in memory.storage.values() for checkpoints in ns.values())
+    # The one checkpoint kept still carries the conversation's last fetch
+    assert "Team 1" in _chat(graph, "just the goals", "c")
+
+
+def test_intent_sources_are_exported_as_metrics(fake_server, tmp_path: Path):
+    from agent.metrics import METRICS
+
+    METRICS.reset()
+    graph = build_graph(scripts_dir=tmp_path / "scripts", board_ids_file=tmp_path / "board_ids.txt", default_miro_board_id=None)
+    _chat(graph, "list teams")
+    assert 'intent_parses_total{source="rules"} 1' in METRICS.to_prometheus()
@@ -0,0 +1,29 @@
+from __future__ import annotations
+from pathlib import Path
+
+import pytest
+
+from agent.tools import backfill_sprint_history, read_sprint_history
+
+
+@pytest.mark.parametrize("fake_server", [{"closed": 60}], indirect=True)
+def test_backfill_resumes_where_it_stopped(fake_server, tmp_path: Path):
+    scripts_dir = tmp_path / "scripts"
+    assert not read_sprint_history(scripts_dir, [1, 2]).ok
+
+    r = backfill_sprint_history(scripts_dir, [1, 2])
+    first = fake_server.snapshot()["jira:GET"]
+    assert r.ok and "120 closed sprint(s) added" in r.stdout
+    assert [rec.sprint_name for rec in read_sprint_history(scripts_dir, [1], last=2).records] == [
+        "Team 1 Sprint 59", "Team 1 Sprint 60",
+    ]
+
+    fake_server.closed = 62
+    calls = fake_server.snapshot()["jira:GET"]
+    r = backfill_sprint_history(scripts_dir, [1, 2])
+    assert r.ok and "4 closed sprint(s) added" in r.stdout
+    # Only the new sprints are requested, not all 60 again
+    assert fake_server.snapshot()["jira:GET"] - calls < first / 5
+    records = read_sprint_history(scripts_dir, [2, 1], last=1).records
+    assert [(rec.board_id, rec.sprint_name) for rec in records] == [(2, "Team 2 Sprint 62"), (1, "Team 1 Sprint 62")]
+    assert all(rec.outcomes for rec in records)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import pytest
+
+from agent.board_ids import TeamBoard
+from agent.intent import classify, intent_cache_key, normalize_prompt
+
+TEAMS = [TeamBoard("Aqua Team", 1), TeamBoard("Apollo", 2)]
+
+
+def intent(prompt: str) -> str | None:
+    parsed = classify(prompt, TEAMS)
+    return parsed and parsed["intent"]
+
+
+@pytest.mark.parametrize("prompt", [
+    "show sprint progress for Aqua",
+    "what is the burndown for apollo",
+    "how far along is aqua",
+    "story points completion for Aqua",
+])
+def test_progress_phrases(prompt: str):
+    assert intent(prompt) == "progress"
+
+
+@pytest.mark.parametrize("prompt", [
+    "show complete sprint details for Aqua",
+    "is aqua done",
+    "status of aqua",
+    "show progress on aqua's goals",
+])
+def test_progress_lookalikes_go_to_the_llm(prompt: str):
+    assert intent(prompt) is None
+
+
+@pytest.mark.parametrize("prompt, sprints", [
+    ("How have Aqua's goals evolved over the last 6 sprints?", 6),
+    ("aqua goals for the last 3 sprints", 3),
+    ("show 4 closed sprints for apollo", 4),
+    ("sprint goal history for aqua", None),
+    ("apollo outcomes over time", None),
+])
+def test_history(prompt: str, sprints: int | None):
+    parsed = classify(prompt, TEAMS)
+    assert parsed is not None and parsed["intent"] == "history"
+    assert parsed["sprints"] == sprints
+
+
+@pytest.mark.parametrize("prompt", [
+    "what changed in aqua's goals this time",
+    "show goals for the last sprint",
+    "aqua goals over the last few weeks",
+])
+def test_history_lookalikes_go_to_the_llm(prompt: str):
+    assert intent(prompt) is None
+
+
+@pytest.mark.parametrize("prompt, expected", [
+    ("fetch sprint goals for Aqua Team", {"intent": "fetch", "team_query": "Aqua"}),
+    ("show only the outcomes for board 2", {"intent": "fetch", "team_query": "2", "display_filter": "outcomes_only"}),
+    ("get goals for all teams", {"intent": "fetch", "team_query": "all teams"}),
+    ("push apollo to miro uXjVabc123=", {"intent": "push", "team_query": "Apollo", "miro_board_id": "uXjVabc123="}),
+    ("push to miro", {"intent": "push", "team_query": None}),
+    ("list teams", {"intent": "list", "team_query": None}),
+    ("help", {"intent": "help", "team_query": None}),
+])
+def test_rules(prompt: str, expected: dict):
+    parsed = classify(prompt, TEAMS)
+    assert parsed is not None
+    assert {k: parsed[k] for k in expected} == expected
+
+
+@pytest.mark.parametrize("prompt", [
+    "push aqua",  # push needs a Miro target
+    "fetch goals for aqua and apollo",
+    "show goals for boards 1 and 2",
+    "only goals and only outcomes for aqua",
+    "sync uXjVabc123= and uXjVdef456=",
+])
+def test_ambiguous_prompts_go_to_the_llm(prompt: str):
+    assert intent(prompt) is None
+
+
+@pytest.mark.parametrize("prompt", ["show it again", "just the goals", "sprint goal history", "show progress"])
+def test_prompts_without_a_team_need_a_conversation(prompt: str):
+    assert classify(prompt, TEAMS) is None
+    parsed = classify(prompt, TEAMS, follow_up=True)
+    assert parsed is not None and parsed["team_query"] is None
+
+
+def test_normalize_prompt():
+    assert normalize_prompt("  Push  AQUA to Miro uXjVAbC123=?! ") == "push aqua to miro uXjVAbC123="
+    assert normalize_prompt(None) == ""
+
+
+def test_intent_cache_key(tmp_path):
+    board_ids = tmp_path / "board_ids.txt"
+    board_ids.write_text("1 Aqua Team\n")
+    key = intent_cache_key("Show Aqua goals.", "model-a", board_ids)
+    assert intent_cache_key("show   aqua goals", "model-a", board_ids) == key
+    assert intent_cache_key("show aqua goals", "model-b", board_ids) != key
+    board_ids.write_text("1 Aqua Team\n2 Apollo\n")
+    assert intent_cache_key("show aqua goals", "model-a", board_ids) != key
@@ -0,0 +1,18 @@
+from __future__ import annotations
+from pathlib import Path
+
+import pytest
+
+from agent.tools import fetch_sprint_details
+
+
+def test_incremental_fetch_sees_changes_within_the_sprint_ttl(fake_server, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("JIRA_CACHE", "on")
+    monkeypatch.setenv("JIRA_CACHE_PATH", str(tmp_path / "jira_cache.sqlite"))
+    scripts_dir = tmp_path / "scripts"
+    assert fetch_sprint_details(scripts_dir, [1, 2]).ok
+
+    fake_server.goals[1] = "Launch the new onboarding"
+    r = fetch_sprint_details(scripts_dir, [1, 2], incremental=True)
+    assert r.records[0].goal == "Launch the new onboarding"
+    assert "1 of 2 boards unchanged" in r.stdout
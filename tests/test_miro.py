@@ -0,0 +1,38 @@
+from __future__ import annotations
+from dataclasses import replace
+from pathlib import Path
+
+from agent.records import SprintRecord
+from agent.tools import push_goals_to_miro
+
+BOARD = "uXjVSync123="
+RECORDS = [SprintRecord(b, f"Team {b}", f"{b}00", "Sprint 42", "active", "", "", "Goal", ()) for b in (1, 2)]
+
+
+def test_sync_only_writes_what_changed(fake_server, tmp_path: Path):
+    scripts_dir = tmp_path / "scripts"
+
+    def push(records: list[SprintRecord], **kwargs) -> list[str]:
+        r = push_goals_to_miro(scripts_dir, BOARD, records=records, sync=True, **kwargs)
+        assert r.ok
+        return [c.action for c in r.cards]
+
+    assert push(RECORDS) == ["create", "create"]
+    writes = fake_server.snapshot()["miro"]
+    assert push(RECORDS) == ["unchanged", "unchanged"]
+    assert fake_server.snapshot()["miro"] == writes
+
+    changed = [replace(RECORDS[0], goal="New goal"), RECORDS[1]]
+    assert push(changed) == ["update", "unchanged"]
+    assert fake_server.snapshot()["miro:PATCH"] == 1
+
+    next_sprint = [replace(RECORDS[0], sprint_id="101"), RECORDS[1]]
+    assert push(next_sprint, delete_stale=True) == ["create", "unchanged", "delete"]
+    assert push(next_sprint, delete_stale=True) == ["unchanged", "unchanged"]
+
+
+def test_plain_push_creates_every_card(fake_server, tmp_path: Path):
+    r = push_goals_to_miro(tmp_path / "scripts", BOARD, records=RECORDS, sync=False)
+    assert [c.action for c in r.cards] == ["create", "create"]
+    r = push_goals_to_miro(tmp_path / "scripts", BOARD, records=RECORDS, team_filter="team 2", sync=False)
+    assert [c.title for c in r.cards] == ["Team 2"]
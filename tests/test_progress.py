@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import pytest
+
+from agent.progress import format_progress
+from agent.tools import fetch_sprint_progress
+
+
+@pytest.mark.parametrize("fake_server", [{"issues": 130}], indirect=True)
+def test_every_page_is_counted(fake_server):
+    r = fetch_sprint_progress([1, 2])
+    assert r.ok
+    assert [row.issues for row in r.progress] == [130, 130]
+
+
+@pytest.mark.parametrize("fake_server", [{"issues": 130}], indirect=True)
+def test_a_failed_page_marks_the_totals_incomplete(fake_server):
+    fake_server.broken_pages.add(50)
+    r = fetch_sprint_progress([1])
+    assert not r.ok and r.returncode == 1
+    [row] = r.progress
+    assert row.incomplete and row.issues == 50
+    assert "Incomplete totals for Team 1" in r.stderr
+    assert "incomplete" in r.stdout
+    assert "Incomplete: only 50 issue(s)" in format_progress(r.progress)
@@ -0,0 +1,41 @@
+from __future__ import annotations
+from pathlib import Path
+
+import pytest
+
+from agent.refresh import RefreshScheduler, read_sprint_details
+from agent.store import report_store
+
+from .conftest import BOARDS
+
+
+def test_a_sweep_refreshes_every_board_in_batches(fake_server, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    log: list[str] = []
+    scheduler = RefreshScheduler(tmp_path / "scripts", tmp_path / "board_ids.txt", batch=3, log=log.append)
+    scheduler.run(sweeps=1)
+    stored = report_store(tmp_path / "reports").latest_snapshot()
+    assert [s.record.board_id for s in stored] == list(range(1, BOARDS + 1))
+    assert len({s.run_id for s in stored}) == 2
+    assert log[0].startswith(f"Sweep of {BOARDS} board(s)")
+
+    # A fresh enough snapshot is served without asking Jira
+    monkeypatch.setenv("SNAPSHOT_MAX_AGE", "60")
+    calls = fake_server.snapshot()["jira"]
+    r = read_sprint_details(tmp_path / "scripts", [3, 1])
+    assert r.ok and "from the snapshot" in r.stdout
+    assert [rec.board_id for rec in r.records] == [3, 1]
+    assert fake_server.snapshot()["jira"] == calls
+
+
+def test_priority_requests_skip_the_sweep_interval(fake_server, tmp_path: Path):
+    scheduler = RefreshScheduler(tmp_path / "scripts", tmp_path / "board_ids.txt", interval=3600, batch=BOARDS)
+    scheduler.start()
+    try:
+        assert scheduler.refresh_now([2], timeout=10)
+        fake_server.goals[2] = "Changed goal"
+        # The next sweep is an hour away; the request is served now
+        assert scheduler.refresh_now([2], timeout=10)
+    finally:
+        scheduler.stop()
+    [stored] = report_store(tmp_path / "reports").latest_snapshot([2])
+    assert stored.record.goal == "Changed goal"
@@ -0,0 +1,63 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import asyncio
+import queue
+import threading
+
+import pytest
+
+from agent.service import AgentService
+from agent.service_client import ServiceClient
+
+from .conftest import BOARDS
+
+
+@pytest.fixture
+def service_url(fake_server, tmp_path: Path):
+    """`serve --workers 2` on an ephemeral port."""
+    service = AgentService(tmp_path, freshness=0, workers=2)
+    port: queue.Queue[int] = queue.Queue()
+    threading.Thread(target=lambda: asyncio.run(service.serve(port=0, ready=port.put)), daemon=True).start()
+    return f"http://127.0.0.1:{port.get(timeout=10)}"
+
+
+def test_more_concurrent_chats_than_workers(service_url: str):
+    client = ServiceClient(service_url, timeout=10)
+    prompts = [f"fetch sprint goals for Team {b}" for b in range(1, BOARDS + 1)]
+    with ThreadPoolExecutor(max_workers=len(prompts)) as pool:
+        replies = list(pool.map(lambda p: "".join(client.chat(p)), prompts))
+    for b, reply in zip(range(1, BOARDS + 1), replies):
+        assert f"Team {b}" in reply
+        assert "unavailable" not in reply
+    fetched = client.fetch([1])
+    assert fetched.ok and fetched.records[0].outcomes
+    pushed = client.push("uXjBenchmark=", records=fetched.records, sync=False)
+    assert pushed.ok and len(pushed.cards) == 1
+
+
+def test_bad_requests_and_unknown_paths(service_url: str):
+    import requests
+
+    for body in ("[]", '"x"', "3"):
+        r = requests.post(f"{service_url}/fetch", data=body, timeout=10)
+        assert r.status_code == 400 and not r.json()["ok"]
+    for n in range(3):
+        assert requests.get(f"{service_url}/probe-{n}", timeout=10).status_code == 404
+    metrics = requests.get(f"{service_url}/metrics", timeout=10).text
+    assert 'path="other"' in metrics
+    assert "probe-" not in metrics
+
+
+def test_fresh_results_are_pruned(fake_server, tmp_path: Path):
+    from agent.service import FetchCoalescer
+
+    async def run() -> FetchCoalescer:
+        fetches = FetchCoalescer(tmp_path / "scripts", freshness=0.05)
+        for b in range(1, BOARDS + 1):
+            await fetches.fetch([b])
+        await asyncio.sleep(0.1)
+        await fetches.fetch([1])
+        return fetches
+
+    assert list(asyncio.run(run())._fresh) == [frozenset([1])]
@@ -0,0 +1,49 @@
+from __future__ import annotations
+from pathlib import Path
+
+from agent import store as store_module
+from agent.records import SprintRecord
+from agent.store import ReportStore
+
+
+def rec(board_id: int, sprint: int, goal: str = "Goal") -> SprintRecord:
+    return SprintRecord(board_id, f"Team {board_id}", str(sprint), f"Sprint {sprint}", "closed", "", "", goal, ("Outcome",))
+
+
+def test_latest_snapshot_keeps_each_boards_newest_record(tmp_path: Path):
+    store = ReportStore(tmp_path / "reports.sqlite")
+    store.save_run([rec(1, 100), rec(2, 200), rec(3, 300)])
+    run = store.save_run([rec(2, 201, "New goal")], source="incremental")
+    snapshot = store.latest_snapshot()
+    assert [(s.record.board_id, s.record.sprint_id) for s in snapshot] == [(1, "100"), (2, "201"), (3, "300")]
+    assert snapshot[1].run_id == run and snapshot[1].record.goal == "New goal"
+    assert [s.record.board_id for s in store.latest_snapshot([3, 9, 1])] == [3, 1]
+    assert [s.record.board_id for s in store.latest_run([3, 2])] == [2]
+
+
+def test_seconds_per_board_comes_from_the_last_timed_full_fetch(tmp_path: Path):
+    store = ReportStore(tmp_path / "reports.sqlite")
+    assert store.seconds_per_board() is None
+    store.save_run([rec(1, 100), rec(2, 200)], seconds=4.0)
+    store.save_run([rec(1, 100)], source="incremental", seconds=0.1)
+    assert store.seconds_per_board() == 2.0
+
+
+def test_compaction_keeps_the_latest_records(tmp_path: Path, monkeypatch):
+    store = ReportStore(tmp_path / "reports.sqlite", retention_days=1)
+    monkeypatch.setattr(store_module.time, "time", lambda: 0.0)
+    store.save_run([rec(1, 100), rec(2, 200)])
+    store.save_run([rec(1, 101)])
+    monkeypatch.undo()
+    assert store.compact() == 1  # board 1's superseded record
+    assert [s.record.sprint_id for s in store.latest_snapshot()] == ["101", "200"]
+
+
+def test_sprint_history_resumes_at_the_cursor(tmp_path: Path):
+    store = ReportStore(tmp_path / "reports.sqlite")
+    assert store.history_cursors([1, 2]) == {1: 0, 2: 0}
+    store.save_history(1, [rec(1, n) for n in (1, 2, 3)], start=0, next_start=3)
+    store.save_history(1, [rec(1, 4)], start=3, next_start=4)
+    assert store.history_cursors([1, 2]) == {1: 4, 2: 0}
+    assert [r.sprint_id for r in store.sprint_history([1, 2], last=2)] == ["3", "4"]
+    assert len(store.sprint_history([1])) == 4
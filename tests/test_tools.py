@@ -0,0 +1,38 @@
+from __future__ import annotations
+from pathlib import Path
+
+import pytest
+
+from agent.records import SprintRecord
+from agent.store import report_store
+from agent.tools import fetch_sprint_details, push_goals_to_miro
+
+SCRIPT = """#!/usr/bin/env bash
+out="$REPORTS/Sprint_Goals_20261017_120000.csv"
+mkdir -p "$REPORTS"
+printf 'Board ID,Board Name,Sprint ID,Sprint Name,Sprint State,Start Date,End Date,Sprint Goal,Customer Outcome\\n' > "$out"
+for b in "$@"; do printf '%s,Team %s,%s00,Sprint,active,2026-10-05,2026-10-19,Goal,\\n' "$b" "$b" "$b" >> "$out"; done
+echo "✅ Done! Output saved to:"
+echo "$out"
+"""
+
+
+def test_script_backend_reads_a_report_path_with_spaces(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    root = tmp_path / "my repo"
+    scripts_dir = root / "scripts"
+    scripts_dir.mkdir(parents=True)
+    (scripts_dir / "fetch_sprint_details.sh").write_text(SCRIPT)
+    monkeypatch.setenv("JIRA_FETCH_BACKEND", "script")
+    monkeypatch.setenv("REPORTS", str(root / "script reports"))
+    r = fetch_sprint_details(scripts_dir, [1, 2])
+    assert r.ok
+    assert [rec.board_id for rec in r.records] == [1, 2]
+
+
+def test_push_defaults_to_the_most_recent_run_in_board_file_order(fake_server, tmp_path: Path):
+    store = report_store(tmp_path / "reports")
+    store.save_run([SprintRecord(b, f"Team {b}", f"{b}00", "Old", "active", "", "", "Old goal", ()) for b in (1, 2, 3, 4)])
+    store.save_run([SprintRecord(b, f"Team {b}", f"{b}01", "New", "active", "", "", "New goal", ()) for b in (3, 1)])
+    r = push_goals_to_miro(tmp_path / "scripts", "uXjBenchmark=", sync=False)
+    assert r.ok
+    assert [c.title for c in r.cards] == ["Team 1", "Team 3"]
@@ -1,104 +1,38 @@
 import os
-import subprocess
-import csv
 import io
 from pathlib import Path
 import streamlit as st
-from dotenv import load_dotenv
+
+from agent.board_ids import board_registry
+from agent.records import SprintRecord, to_csv
+from agent.refresh import read_sprint_details, start_background_refresh
+from agent.resources import get_resources
+from agent.service_client import service_client
+from agent.tools import push_goals_to_miro
 
 REPO_ROOT = Path(__file__).resolve().parent
 BOARD_FILE = REPO_ROOT / "board_ids.txt"
 SCRIPTS_DIR = REPO_ROOT / "scripts"
-PUSH_SCRIPT = SCRIPTS_DIR / "push_to_miro_cards.sh"
-REPORTS_DIR = REPO_ROOT / "reports"
 
-# Load .env from repo root
-load_dotenv(dotenv_path=REPO_ROOT / ".env", override=True)
+# Load .env from repo root (re-read only when it changes; shared across reruns)
+get_resources(REPO_ROOT)
+# With AGENT_SERVICE_URL set, fetches and pushes go through `sprint-goals-agent serve`,
+# which shares one Jira fetch between everyone asking for the same teams at once.
+service = service_client()
+if service is None:
+    # Keeps the sprint snapshot warm in the background when REFRESH_BACKGROUND=on
+    start_background_refresh(SCRIPTS_DIR, BOARD_FILE)
 
 st.set_page_config(page_title="Sprint Assistant", page_icon="🎯", layout="wide")
 st.title("🎯 Sprint Assistant")
 
 
 # ---------- Helpers ----------
-def normalize_team_name(raw: str) -> str:
-    # "# Amber Team" -> "Amber"
-    s = raw.strip()
-    if s.startswith("#"):
-        s = s.lstrip("#").strip()
-    # remove trailing "Team" if present
-    if s.lower().endswith("team"):
-        s = s[:-4].strip()
-    return s
-
-
-def load_teams(board_file: Path) -> dict[str, str]:
-    """
-    Supports BOTH formats:
-
-    1) Name:ID
-       Amber:350
-
-    2) Comment + ID on next line
-       # Amber Team
-       350
-    """
-    teams: dict[str, str] = {}
-    if not board_file.exists():
-        return teams
-
-    pending_name: str | None = None
-
-    for line in board_file.read_text().splitlines():
-        line = line.strip()
-        if not line:
-            continue
-
-        # Format 1: Name:ID
-        if ":" in line and not line.startswith("#"):
-            name, bid = line.split(":", 1)
-            name = normalize_team_name(name)
-            bid = bid.strip()
-            if name and bid.isdigit():
-                teams[name] = bid
-            pending_name = None
-            continue
-
-        # Format 2: "# Team Name" line
-        if line.startswith("#"):
-            pending_name = normalize_team_name(line)
-            continue
-
-        # Format 2: ID line after "# Team Name"
-        if line.isdigit() and pending_name:
-            teams[pending_name] = line
-            pending_name = None
-            continue
-
-        # If it's a naked number without a name, you can optionally keep it:
-        # (we’ll ignore it to keep PM UI clean)
-        pending_name = None
-
-    return teams
-
-
-def run_cmd(cmd: list[str]) -> tuple[int, str, str]:
-    p = subprocess.run(cmd, cwd=str(REPO_ROOT), capture_output=True, text=True)
-    return p.returncode, p.stdout, p.stderr
-
-
 def pretty_block(title: str, text: str):
     st.subheader(title)
     st.code(text or "(no output)", language="text")
 
 
-def get_latest_csv() -> Path | None:
-    """Get the most recent CSV report file."""
-    if not REPORTS_DIR.exists():
-        return None
-    csvs = sorted(REPORTS_DIR.glob("Sprint_Goals_*.csv"), reverse=True)
-    return csvs[0] if csvs else None
-
-
 def format_bullets(text: str, separator: str = " ; ") -> str:
     """Convert separated text into bullet points."""
     if not text or not text.strip():
@@ -112,36 +46,20 @@ def format_bullets(text: str, separator: str = " ; ") -> str:
     return "\n".join([f"• {p}" for p in parts])
 
 
-def format_sprint_summary(csv_path: Path) -> str:
-    """Format CSV data into a nice readable summary."""
-    if not csv_path or not csv_path.exists():
-        return "No report found."
-    
+def format_sprint_summary(records: list[SprintRecord]) -> str:
+    """Format fetched sprint records into a nice readable summary."""
     blocks = []
-    with open(csv_path, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            # Normalize keys (handle BOM)
-            row = {(k or "").lstrip("\ufeff").strip(): (v or "").strip() for k, v in row.items()}
-            
-            board_name = row.get("Board Name", "").strip()
-            sprint_name = row.get("Sprint Name", "").strip()
-            sprint_state = row.get("Sprint State", "").strip()
-            start_date = row.get("Start Date", "").strip()
-            end_date = row.get("End Date", "").strip()
-            goal = row.get("Sprint Goal", "").strip()
-            outcome = row.get("Customer Outcome", "").strip()
-            
-            if not board_name:
-                continue
-            
-            title = f"**{board_name} — {sprint_name}**"
-            dates = f"📅 {start_date} → {end_date} ({sprint_state})"
-            
-            goal_bullets = format_bullets(goal, " | ")
-            outcome_bullets = format_bullets(outcome, " ; ")
-            
-            block = f"""{title}
+    for rec in records:
+        if not rec.board_name:
+            continue
+
+        title = f"**{rec.board_name} — {rec.sprint_name}**"
+        dates = f"📅 {rec.start} → {rec.end} ({rec.sprint_state})"
+
+        goal_bullets = format_bullets(rec.goal, " | ")
+        outcome_bullets = "\n".join(f"• {o}" for o in rec.outcomes) or "• Not specified"
+
+        block = f"""{title}
 {dates}
 
 🎯 **Customer Outcome**
@@ -150,8 +68,8 @@ def format_sprint_summary(csv_path: Path) -> str:
 📌 **Sprint Goal**
 {goal_bullets}
 """
-            blocks.append(block)
-    
+        blocks.append(block)
+
     return "\n---\n\n".join(blocks) if blocks else "No sprint data found."
 
 
@@ -169,7 +87,8 @@ with st.sidebar:
 
 
 # ---------- Load teams ----------
-teams = load_teams(BOARD_FILE)
+registry = board_registry(BOARD_FILE)
+teams = registry.by_short_name()
 
 if not teams:
     st.error(
@@ -190,9 +109,11 @@ col1, col2 = st.columns(2)
 
 with col1:
     fetch_clicked = st.button("Fetch Sprint Details", use_container_width=True)
+    force_refresh = st.checkbox("Refresh from Jira now", value=False, help="Skip the pre-fetched snapshot")
 
 with col2:
     push_clicked = st.button("Push to Miro", use_container_width=True)
+    sync_cards = st.checkbox("Update existing cards", value=True, help="Update cards from earlier pushes instead of adding new ones")
 
 
 # ---------- Fetch ----------
@@ -201,27 +122,27 @@ if fetch_clicked:
 
     with st.spinner("Fetching sprint details from JIRA..."):
         if team_choice == "All teams":
-            # Fetch all teams directly using the script
-            script = str(SCRIPTS_DIR / "fetch_all_team_sprint_details.sh")
-            code, out, err = run_cmd(["bash", script])
+            board_ids = registry.resolve()
+        else:
+            board_ids = registry.resolve(team_choice)
+        if service is not None:
+            result = service.fetch(board_ids, force=force_refresh)
         else:
-            # Fetch single team by board ID
-            board_id = teams[team_choice]
-            script = str(SCRIPTS_DIR / "fetch_sprint_details.sh")
-            code, out, err = run_cmd(["bash", script, board_id])
+            result = read_sprint_details(SCRIPTS_DIR, board_ids, force=force_refresh)
 
-    if code != 0:
+    if not result.ok:
         st.error("Failed to fetch sprint details.")
-        pretty_block("Error", err)
+        pretty_block("Error", result.stderr)
     else:
-        # Show formatted summary from the CSV
         st.subheader(f"Sprint Details – {team_choice}")
-        csv_path = get_latest_csv()
-        if csv_path:
-            formatted = format_sprint_summary(csv_path)
-            st.markdown(formatted)
+        st.session_state.records = result.records
+        if result.records:
+            st.markdown(format_sprint_summary(result.records))
+            csv_buf = io.StringIO()
+            to_csv(result.records, csv_buf)
+            st.download_button("Download CSV", csv_buf.getvalue(), file_name="Sprint_Goals.csv", mime="text/csv")
         else:
-            pretty_block(f"Sprint Details – {team_choice}", out.strip())
+            pretty_block(f"Sprint Details – {team_choice}", result.stdout.strip())
 
 
 # ---------- Push to Miro ----------
@@ -232,16 +153,18 @@ if push_clicked:
         st.error("Please enter the Miro Board ID.")
         st.stop()
 
-    if not PUSH_SCRIPT.exists():
-        st.error("Push to Miro script not found.")
-        st.stop()
-
     with st.spinner("Pushing sprint goals to Miro..."):
-        code, out, err = run_cmd(["bash", str(PUSH_SCRIPT), miro_board_id])
+        # Push what this session last fetched; without a fetch, the latest report.
+        if service is not None:
+            result = service.push(miro_board_id, records=st.session_state.get("records"), sync=sync_cards)
+        else:
+            result = push_goals_to_miro(
+                SCRIPTS_DIR, miro_board_id, records=st.session_state.get("records"), sync=sync_cards
+            )
 
-    if code != 0:
+    if not result.ok:
         st.error("Failed to push sprint goals to Miro.")
-        pretty_block("Error", err)
+        pretty_block("Error", result.stderr or result.stdout)
     else:
         st.success("Sprint goals pushed to Miro successfully ✅")
         st.markdown(f"[Open Miro board](https://miro.com/app/board/{miro_board_id}/)")
\ No newline at end of file
@@ -1,36 +1,37 @@
-import os
-import streamlit as st
-from dotenv import load_dotenv
 from pathlib import Path
+import uuid
+
 from langchain_core.messages import HumanMessage
+import streamlit as st
 
-from agent.config import Settings
-from agent.graph import build_graph
+from agent.graph import stream_reply
+from agent.refresh import start_background_refresh
+from agent.resources import get_resources
+from agent.service_client import service_client
 
 ROOT = Path(__file__).parent
 
-# Load .env explicitly for local dev (avoids Python 3.13 dotenv auto-discovery issues)
-load_dotenv(dotenv_path=ROOT / ".env", override=True)
-
-# On Streamlit Cloud, load secrets into environment variables
-if hasattr(st, "secrets"):
-    for key, value in st.secrets.items():
-        if isinstance(value, str):
-            os.environ.setdefault(key, value)
+# Settings, compiled graph and LLM client are built once per process and shared
+# across sessions/reruns; .env (loaded explicitly for local dev) and Streamlit
+# Cloud secrets are applied when they change.
+resources = get_resources(ROOT, secrets=st.secrets if hasattr(st, "secrets") else None)
 
 st.set_page_config(page_title="JIRA Assistant AI", page_icon="🤖", layout="centered")
 st.title("🤖 JIRA Assistant AI")
 st.caption('Try: "Fetch sprint details for Aqua", "Fetch sprint details for all teams", "Push to Miro"')
 
-settings = Settings.load(ROOT)
-graph = build_graph(
-    scripts_dir=settings.scripts_dir,
-    board_ids_file=settings.board_ids_file,
-    default_miro_board_id=settings.default_miro_board_id,
-)
+# With AGENT_SERVICE_URL set, prompts run on `sprint-goals-agent serve`, whose fetches
+# are shared with every other user asking for the same teams at the same time.
+service = service_client()
+if service is None:
+    # Keeps the sprint snapshot warm in the background when REFRESH_BACKGROUND=on
+    start_background_refresh(resources.settings.scripts_dir, resources.settings.board_ids_file)
 
 if "history" not in st.session_state:
     st.session_state.history = []  # [{"role": "user"|"assistant", "content": "..."}]
+if "thread_id" not in st.session_state:
+    # Names this session's conversation, so follow-ups ("now only outcomes") reuse its last fetch
+    st.session_state.thread_id = uuid.uuid4().hex
 
 for m in st.session_state.history:
     with st.chat_message(m["role"]):
@@ -42,9 +43,17 @@ if prompt:
     with st.chat_message("user"):
         st.markdown(prompt)
 
-    result = graph.invoke({"messages": [HumanMessage(content=prompt)]})
-    reply = result["messages"][-1].content
-
-    st.session_state.history.append({"role": "assistant", "content": reply})
     with st.chat_message("assistant"):
-        st.markdown(reply)
\ No newline at end of file
+        # Boards appear one by one as they are fetched
+        placeholder = st.empty()
+        reply = ""
+        if service is not None:
+            pieces = service.chat(prompt, thread_id=st.session_state.thread_id)
+        else:
+            state = {"messages": [HumanMessage(content=prompt)]}
+            pieces = stream_reply(resources.graph, state, thread_id=st.session_state.thread_id)
+        for piece in pieces:
+            reply += piece
+            placeholder.markdown(reply)
+
+    st.session_state.history.append({"role": "assistant", "content": reply})
\ No newline at end of file